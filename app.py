@@ -8,8 +8,9 @@ from pathlib import Path
 
 # Import utilities
 from utils.styling import load_custom_css
-from utils.helpers import init_session_state, render_header, render_navigation
+from utils.helpers import init_session_state, render_header, render_navigation, track_catalog_prices, track_event
 from data.games_data import load_games
+from data.event_log import PAGE_VIEW
 
 # Import views
 from views import home, browse, cart, wishlist, profile, analytics, chatbot
@@ -73,6 +74,7 @@ def main():
     
     # Load game data
     games_df = load_games()
+    track_catalog_prices(games_df)
     
     # Render header
     render_header()
@@ -80,6 +82,11 @@ def main():
     # Render navigation and get selected page
     current_page = render_navigation()
     
+    # Count a page view when the user lands on a page, not on every rerun
+    if st.session_state.get('last_page') != current_page:
+        st.session_state.last_page = current_page
+        track_event(PAGE_VIEW, label=current_page)
+    
     # Route to appropriate page
     page_render_func = PAGES.get(current_page)
     if page_render_func:
@@ -0,0 +1,95 @@
+"""
+Cart Store Benchmark
+Measures sustained cart/wishlist mutations per second under concurrent sessions
+
+Each simulated session adds and removes random games from its user's cart
+and wishlist, the way button clicks do. Reports how long a click waits on
+the store (enqueue latency) and how many mutations per second reach disk.
+
+    python bench_cart_store.py --sessions 200 --ops 500
+"""
+
+import argparse
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from data.cart_store import CART, WISHLIST, SQLiteCartStore
+
+CATALOG_SIZE = 500
+
+
+def run_session(store, user_id, ops, latencies, seed):
+    rng = random.Random(seed)
+    held = {CART: set(), WISHLIST: set()}
+    samples = []
+    for _ in range(ops):
+        list_name = rng.choice((CART, WISHLIST))
+        game_id = rng.randrange(CATALOG_SIZE)
+        started = time.perf_counter()
+        if game_id in held[list_name]:
+            store.remove(user_id, list_name, game_id)
+            held[list_name].discard(game_id)
+        else:
+            store.add(user_id, list_name, game_id)
+            held[list_name].add(game_id)
+        samples.append(time.perf_counter() - started)
+    latencies.extend(samples)
+    return held
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the write-behind cart store.")
+    parser.add_argument("--sessions", type=int, default=100, help="Concurrent sessions (one user each).")
+    parser.add_argument("--ops", type=int, default=500, help="Mutations per session.")
+    parser.add_argument("--db", type=Path, help="Database path (default: a temporary file).")
+    args = parser.parse_args()
+
+    db = args.db or Path(tempfile.mkdtemp()) / "carts_bench.db"
+    store = SQLiteCartStore(path=db)
+    latencies = []
+    finals = {}
+
+    def session(i):
+        finals[f"user_{i}"] = run_session(store, f"user_{i}", args.ops, latencies, seed=i)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(args.sessions)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    enqueued = time.perf_counter() - started
+    store.flush()
+    durable = time.perf_counter() - started
+
+    # Verify what reached disk matches what each session holds
+    mismatches = sum(
+        1 for user_id, held in finals.items()
+        if {k: set(v) for k, v in store.load(user_id).items()} != held
+    )
+    store.close()
+
+    total = args.sessions * args.ops
+    lat_us = np.array(latencies) * 1e6
+    print("=" * 60)
+    print("🛒 CART STORE BENCHMARK")
+    print("=" * 60)
+    print(f"Sessions: {args.sessions} | Mutations/session: {args.ops} | Total: {total:,}")
+    print(f"Database: {db}")
+    print("")
+    print(f"Click latency p50:   {np.percentile(lat_us, 50):.1f} µs")
+    print(f"Click latency p99:   {np.percentile(lat_us, 99):.1f} µs")
+    print(f"Enqueued in:         {enqueued:.2f}s")
+    print(f"Durable in:          {durable:.2f}s")
+    print(f"Sustained rate:      {total / durable:,.0f} mutations/s")
+    print(f"State mismatches:    {mismatches}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
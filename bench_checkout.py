@@ -0,0 +1,114 @@
+"""
+Checkout Benchmark
+Runs parallel checkouts through license allocation and the order ledger
+
+Each simulated buyer checks out random carts drawn from a small set of hot
+games, the worst case for key contention. Reports checkout throughput, how
+often a checkout had to wait for another on the same game (conflict rate)
+and verifies no key was issued twice.
+
+    python bench_checkout.py --buyers 64 --checkouts 50 --block 32
+"""
+
+import argparse
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from data.license_store import LicenseAllocator, SoldOutError
+from data.order_ledger import OrderLedger, new_order_id
+
+
+def checkout(allocator, ledger, user_id, cart):
+    """The store's checkout path: allocate keys, then record the order"""
+    order_id = new_order_id()
+    allocator.allocate(order_id, user_id, [item["id"] for item in cart])
+    try:
+        ledger.record_order(user_id, cart, order_id=order_id)
+    except Exception:
+        allocator.release(order_id)
+        raise
+
+
+def run_buyer(allocator, ledger, user_id, checkouts, hot_games, max_items, latencies, results, seed):
+    rng = random.Random(seed)
+    samples = []
+    completed = sold_out = 0
+    for _ in range(checkouts):
+        games = rng.sample(range(hot_games), rng.randint(1, max_items))
+        cart = [{"id": game_id, "title": f"Game {game_id}", "price": 19.99} for game_id in games]
+        started = time.perf_counter()
+        try:
+            checkout(allocator, ledger, user_id, cart)
+            completed += 1
+        except SoldOutError:
+            sold_out += 1
+        samples.append(time.perf_counter() - started)
+    latencies.extend(samples)
+    results.append((completed, sold_out))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent checkouts with license allocation.")
+    parser.add_argument("--buyers", type=int, default=32, help="Concurrent buyers.")
+    parser.add_argument("--checkouts", type=int, default=50, help="Checkouts per buyer.")
+    parser.add_argument("--hot-games", type=int, default=10, help="Games every cart is drawn from.")
+    parser.add_argument("--max-items", type=int, default=3, help="Largest cart size.")
+    parser.add_argument("--block", type=int, default=32, help="Keys reserved per refill.")
+    parser.add_argument("--stock", type=int, default=5_000, help="Keys per game.")
+    parser.add_argument("--dir", type=Path, help="Database directory (default: a temporary one).")
+    args = parser.parse_args()
+
+    directory = args.dir or Path(tempfile.mkdtemp())
+    allocator = LicenseAllocator(path=directory / "licenses_bench.db", block_size=args.block,
+                                 initial_stock=args.stock)
+    ledger = OrderLedger(path=directory / "orders_bench.db")
+    latencies, results = [], []
+
+    threads = [
+        threading.Thread(target=run_buyer, args=(
+            allocator, ledger, f"buyer_{i}", args.checkouts, args.hot_games, args.max_items,
+            latencies, results, i,
+        ))
+        for i in range(args.buyers)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    completed = sum(done for done, _ in results)
+    sold_out = sum(missed for _, missed in results)
+
+    # Keys are unique, so every order line must hold its own issued key
+    issued = allocator._conn.execute("SELECT COUNT(*) FROM license_keys WHERE status = 'issued'").fetchone()[0]
+    lines = ledger._conn.execute("SELECT COUNT(*) FROM order_items").fetchone()[0]
+    stats = dict(allocator.stats)
+    allocator.close()
+
+    lat_ms = np.array(latencies) * 1000
+    print("=" * 60)
+    print("🔑 CHECKOUT BENCHMARK")
+    print("=" * 60)
+    print(f"Buyers: {args.buyers} | Checkouts/buyer: {args.checkouts} | Hot games: {args.hot_games}")
+    print(f"Reservation block: {args.block} keys")
+    print("")
+    print(f"Completed:           {completed:,} ({sold_out:,} sold out)")
+    print(f"Throughput:          {completed / elapsed:,.0f} checkouts/s")
+    print(f"Latency p50:         {np.percentile(lat_ms, 50):.2f} ms")
+    print(f"Latency p99:         {np.percentile(lat_ms, 99):.2f} ms")
+    print(f"Conflict rate:       {stats['contended'] / max(stats['takes'], 1):.1%} of key takes waited on a game lock")
+    print(f"Key refills:         {stats['refills']:,}")
+    print(f"Keys issued:         {issued:,} for {lines:,} order lines")
+    print(f"Mismatched lines:    {abs(issued - lines)}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
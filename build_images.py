@@ -0,0 +1,42 @@
+"""
+Image Build
+Generates the thumb/card/hero WebP variants of the cover images in images/
+into static/covers/, which Streamlit serves as static files
+
+Only images added or changed since the last build are re-encoded, spread
+over a process pool. Run it as part of a deploy, or after adding covers.
+
+    python build_images.py --workers 8
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from utils.images import COVERS_DIR, IMAGES_DIR, VARIANTS, build_variants, load_manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build resized WebP variants of the game cover images.")
+    parser.add_argument("--images", type=Path, default=IMAGES_DIR, help="Source image directory (default: images/).")
+    parser.add_argument("--out", type=Path, default=COVERS_DIR, help="Variant directory (default: static/covers/).")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU).")
+    parser.add_argument("--force", action="store_true", help="Rebuild every variant.")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    rebuilt = build_variants(args.images, args.out, workers=args.workers, force=args.force)
+    elapsed = time.perf_counter() - started
+
+    sources = load_manifest(args.out)["sources"]
+    source_bytes = sum((args.images / entry["source"]).stat().st_size for entry in sources.values())
+    print(f"Rebuilt {len(rebuilt)} of {len(sources)} image(s) into {args.out} in {elapsed:.1f}s")
+    print(f"Source images: {source_bytes / 1024:,.0f} KB")
+    for name, size in VARIANTS.items():
+        variant_bytes = sum(entry["variants"][name]["bytes"] for entry in sources.values())
+        ratio = source_bytes / variant_bytes if variant_bytes else 0
+        print(f"  {name:<6} {size:>5}px: {variant_bytes / 1024:>7,.0f} KB ({ratio:.0f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
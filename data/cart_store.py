@@ -0,0 +1,218 @@
+"""
+GameVerse Cart & Wishlist Store
+Persists each user's cart and wishlist so they survive refreshes and devices
+"""
+
+import logging
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import pandas as pd
+
+from data.storage import connect, db_path
+
+logger = logging.getLogger(__name__)
+
+DB_NAME = "carts.db"
+
+CART = "cart"
+WISHLIST = "wishlist"
+
+# Write-behind settings
+FLUSH_INTERVAL = 0.05  # seconds the writer waits to gather a batch
+MAX_BATCH = 1000  # mutations committed per transaction at most
+MAX_QUERY_PARAMS = 900  # ids per IN (...) lookup, below SQLite's parameter limit
+WRITE_ATTEMPTS = 3  # tries per batch before its mutations are dropped
+RETRY_DELAY = 0.5  # seconds before the first retry; doubles each time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS list_items (
+    user_id TEXT NOT NULL,
+    list_name TEXT NOT NULL,
+    game_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (user_id, list_name, game_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_list_items_game ON list_items (list_name, game_id);
+"""
+
+
+class CartStore(ABC):
+    """
+    Interface for cart/wishlist persistence.
+
+    Lists are insertion-ordered sets of game ids per (user, list name).
+    Mutations may be applied asynchronously; ``load`` always reflects every
+    mutation made before it through the same store.
+    """
+
+    @abstractmethod
+    def load(self, user_id):
+        """Return {"cart": [game ids], "wishlist": [game ids]} in insertion order"""
+
+    @abstractmethod
+    def entries_for_games(self, list_name, game_ids):
+        """Return a DataFrame of (user_id, game_id) for every list holding one of ``game_ids``"""
+
+    @abstractmethod
+    def add(self, user_id, list_name, game_id):
+        ...
+
+    @abstractmethod
+    def remove(self, user_id, list_name, game_id):
+        ...
+
+    @abstractmethod
+    def clear(self, user_id, list_name):
+        ...
+
+    def flush(self):
+        """Block until every queued mutation is durable"""
+
+    def close(self):
+        """Flush and release resources"""
+
+
+class SQLiteCartStore(CartStore):
+    """
+    SQLite (WAL) cart store with batched write-behind.
+
+    Mutations are queued and return immediately; a writer thread commits
+    them in batches, one transaction per batch, so a button click never waits
+    on disk. ``load`` drains the queue first so a session always reads its
+    own writes.
+    """
+
+    def __init__(self, path=None, flush_interval=FLUSH_INTERVAL, max_batch=MAX_BATCH):
+        self.path = path or db_path(DB_NAME)
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._conn = connect(self.path)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="cart-store-writer", daemon=True)
+        self._writer.start()
+
+    # --- Reads ---
+
+    def load(self, user_id):
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT list_name, game_id FROM list_items WHERE user_id = ? ORDER BY position",
+                (user_id,),
+            ).fetchall()
+        lists = {CART: [], WISHLIST: []}
+        for row in rows:
+            lists.setdefault(row["list_name"], []).append(row["game_id"])
+        return lists
+
+    def entries_for_games(self, list_name, game_ids):
+        self.flush()
+        game_ids = [int(game_id) for game_id in game_ids]
+        if not game_ids:
+            return pd.DataFrame({"user_id": pd.Series(dtype=object), "game_id": pd.Series(dtype="int64")})
+        chunks = []
+        with self._lock:
+            for start in range(0, len(game_ids), MAX_QUERY_PARAMS):
+                chunk = game_ids[start:start + MAX_QUERY_PARAMS]
+                chunks.append(pd.read_sql_query(
+                    f"SELECT user_id, game_id FROM list_items WHERE list_name = ? "
+                    f"AND game_id IN ({','.join('?' * len(chunk))})",
+                    self._conn, params=(list_name, *chunk),
+                ))
+        return pd.concat(chunks, ignore_index=True)
+
+    # --- Writes (queued) ---
+
+    def add(self, user_id, list_name, game_id):
+        self._queue.put(("add", user_id, list_name, int(game_id), time.time_ns()))
+
+    def remove(self, user_id, list_name, game_id):
+        self._queue.put(("remove", user_id, list_name, int(game_id), None))
+
+    def clear(self, user_id, list_name):
+        self._queue.put(("clear", user_id, list_name, None, None))
+
+    def flush(self):
+        self._queue.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        with self._lock:
+            self._conn.close()
+
+    # --- Writer thread ---
+
+    def _write_loop(self):
+        while True:
+            op = self._queue.get()
+            if op is None:
+                self._queue.task_done()
+                return
+            batch = [op]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    op = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if op is None:
+                    self._queue.put(None)  # re-queue the stop marker behind this batch
+                    self._queue.task_done()
+                    break
+                batch.append(op)
+            try:
+                self._apply_with_retry(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _apply_with_retry(self, batch):
+        """
+        Commit a batch, retrying with backoff
+
+        A batch that still fails after WRITE_ATTEMPTS is logged and dropped so
+        flush() and load() never block on a broken database; the lost
+        mutations are in the log.
+        """
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            try:
+                self._apply(batch)
+                return
+            except Exception:
+                if attempt == WRITE_ATTEMPTS:
+                    logger.exception("Dropping %d cart changes after %d failed writes: %r", len(batch), attempt, batch)
+                    return
+                logger.warning("Failed to save %d cart changes, retrying", len(batch), exc_info=True)
+                time.sleep(RETRY_DELAY * 2 ** (attempt - 1))
+
+    def _apply(self, batch):
+        with self._lock, self._conn:
+            for action, user_id, list_name, game_id, position in batch:
+                if action == "add":
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO list_items (user_id, list_name, game_id, position) "
+                        "VALUES (?, ?, ?, ?)",
+                        (user_id, list_name, game_id, position),
+                    )
+                elif action == "remove":
+                    self._conn.execute(
+                        "DELETE FROM list_items WHERE user_id = ? AND list_name = ? AND game_id = ?",
+                        (user_id, list_name, game_id),
+                    )
+                elif action == "clear":
+                    self._conn.execute(
+                        "DELETE FROM list_items WHERE user_id = ? AND list_name = ?",
+                        (user_id, list_name),
+                    )
@@ -0,0 +1,85 @@
+"""
+GameVerse Catalog Statistics
+Catalog aggregates computed once per catalog version and served from cache
+"""
+
+import hashlib
+
+import streamlit as st
+import numpy as np
+import pandas as pd
+
+from data.games_data import PRICE_BUCKETS, price_bucket_codes
+
+TOP_RATED_COUNT = 5
+TOP_RATED_COLUMNS = ['title', 'rating', 'category', 'price']
+VERSION_COLUMNS = ['id', 'title', 'price', 'category', 'rating']
+
+
+def catalog_version(games_df):
+    """
+    Fingerprint of the catalog columns the statistics depend on
+
+    Args:
+        games_df: DataFrame containing games
+
+    Returns:
+        str: Hex digest that changes whenever any game's id, title, price,
+        category or rating does
+    """
+    row_hashes = pd.util.hash_pandas_object(games_df[VERSION_COLUMNS], index=False).to_numpy()
+    return hashlib.blake2b(row_hashes.tobytes(), digest_size=8).hexdigest()
+
+
+def compute_catalog_stats(games_df):
+    """
+    Every catalog aggregate the dashboard shows, in one pass over the columns
+
+    Args:
+        games_df: DataFrame containing games
+
+    Returns:
+        dict: games (count), category_counts (Series, largest first),
+        price_histogram (Series over PRICE_BUCKETS, empty buckets included),
+        top_rated (DataFrame of the TOP_RATED_COUNT best-rated games)
+    """
+    category_codes, categories = pd.factorize(games_df['category'], sort=True)
+    category_counts = pd.Series(
+        np.bincount(category_codes, minlength=len(categories)), index=categories, name='count'
+    ).sort_values(ascending=False, kind='stable')
+
+    price_histogram = pd.Series(
+        np.bincount(price_bucket_codes(games_df['price']), minlength=len(PRICE_BUCKETS)),
+        index=pd.Index(PRICE_BUCKETS, name='price'),
+        name='count',
+    )
+
+    # Stable sort keeps catalog order among equal ratings, as nlargest does
+    order = np.argsort(-games_df['rating'].to_numpy(), kind='stable')[:TOP_RATED_COUNT]
+    top_rated = games_df.iloc[order][TOP_RATED_COLUMNS]
+
+    return {
+        'games': len(games_df),
+        'category_counts': category_counts,
+        'price_histogram': price_histogram,
+        'top_rated': top_rated,
+    }
+
+
+@st.cache_data(max_entries=4)
+def _cached_catalog_stats(version, _games_df):
+    # Keyed by version alone; the frame itself is not hashed by Streamlit
+    return compute_catalog_stats(_games_df)
+
+
+def get_catalog_stats(games_df):
+    """
+    Catalog statistics for the current catalog version
+
+    Args:
+        games_df: DataFrame containing games
+
+    Returns:
+        dict: See compute_catalog_stats; recomputed only when the catalog changes
+    """
+    return _cached_catalog_stats(catalog_version(games_df), games_df)
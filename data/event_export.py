@@ -0,0 +1,217 @@
+"""
+GameVerse Event Export
+Writes the event log as partitioned Parquet and reads it back with pruning
+
+Exports use Hive-style partitions, one directory per UTC day and event type:
+
+    storage/exports/events/day=2025-01-31/event=checkout/part-0.parquet
+
+Rows inside a file are sorted by timestamp and written in row groups, each
+carrying min/max statistics. A read for a date range and event types only
+opens the matching partitions and skips row groups whose timestamps fall
+outside the range, so a 30-day query never touches older data.
+"""
+
+import os
+import shutil
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from data.event_log import EVENT_TYPES, SECONDS_PER_DAY, day_of
+from data.storage import DATA_DIR
+
+EXPORT_DIR = "exports/events"
+ROW_GROUP_ROWS = 128_000
+SEGMENTS_FILE = "_segments.txt"  # the log segments a day was exported from
+
+EXPORT_COLUMNS = ("ts", "event", "user_id", "game_id", "value", "label")
+PARTITIONING = ds.partitioning(pa.schema([("day", pa.string()), ("event", pa.string())]), flavor="hive")
+FILE_SCHEMA = pa.schema([
+    ("ts", pa.timestamp("ms", tz="UTC")),
+    ("user_id", pa.string()),
+    ("game_id", pa.int32()),
+    ("value", pa.float64()),
+    ("label", pa.string()),
+])
+
+
+def export_root(root=None):
+    return root or DATA_DIR / EXPORT_DIR
+
+
+def _day_start(day):
+    return datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+
+
+# --- Export ---
+
+def export_events(event_log, root=None, start=None, end=None):
+    """
+    Export every day of the event log whose segments changed since its last export
+
+    Only flushed events are exported; flush an EventLog first to include
+    what it still buffers.
+
+    Args:
+        event_log: The EventLog, or an EventLogReader from another process
+        root: Export directory (defaults to storage/exports/events)
+        start: Optional epoch seconds; days before it are skipped
+        end: Optional epoch seconds; days after it are skipped
+
+    Returns:
+        dict: day -> rows written, for the days exported this time
+    """
+    root = export_root(root)
+    root.mkdir(parents=True, exist_ok=True)
+
+    segments_by_day = {}
+    for path in event_log.segments(start, end):
+        segments_by_day.setdefault(path.parent.name, []).append(path.name)
+
+    exported = {}
+    for day, names in sorted(segments_by_day.items()):
+        marker = root / f"day={day}" / SEGMENTS_FILE
+        if marker.exists() and marker.read_text().split() == sorted(names):
+            continue
+        exported[day] = export_day(event_log, day, root, names)
+    return exported
+
+
+def export_day(event_log, day, root=None, segment_names=()):
+    """
+    Rewrite one day's partitions from the event log
+
+    Each event type's file is written under a hidden name and renamed over
+    the previous one, so a reader sees either the old or the new file for
+    it and the day never disappears mid-export. The log only grows, so an
+    old file is a subset of its replacement. The segments marker goes last;
+    an interrupted export is redone on the next run.
+
+    Returns:
+        int: Rows written
+    """
+    root = export_root(root)
+    start = _day_start(day)
+    columns = event_log.read_columns(start, start + SECONDS_PER_DAY, columns=EXPORT_COLUMNS)
+    order = np.argsort(columns["ts"], kind="stable")
+    columns = {name: column[order] for name, column in columns.items()}
+
+    day_dir = root / f"day={day}"
+    written = set()
+    for code in np.unique(columns["event"]):
+        rows = columns["event"] == code
+        table = pa.table({
+            "ts": pa.array((columns["ts"][rows] * 1000).astype(np.int64), type=FILE_SCHEMA.field("ts").type),
+            "user_id": pa.array(columns["user_id"][rows].astype(object), type=pa.string()),
+            "game_id": pa.array(columns["game_id"][rows], type=pa.int32()),
+            "value": pa.array(columns["value"][rows], type=pa.float64()),
+            "label": pa.array(columns["label"][rows].astype(object), type=pa.string()),
+        }, schema=FILE_SCHEMA)
+        directory = day_dir / f"event={EVENT_TYPES[code]}"
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = directory / ".part-0.parquet"  # dot files are skipped by dataset discovery
+        pq.write_table(table, tmp, row_group_size=ROW_GROUP_ROWS, write_statistics=True, compression="zstd")
+        os.replace(tmp, directory / "part-0.parquet")
+        written.add(directory.name)
+    day_dir.mkdir(parents=True, exist_ok=True)
+    for directory in day_dir.glob("event=*"):
+        if directory.name not in written:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    marker = day_dir / SEGMENTS_FILE
+    tmp = day_dir / f".{SEGMENTS_FILE}"
+    tmp.write_text("\n".join(sorted(segment_names)))
+    os.replace(tmp, marker)
+    return len(columns["ts"])
+
+
+# --- Reads ---
+
+def _all(conditions):
+    predicate = None
+    for condition in conditions:
+        predicate = condition if predicate is None else predicate & condition
+    return predicate
+
+
+def _filters(start=None, end=None, events=None):
+    """
+    (partition filter on day/event, row filter on ts); either may be None
+
+    The partition filter selects directories; the row filter is checked
+    against each row group's ts statistics before the group is read.
+    """
+    partitions, rows = [], []
+    ts_type = FILE_SCHEMA.field("ts").type
+    if start is not None:
+        partitions.append(ds.field("day") >= day_of(start))
+        rows.append(ds.field("ts") >= pa.scalar(int(start * 1000), type=ts_type))
+    if end is not None:
+        partitions.append(ds.field("day") <= day_of(end))
+        rows.append(ds.field("ts") < pa.scalar(int(np.ceil(end * 1000)), type=ts_type))
+    if events is not None:
+        partitions.append(ds.field("event").isin(list(events)))
+    return _all(partitions), _all(rows)
+
+
+def open_export(root=None):
+    """The exported events as a pyarrow dataset (None when nothing was exported yet)"""
+    root = export_root(root)
+    if not root.exists() or not any(root.glob("day=*/event=*/*.parquet")):
+        return None
+    return ds.dataset(root, format="parquet", partitioning=PARTITIONING, schema=pa.unify_schemas([
+        FILE_SCHEMA, pa.schema([("day", pa.string()), ("event", pa.string())]),
+    ]))
+
+
+def read_exported(start=None, end=None, events=None, columns=None, root=None):
+    """
+    Exported events in [start, end) as a DataFrame
+
+    Only partitions for the requested days and event types are opened, and
+    only row groups whose timestamp range overlaps [start, end) are read.
+
+    Args:
+        start: Epoch seconds (inclusive), or None for the beginning
+        end: Epoch seconds (exclusive), or None for everything exported
+        events: Optional event type names to keep
+        columns: Optional subset of EXPORT_COLUMNS (default: all)
+        root: Export directory
+
+    Returns:
+        pd.DataFrame: ts (UTC datetime), event, user_id, game_id, value, label
+    """
+    columns = list(columns or EXPORT_COLUMNS)
+    dataset = open_export(root)
+    if dataset is None:
+        return pd.DataFrame({name: pd.Series(dtype=object) for name in columns})
+    partitions, rows = _filters(start, end, events)
+    return dataset.to_table(columns=columns, filter=_all([f for f in (partitions, rows) if f is not None])).to_pandas()
+
+
+def scan_plan(start=None, end=None, events=None, root=None):
+    """
+    How much of the export a read would touch
+
+    Only the files the read opens are inspected; ``total_files`` comes from
+    the directory listing, so pruned partitions are never opened.
+
+    Returns:
+        dict: files and row_groups the read opens, and total_files exported
+    """
+    dataset = open_export(root)
+    if dataset is None:
+        return {"files": 0, "row_groups": 0, "total_files": 0}
+    partitions, rows = _filters(start, end, events)
+    fragments = dataset.get_fragments(filter=partitions) if partitions is not None else dataset.get_fragments()
+    matching = list(fragments)
+    return {
+        "files": len(matching),
+        "row_groups": sum(len(fragment.split_by_row_group(rows)) for fragment in matching),
+        "total_files": len(dataset.files),
+    }
@@ -0,0 +1,376 @@
+"""
+GameVerse Event Log
+Buffered capture of storefront events into a local columnar log
+
+Events are appended to an in-memory buffer and a writer thread flushes them
+in batches as column segments (one ``.npz`` of numpy arrays per batch),
+grouped into a directory per UTC day:
+
+    storage/events/2025-01-31/<first ms>-<last ms>-<id>.npz
+
+A day's segments are merged into one once the day is over, and readers skip
+whole days and segments outside the requested time range by name alone.
+
+User ids are dictionary-encoded: ``users.txt`` lists every user id once, in
+first-seen order, and segments store each event's line number in that file
+(``user_code``) instead of the string.
+
+Only the app process writes the log (EventLog); other processes read it
+with an EventLogReader.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from data.storage import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+EVENTS_DIR = "events"
+USERS_FILE = "users.txt"
+
+# Event types; stored as their index in this tuple
+PAGE_VIEW = "page_view"
+SEARCH = "search"
+ADD_TO_CART = "add_to_cart"
+ADD_TO_WISHLIST = "add_to_wishlist"
+CHECKOUT = "checkout"  # one per purchased game; value is its price, label the order id
+CHATBOT_QUERY = "chatbot_query"
+GAME_VIEW = "game_view"  # a game's details were opened
+# New types go at the end; stored codes must not shift
+EVENT_TYPES = (PAGE_VIEW, SEARCH, ADD_TO_CART, ADD_TO_WISHLIST, CHECKOUT, CHATBOT_QUERY, GAME_VIEW)
+EVENT_CODES = {name: code for code, name in enumerate(EVENT_TYPES)}
+
+COLUMNS = ("ts", "event", "user_id", "game_id", "value", "label")
+COLUMN_DTYPES = {
+    "ts": np.float64, "event": np.uint8, "user_id": str, "user_code": np.int32,
+    "game_id": np.int32, "value": np.float64, "label": str,
+}
+STORED_COLUMNS = ("ts", "event", "user_code", "game_id", "value", "label")
+NO_GAME = -1
+SECONDS_PER_DAY = 86400
+
+# Write-behind settings
+FLUSH_INTERVAL = 5.0  # seconds between segment writes
+MAX_BUFFER = 50_000  # events that trigger an early flush
+
+
+def day_of(ts):
+    """UTC day (YYYY-MM-DD) a timestamp falls on"""
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+class EventLogReader:
+    """
+    Read-only view of an event log directory.
+
+    Starts no threads and never writes, so another process (e.g. the
+    exporter) can read a log while the app's EventLog writes it. Users and
+    segments the writing process adds later are picked up as they appear.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or DATA_DIR / EVENTS_DIR
+        self._users_path = self.root / USERS_FILE
+        self._user_lock = threading.Lock()
+        self._user_ids = []
+        self._user_codes = {}
+        self._user_array = np.array([], dtype=str)
+        if self._users_path.exists():
+            self._user_ids = self._users_path.read_text(encoding="utf-8").splitlines()
+            self._user_codes = {user_id: code for code, user_id in enumerate(self._user_ids)}
+
+    # --- Users ---
+
+    def encode_users(self, user_ids):
+        """Code per user id as known so far, -1 for users a reader has not seen"""
+        uniques, inverse = np.unique(np.asarray(user_ids, dtype=str), return_inverse=True)
+        with self._user_lock:
+            codes = np.array([self._user_codes.get(user_id, -1) for user_id in uniques.tolist()], dtype=np.int32)
+        return codes[inverse]
+
+    def user_names(self, codes):
+        """User ids for an array of user codes"""
+        with self._user_lock:
+            if len(codes) and int(codes.max()) >= len(self._user_ids) and self._users_path.exists():
+                # Written by the process that owns this log since we loaded the file
+                for user_id in self._users_path.read_text(encoding="utf-8").splitlines()[len(self._user_ids):]:
+                    self._user_codes[user_id] = len(self._user_ids)
+                    self._user_ids.append(user_id)
+            if len(self._user_array) != len(self._user_ids):
+                self._user_array = np.array(self._user_ids, dtype=str)
+            users = self._user_array
+        return users[codes]
+
+    @property
+    def user_count(self):
+        """Users ever seen; user codes run from 0 to this"""
+        return len(self._user_ids)
+
+    # --- Segments ---
+
+    def _load(self, path, columns=COLUMNS):
+        # npz members are read lazily, so untouched columns never leave disk
+        with np.load(path, allow_pickle=False) as data:
+            loaded = {}
+            for name in columns:
+                if name == "user_id" and "user_code" in data:
+                    loaded[name] = self.user_names(data["user_code"])
+                elif name == "user_code" and "user_code" not in data:
+                    loaded[name] = self.encode_users(data["user_id"])  # segment from before encoding
+                else:
+                    loaded[name] = data[name]
+            return loaded
+
+    @staticmethod
+    def _concat(batches):
+        return {name: np.concatenate([batch[name] for batch in batches]) for name in batches[0]}
+
+    def segments(self, start=None, end=None):
+        """Segment paths that may hold events in [start, end), pruned by day and file name"""
+        start_day = day_of(start) if start is not None else None
+        end_day = day_of(end) if end is not None else None
+        paths = []
+        if not self.root.exists():
+            return paths
+        for directory in sorted(self.root.iterdir()):
+            if not directory.is_dir():
+                continue
+            if (start_day and directory.name < start_day) or (end_day and directory.name > end_day):
+                continue
+            for path in sorted(directory.glob("[0-9]*.npz")):
+                first_ms, last_ms, _ = path.stem.split("-")
+                if start is not None and int(last_ms) + 1 <= start * 1000:  # names hold floored ms
+                    continue
+                if end is not None and int(first_ms) >= end * 1000:
+                    continue
+                paths.append(path)
+        return paths
+
+    # --- Reads ---
+
+    def read_columns(self, start=None, end=None, events=None, columns=None):
+        """
+        Events in [start, end) as raw column arrays, oldest segments first
+
+        Same arguments as ``read``; skips the DataFrame conversion, so event
+        stays a uint8 code (see EVENT_CODES) and strings stay numpy strings.
+        Ask for "user_code" rather than "user_id" to avoid strings entirely.
+        Only events the writer has flushed are included.
+
+        Returns:
+            dict: column name -> numpy array
+        """
+        columns = list(columns or COLUMNS)
+        needed = set(columns)
+        if start is not None or end is not None:
+            needed.add("ts")
+        if events is not None:
+            needed.add("event")
+
+        paths = self.segments(start, end)
+        if not paths:
+            return {name: np.array([], dtype=COLUMN_DTYPES[name]) for name in columns}
+        data = self._concat([self._load(path, [name for name in COLUMN_DTYPES if name in needed]) for path in paths])
+
+        mask = np.ones(len(next(iter(data.values()))), dtype=bool)
+        if start is not None:
+            mask &= data["ts"] >= start
+        if end is not None:
+            mask &= data["ts"] < end
+        if events is not None:
+            mask &= np.isin(data["event"], [EVENT_CODES[name] for name in events])
+        if mask.all():
+            return {name: data[name] for name in columns}
+        return {name: data[name][mask] for name in columns}
+
+    def read(self, start=None, end=None, events=None, columns=None):
+        """
+        Events in [start, end) as a DataFrame, oldest segments first
+
+        Args:
+            start: Epoch seconds (inclusive), or None for the beginning
+            end: Epoch seconds (exclusive), or None for now
+            events: Optional event type names to keep
+            columns: Optional subset of COLUMNS to load (default: all),
+                or "user_code" for integer user codes
+
+        Returns:
+            pd.DataFrame: The requested columns of ts, event (categorical),
+            user_id, game_id, value, label
+        """
+        data = self.read_columns(start, end, events, columns)
+        frame = {}
+        for name, column in data.items():
+            if name == "event":
+                column = pd.Categorical.from_codes(column.astype(np.int8), categories=EVENT_TYPES)
+            elif column.dtype.kind == "U":
+                column = column.astype(object)
+            frame[name] = column
+        return pd.DataFrame(frame)
+
+
+class EventLog(EventLogReader):
+    """
+    Append-only columnar event log with buffered, batched writes.
+
+    ``append`` only pushes a tuple onto a deque (thread-safe, no lock, no
+    I/O), so capturing an event costs microseconds on the Streamlit script
+    thread. The writer thread turns each batch into column arrays and writes
+    one segment per flush.
+
+    Reading ``user_code`` instead of ``user_id`` gives integer user codes,
+    stable for the life of the log, without touching any strings. Only one
+    process should write to a directory, as it hands out the codes; others
+    (e.g. the exporter) read it through an EventLogReader.
+    """
+
+    def __init__(self, root=None, flush_interval=FLUSH_INTERVAL, max_buffer=MAX_BUFFER):
+        super().__init__(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._buffer = deque()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._listeners = []
+        self._writer = threading.Thread(target=self._write_loop, name="event-log-writer", daemon=True)
+        self._writer.start()
+
+    # --- Capture ---
+
+    def append(self, event, user_id, game_id=NO_GAME, value=0.0, label="", ts=None):
+        """Buffer one event; never touches disk"""
+        self._buffer.append((ts or time.time(), EVENT_CODES[event], user_id, game_id, value, label))
+        if len(self._buffer) >= self.max_buffer:
+            self._wake.set()
+
+    def flush(self):
+        """
+        Write everything buffered so far and hand the batch (COLUMNS plus user_code) to subscribers
+
+        The batch is on disk before any subscriber runs, and a subscriber
+        that raises is logged without keeping the others from the batch.
+        """
+        with self._write_lock:
+            batch = self._drain()
+            if batch is not None:
+                batch["user_code"] = self.encode_users(batch["user_id"])
+                self._write_segment(batch)
+                for callback in self._listeners:
+                    try:
+                        callback(batch)
+                    except Exception:
+                        logger.exception("Event log subscriber %r failed on a batch of %d events",
+                                          callback, len(batch["ts"]))
+
+    def subscribe(self, callback, since=None):
+        """
+        Call ``callback(batch)`` with every batch flushed from now on
+
+        Stored events newer than ``since`` (epoch seconds; None for all) are
+        replayed first, segment by segment, under the same lock as flushes,
+        so the subscriber sees every event exactly once.
+        """
+        with self._write_lock:
+            for path in self.segments(start=since):
+                batch = self._load(path, COLUMN_DTYPES)
+                if since is not None:
+                    newer = batch["ts"] > since
+                    batch = {name: column[newer] for name, column in batch.items()}
+                if len(batch["ts"]):
+                    callback(batch)
+            self._listeners.append(callback)
+
+    def _write_loop(self):
+        last_day = day_of(time.time())
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                today = day_of(time.time())
+                if today != last_day:
+                    self.compact_day(last_day)
+                    last_day = today
+            except Exception:
+                logger.exception("Event log flush failed")
+
+    def _drain(self):
+        rows = []
+        while True:
+            try:
+                rows.append(self._buffer.popleft())
+            except IndexError:
+                break
+        if not rows:
+            return None
+        return {name: np.array(values, dtype=COLUMN_DTYPES[name]) for name, values in zip(COLUMNS, zip(*rows))}
+
+    # --- Users ---
+
+    def encode_users(self, user_ids):
+        """
+        Stable integer code per user id, registering users seen for the first time
+
+        Args:
+            user_ids: Array of user id strings
+
+        Returns:
+            np.ndarray: int32 code per entry
+        """
+        uniques, inverse = np.unique(np.asarray(user_ids, dtype=str), return_inverse=True)
+        with self._user_lock:
+            codes = np.empty(len(uniques), dtype=np.int32)
+            new = []
+            for i, user_id in enumerate(uniques.tolist()):
+                code = self._user_codes.get(user_id)
+                if code is None:
+                    code = self._user_codes[user_id] = len(self._user_ids)
+                    self._user_ids.append(user_id)
+                    new.append(user_id)
+                codes[i] = code
+            if new:
+                # Written before any segment that uses the new codes
+                with open(self._users_path, "a", encoding="utf-8") as f:
+                    f.write("".join(f"{user_id}\n" for user_id in new))
+        return codes[inverse]
+
+    # --- Segments ---
+
+    def _write_segment(self, batch):
+        # A batch can straddle midnight; split it so each day directory stays pure
+        epoch_days = (batch["ts"] // SECONDS_PER_DAY).astype(np.int64)
+        for epoch_day in np.unique(epoch_days):
+            mask = epoch_days == epoch_day
+            self._save(day_of(epoch_day * SECONDS_PER_DAY), {name: column[mask] for name, column in batch.items()})
+
+    def _save(self, day, columns):
+        if "user_code" not in columns:
+            columns = {**columns, "user_code": self.encode_users(columns["user_id"])}
+        columns = {name: columns[name] for name in STORED_COLUMNS}
+        directory = self.root / day
+        directory.mkdir(exist_ok=True)
+        name = f"{int(columns['ts'].min() * 1000)}-{int(columns['ts'].max() * 1000)}-{uuid.uuid4().hex[:8]}"
+        tmp = directory / f".{name}.npz"
+        np.savez(tmp, **columns)
+        tmp.rename(directory / f"{name}.npz")  # readers never see a partial segment
+
+    def compact_day(self, day):
+        """Merge a finished day's segments into one"""
+        with self._write_lock:
+            segments = sorted((self.root / day).glob("[0-9]*.npz"))
+            if len(segments) < 2:
+                return
+            merged = self._concat([self._load(path, STORED_COLUMNS) for path in segments])
+            order = np.argsort(merged["ts"], kind="stable")
+            self._save(day, {name: column[order] for name, column in merged.items()})
+            for path in segments:
+                path.unlink()
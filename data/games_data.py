@@ -4,8 +4,14 @@ Manages game data and provides data access functions
 """
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 
+# Price buckets shared by the browse filter and the catalog statistics.
+# Bucket i holds prices in [PRICE_EDGES[i-1], PRICE_EDGES[i]); the first starts at 0, the last is open-ended.
+PRICE_BUCKETS = ("Free", "Under $20", "$20-$40", "$40+")
+PRICE_EDGES = (0.01, 20.0, 40.0)
+
 
 @st.cache_data
 def load_games():
@@ -13,7 +19,7 @@ def load_games():
     Load game database and return as DataFrame
     
     Returns:
-        pd.DataFrame: DataFrame containing all game data
+        pd.DataFrame: DataFrame containing all game data, indexed by game id
     """
     games = [
         {
@@ -114,7 +120,9 @@ def load_games():
         }
     ]
     
-    return pd.DataFrame(games)
+    games_df = pd.DataFrame(games)
+    games_df.index = games_df['id'].to_numpy()
+    return games_df
 
 
 def get_game_by_id(games_df, game_id):
@@ -134,6 +142,74 @@ def get_game_by_id(games_df, game_id):
     return None
 
 
+def get_games_by_ids(games_df, game_ids):
+    """
+    Resolve game ids against the catalog index in one gather
+    
+    Args:
+        games_df: DataFrame containing games, indexed by game id
+        game_ids: Iterable of game ids (order is preserved)
+        
+    Returns:
+        pd.DataFrame: Rows for ids still in the catalog, in the given order
+    """
+    positions = games_df.index.get_indexer(list(game_ids))
+    return games_df.iloc[positions[positions >= 0]]
+
+
+def reprice_items(games_df, game_ids, quoted_prices):
+    """
+    Re-price items against the live catalog in one vectorized gather
+    
+    Args:
+        games_df: DataFrame containing games, indexed by game id
+        game_ids: Sequence of game ids
+        quoted_prices: Prices the items were shown at, aligned with game_ids
+            (None where unknown; those are never flagged as changed)
+        
+    Returns:
+        dict: ``items`` (live rows still in the catalog, in order),
+        ``removed_ids`` (ids no longer in the catalog), ``changed``
+        (DataFrame of id, title, old_price, new_price) and ``total``
+        (sum of live prices)
+    """
+    ids = np.asarray(list(game_ids), dtype=np.int64)
+    quoted = np.asarray(list(quoted_prices), dtype=float)
+    positions = games_df.index.get_indexer(ids)
+    found = positions >= 0
+    
+    items = games_df.iloc[positions[found]]
+    live = items['price'].to_numpy(dtype=float)
+    old = quoted[found]
+    changed_mask = ~np.isnan(old) & ~np.isclose(old, live)
+    changed = pd.DataFrame({
+        'id': ids[found][changed_mask],
+        'title': items['title'].to_numpy()[changed_mask],
+        'old_price': old[changed_mask],
+        'new_price': live[changed_mask],
+    })
+    
+    return {
+        'items': items,
+        'removed_ids': ids[~found].tolist(),
+        'changed': changed,
+        'total': round(float(live.sum()), 2),
+    }
+
+
+def price_bucket_codes(prices):
+    """
+    Index into PRICE_BUCKETS for each price
+
+    Args:
+        prices: Array-like of prices
+
+    Returns:
+        np.ndarray: Bucket index per price
+    """
+    return np.searchsorted(PRICE_EDGES, np.asarray(prices, dtype=np.float64), side="right")
+
+
 def filter_games(games_df, search="", category="All", price_range="All"):
     """
     Filter games based on search criteria
@@ -160,16 +236,9 @@ def filter_games(games_df, search="", category="All", price_range="All"):
         filtered_df = filtered_df[filtered_df['category'] == category]
     
     # Apply price range filter
-    if price_range == "Free":
-        filtered_df = filtered_df[filtered_df['price'] == 0]
-    elif price_range == "Under $20":
-        filtered_df = filtered_df[filtered_df['price'] < 20]
-    elif price_range == "$20-$40":
-        filtered_df = filtered_df[
-            (filtered_df['price'] >= 20) & (filtered_df['price'] <= 40)
-        ]
-    elif price_range == "$40+":
-        filtered_df = filtered_df[filtered_df['price'] > 40]
+    if price_range in PRICE_BUCKETS:
+        codes = price_bucket_codes(filtered_df['price'])
+        filtered_df = filtered_df[codes == PRICE_BUCKETS.index(price_range)]
     
     return filtered_df
 
@@ -0,0 +1,308 @@
+"""
+GameVerse Conversation History Store
+Persists chatbot conversations and parsed messages in SQLite
+
+Each conversation keeps a contiguous run of its newest messages, ordered by
+``seq`` (higher is newer), plus the API cursor for the page just older than
+the oldest stored one. Views read pages from disk and only go to the API for
+deltas newer than the last stored message or for history older than the
+stored run.
+"""
+
+import threading
+import time
+
+from data.storage import connect, db_path
+
+DB_NAME = "history.db"
+
+# Size limits enforced by compact()
+MAX_MESSAGES_PER_CONVERSATION = 1000
+MAX_DB_BYTES = 64 * 1024 * 1024
+COMPACT_EVERY_WRITES = 500  # inserted messages between automatic compactions
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    user_id TEXT,
+    created_at TEXT,
+    older_token TEXT,
+    complete INTEGER NOT NULL DEFAULT 0,
+    last_synced REAL,
+    last_accessed REAL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    conversation_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    is_html INTEGER NOT NULL DEFAULT 0,
+    page_token TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_messages_conversation_seq ON messages (conversation_id, seq);
+CREATE INDEX IF NOT EXISTS idx_conversations_user ON conversations (user_id);
+"""
+
+
+class HistoryStore:
+    """
+    SQLite (WAL) store of conversations and parsed chat messages.
+
+    Messages are the view's parsed dicts (``id``, ``role``, ``content``,
+    ``is_html``). ``page_token`` records the API cursor that continues after
+    the page a message arrived in, which is what lets compaction trim whole
+    pages and still know where older history resumes.
+    """
+
+    def __init__(self, path=None, max_messages_per_conversation=MAX_MESSAGES_PER_CONVERSATION,
+                 max_bytes=MAX_DB_BYTES):
+        self.path = path or db_path(DB_NAME)
+        self.max_messages_per_conversation = max_messages_per_conversation
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._writes_since_compact = 0
+        self._conn = connect(self.path)
+        self._conn.executescript(SCHEMA)
+
+    # --- Conversations ---
+
+    def save_conversations(self, user_id, conversations):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO conversations (id, user_id, created_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET user_id = excluded.user_id",
+                [(c["id"], user_id, c.get("createdAt")) for c in conversations],
+            )
+
+    def load_conversations(self, user_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, created_at FROM conversations WHERE user_id = ? ORDER BY created_at DESC",
+                (user_id,),
+            ).fetchall()
+        return [{"id": row["id"], "createdAt": row["created_at"]} for row in rows]
+
+    def get_conversation(self, conversation_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM conversations WHERE id = ?", (conversation_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def has_messages(self, conversation_id):
+        """True once a conversation has been synced at least once"""
+        conversation = self.get_conversation(conversation_id)
+        return conversation is not None and conversation["last_synced"] is not None
+
+    # --- Messages ---
+
+    def newest_message_id(self, conversation_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM messages WHERE conversation_id = ? ORDER BY seq DESC LIMIT 1",
+                (conversation_id,),
+            ).fetchone()
+        return row["id"] if row else None
+
+    def page(self, conversation_id, before_seq=None, limit=20):
+        """
+        Newest ``limit`` stored messages older than ``before_seq``, in chronological order.
+
+        Returns (messages, oldest_seq); pass oldest_seq back as ``before_seq``
+        for the next older page.
+        """
+        query = "SELECT * FROM messages WHERE conversation_id = ?"
+        params = [conversation_id]
+        if before_seq is not None:
+            query += " AND seq < ?"
+            params.append(before_seq)
+        query += " ORDER BY seq DESC LIMIT ?"
+        params.append(limit)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE conversations SET last_accessed = ? WHERE id = ?", (time.time(), conversation_id)
+            )
+            rows = self._conn.execute(query, params).fetchall()
+        messages = [self._row_to_message(row) for row in reversed(rows)]
+        oldest_seq = rows[-1]["seq"] if rows else before_seq
+        return messages, oldest_seq
+
+    def has_older(self, conversation_id, before_seq):
+        """True if older history exists on disk or can be fetched from the API"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM messages WHERE conversation_id = ? AND seq < ? LIMIT 1",
+                (conversation_id, before_seq if before_seq is not None else 2 ** 62),
+            ).fetchone()
+        if row:
+            return True
+        conversation = self.get_conversation(conversation_id)
+        return bool(conversation and conversation["older_token"])
+
+    def replace_messages(self, conversation_id, user_id, messages, older_token):
+        """
+        Store a fresh newest run (chronological), dropping whatever was stored before.
+
+        ``older_token`` is the API cursor for the page older than this run; a
+        message's own ``page_token`` key, when present, overrides it.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+            self._upsert_conversation(conversation_id, user_id, older_token)
+            self._insert(conversation_id, messages, start_seq=0, step=1, page_token=older_token)
+        self._after_write(len(messages))
+
+    def append_newer(self, conversation_id, messages, page_token=None):
+        """
+        Append messages newer than everything stored (chronological order).
+
+        A message's own ``page_token`` key, when present, overrides ``page_token``.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT MAX(seq) AS seq FROM messages WHERE conversation_id = ?", (conversation_id,)
+            ).fetchone()
+            start = (row["seq"] if row["seq"] is not None else -1) + 1
+            inserted = self._insert(conversation_id, messages, start_seq=start, step=1, page_token=page_token)
+            self._conn.execute(
+                "UPDATE conversations SET last_synced = ? WHERE id = ?", (time.time(), conversation_id)
+            )
+        self._after_write(inserted)
+
+    def prepend_older(self, conversation_id, messages, older_token):
+        """Prepend an older API page (chronological) and move the older cursor past it"""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT MIN(seq) AS seq FROM messages WHERE conversation_id = ?", (conversation_id,)
+            ).fetchone()
+            start = (row["seq"] if row["seq"] is not None else 0) - 1
+            inserted = self._insert(
+                conversation_id, list(reversed(messages)), start_seq=start, step=-1, page_token=older_token
+            )
+            self._conn.execute(
+                "UPDATE conversations SET older_token = ?, complete = ? WHERE id = ?",
+                (older_token, int(older_token is None), conversation_id),
+            )
+        self._after_write(inserted)
+
+    def _upsert_conversation(self, conversation_id, user_id, older_token):
+        self._conn.execute(
+            "INSERT INTO conversations (id, user_id, older_token, complete, last_synced, last_accessed) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+            "user_id = excluded.user_id, older_token = excluded.older_token, "
+            "complete = excluded.complete, last_synced = excluded.last_synced",
+            (conversation_id, user_id, older_token, int(older_token is None), time.time(), time.time()),
+        )
+
+    def _insert(self, conversation_id, messages, start_seq, step, page_token):
+        """Insert messages not already stored; ids seen before are skipped"""
+        rows = []
+        seq = start_seq
+        for message in messages:
+            if not message.get("id"):
+                continue
+            rows.append((
+                message["id"], conversation_id, seq, message["role"],
+                message["content"], int(bool(message.get("is_html"))),
+                message.get("page_token", page_token),
+            ))
+            seq += step
+        before = self._conn.total_changes
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO messages (id, conversation_id, seq, role, content, is_html, page_token) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        return self._conn.total_changes - before
+
+    @staticmethod
+    def _row_to_message(row):
+        return {
+            "id": row["id"],
+            "role": row["role"],
+            "content": row["content"],
+            "is_html": bool(row["is_html"]),
+            "seq": row["seq"],
+        }
+
+    # --- Size limits and compaction ---
+
+    def _after_write(self, inserted):
+        self._writes_since_compact += inserted
+        if self._writes_since_compact >= COMPACT_EVERY_WRITES:
+            self.compact()
+
+    def size_bytes(self):
+        """Bytes in use by the database, excluding free pages"""
+        with self._lock:
+            page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            free_pages = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+            page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+        return (page_count - free_pages) * page_size
+
+    def compact(self):
+        """
+        Enforce size limits.
+
+        1. Trim each conversation to ``max_messages_per_conversation``, dropping
+           whole API pages so ``older_token`` still resumes exactly where the
+           stored run ends.
+        2. While the database exceeds ``max_bytes``, evict the least recently
+           accessed conversation.
+        3. Checkpoint the WAL and release free pages (incremental vacuum).
+        """
+        self._writes_since_compact = 0
+        with self._lock, self._conn:
+            over = self._conn.execute(
+                "SELECT conversation_id FROM messages GROUP BY conversation_id HAVING COUNT(*) > ?",
+                (self.max_messages_per_conversation,),
+            ).fetchall()
+            for row in over:
+                self._trim_conversation(row["conversation_id"])
+
+        while self.size_bytes() > self.max_bytes:
+            with self._lock, self._conn:
+                victim = self._conn.execute(
+                    "SELECT id FROM conversations WHERE last_synced IS NOT NULL "
+                    "ORDER BY last_accessed ASC LIMIT 1"
+                ).fetchone()
+                if victim is None:
+                    break
+                self._conn.execute("DELETE FROM messages WHERE conversation_id = ?", (victim["id"],))
+                self._conn.execute(
+                    "UPDATE conversations SET last_synced = NULL, older_token = NULL, complete = 0 WHERE id = ?",
+                    (victim["id"],),
+                )
+
+        self._checkpoint()
+
+    def _trim_conversation(self, conversation_id):
+        cutoff = self._conn.execute(
+            "SELECT seq, page_token FROM messages WHERE conversation_id = ? "
+            "ORDER BY seq DESC LIMIT 1 OFFSET ?",
+            (conversation_id, self.max_messages_per_conversation - 1),
+        ).fetchone()
+        if cutoff is None:
+            return
+        # Keep the whole page the cutoff message belongs to
+        keep_from = self._conn.execute(
+            "SELECT MIN(seq) AS seq FROM messages WHERE conversation_id = ? AND page_token IS ?",
+            (conversation_id, cutoff["page_token"]),
+        ).fetchone()["seq"]
+        self._conn.execute(
+            "DELETE FROM messages WHERE conversation_id = ? AND seq < ?", (conversation_id, keep_from)
+        )
+        self._conn.execute(
+            "UPDATE conversations SET older_token = ?, complete = ? WHERE id = ?",
+            (cutoff["page_token"], int(cutoff["page_token"] is None), conversation_id),
+        )
+
+    def _checkpoint(self):
+        with self._lock:
+            self._conn.execute("PRAGMA incremental_vacuum")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,270 @@
+"""
+GameVerse License Store
+Allocates per-game license keys to orders, never issuing a key twice
+"""
+
+import base64
+import secrets
+import threading
+import time
+
+from data.storage import connect, db_path
+
+DB_NAME = "licenses.db"
+
+INITIAL_STOCK = 500  # keys provisioned the first time a game is sold
+RESERVATION_BLOCK = 32  # keys moved from the database into memory per refill
+RESERVATION_LEASE = 3600  # seconds a reservation holds before other allocators may reclaim it
+
+AVAILABLE = "available"
+RESERVED = "reserved"
+ISSUED = "issued"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS license_keys (
+    license_key TEXT PRIMARY KEY,
+    game_id INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'available',
+    reserved_by TEXT,
+    reserved_at REAL,
+    order_id TEXT,
+    user_id TEXT,
+    issued_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_license_keys_game_status ON license_keys (game_id, status);
+CREATE INDEX IF NOT EXISTS idx_license_keys_order ON license_keys (order_id);
+CREATE INDEX IF NOT EXISTS idx_license_keys_user ON license_keys (user_id);
+"""
+
+
+class LicenseConflictError(Exception):
+    """Reserved keys were reclaimed by another allocator before they could be issued"""
+
+    def __init__(self, order_id, keys):
+        super().__init__(f"License key conflict while issuing order {order_id}")
+        self.keys = keys
+
+
+class SoldOutError(Exception):
+    """No license keys left for one or more games in an order"""
+
+    def __init__(self, game_ids):
+        super().__init__(f"No license keys left for game(s) {', '.join(map(str, game_ids))}")
+        self.game_ids = game_ids
+
+
+def generate_key():
+    """Random key formatted like XXXX-XXXX-XXXX-XXXX"""
+    raw = base64.b32encode(secrets.token_bytes(10)).decode()
+    return "-".join(raw[i:i + 4] for i in range(0, 16, 4))
+
+
+class LicenseAllocator:
+    """
+    Hands out license keys per game, atomically and all-or-nothing per order.
+
+    Keys move ``available`` -> ``reserved`` -> ``issued``. Each game has an
+    in-memory pool of reserved keys refilled ``block_size`` at a time, so a
+    checkout holds a game's lock only long enough to pop a key, and the
+    database sees one refill per block instead of one per sale. Issuing is a
+    conditional ``reserved`` -> ``issued`` update for the whole order in one
+    transaction; a key that is not reserved any more fails the order rather
+    than being issued twice.
+
+    Several allocators (processes) may share a database. Each reservation
+    records the allocator holding it, which only issues and releases its own
+    keys. Reservations left behind by a process that stopped without
+    ``close`` lapse after ``lease`` seconds and are then reserved again by
+    whichever allocator refills next; pools older than half the lease are
+    returned and refilled so a live allocator never holds a lapsed key.
+    """
+
+    def __init__(self, path=None, block_size=RESERVATION_BLOCK, initial_stock=INITIAL_STOCK,
+                 lease=RESERVATION_LEASE):
+        self.path = path or db_path(DB_NAME)
+        self.block_size = block_size
+        self.initial_stock = initial_stock
+        self.lease = lease
+        self.owner = secrets.token_hex(8)  # tags this allocator's reservations
+        self._conn = connect(self.path)
+        self._conn.executescript(SCHEMA)
+        self._add_reservation_columns()
+        self._db_lock = threading.Lock()
+        self._registry_lock = threading.Lock()
+        self._pools = {}
+        self._pool_reserved_at = {}
+        self._pool_locks = {}
+        self._stats_lock = threading.Lock()
+        self.stats = {"allocations": 0, "sold_out": 0, "takes": 0, "contended": 0, "refills": 0}
+
+    def _add_reservation_columns(self):
+        """Databases created before reservations had owners lack their columns"""
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(license_keys)")}
+        with self._conn:
+            for column, kind in (("reserved_by", "TEXT"), ("reserved_at", "REAL")):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE license_keys ADD COLUMN {column} {kind}")
+
+    # --- Allocation ---
+
+    def allocate(self, order_id, user_id, game_ids):
+        """
+        Issue one key per game to an order
+
+        Args:
+            order_id: Order the keys belong to
+            user_id: Store user receiving the keys
+            game_ids: Games in the order
+
+        Returns:
+            dict: game id -> license key
+
+        Raises:
+            SoldOutError: A game has no keys left; nothing is issued
+        """
+        taken = {}
+        sold_out = []
+        for game_id in sorted({int(game_id) for game_id in game_ids}):
+            key = self._take(game_id)
+            if key is None:
+                sold_out.append(game_id)
+            else:
+                taken[game_id] = key
+
+        if sold_out:
+            self._count("sold_out")
+            self._give_back(taken)
+            raise SoldOutError(sold_out)
+
+        try:
+            self._issue(order_id, user_id, taken)
+        except LicenseConflictError as e:
+            # Keys another allocator reclaimed are no longer ours to hand out
+            self._give_back({game_id: key for game_id, key in taken.items() if key not in e.keys})
+            raise
+        except Exception:
+            self._give_back(taken)
+            raise
+        self._count("allocations")
+        return taken
+
+    def release(self, order_id):
+        """Return an order's keys to stock (e.g. when the order could not be recorded)"""
+        with self._db_lock, self._conn:
+            self._conn.execute(
+                "UPDATE license_keys SET status = ?, reserved_by = NULL, reserved_at = NULL, order_id = NULL, "
+                "user_id = NULL, issued_at = NULL WHERE order_id = ?",
+                (AVAILABLE, order_id),
+            )
+
+    def _take(self, game_id):
+        lock = self._pool_lock(game_id)
+        self._count("takes")
+        if not lock.acquire(blocking=False):
+            self._count("contended")
+            lock.acquire()
+        try:
+            pool = self._pools.setdefault(game_id, [])
+            if pool and time.time() - self._pool_reserved_at[game_id] > self.lease / 2:
+                self._unreserve(pool)
+                pool.clear()
+            if not pool:
+                self._refill(game_id, pool)
+            return pool.pop() if pool else None
+        finally:
+            lock.release()
+
+    def _give_back(self, taken):
+        for game_id, key in taken.items():
+            with self._pool_lock(game_id):
+                self._pools[game_id].append(key)
+
+    def _pool_lock(self, game_id):
+        with self._registry_lock:
+            return self._pool_locks.setdefault(game_id, threading.Lock())
+
+    def _refill(self, game_id, pool):
+        """Reserve the next block of available keys for this process"""
+        with self._db_lock, self._conn:
+            stocked = self._conn.execute(
+                "SELECT 1 FROM license_keys WHERE game_id = ? LIMIT 1", (game_id,)
+            ).fetchone()
+            if stocked is None:
+                self._conn.executemany(
+                    "INSERT INTO license_keys (license_key, game_id) VALUES (?, ?)",
+                    [(generate_key(), game_id) for _ in range(self.initial_stock)],
+                )
+            reserved_at = time.time()
+            keys = [row["license_key"] for row in self._conn.execute(
+                "SELECT license_key FROM license_keys WHERE game_id = ? "
+                "AND (status = ? OR (status = ? AND reserved_at < ?)) LIMIT ?",
+                (game_id, AVAILABLE, RESERVED, reserved_at - self.lease, self.block_size),
+            )]
+            self._conn.executemany(
+                "UPDATE license_keys SET status = ?, reserved_by = ?, reserved_at = ? WHERE license_key = ?",
+                [(RESERVED, self.owner, reserved_at, key) for key in keys],
+            )
+        pool.extend(keys)
+        self._pool_reserved_at[game_id] = reserved_at
+        self._count("refills")
+
+    def _issue(self, order_id, user_id, taken):
+        issued_at = time.time()
+        keys = list(taken.values())
+        with self._db_lock, self._conn:
+            cursor = self._conn.executemany(
+                "UPDATE license_keys SET status = ?, order_id = ?, user_id = ?, issued_at = ? "
+                "WHERE license_key = ? AND status = ? AND reserved_by = ?",
+                [(ISSUED, order_id, user_id, issued_at, key, RESERVED, self.owner) for key in keys],
+            )
+            if cursor.rowcount != len(taken):
+                issued = {row["license_key"] for row in self._conn.execute(
+                    f"SELECT license_key FROM license_keys WHERE order_id = ? "
+                    f"AND license_key IN ({','.join('?' * len(keys))})",
+                    (order_id, *keys),
+                )}
+                # Raising inside the transaction rolls the whole order back
+                raise LicenseConflictError(order_id, [key for key in keys if key not in issued])
+
+    def _unreserve(self, keys):
+        """Return this allocator's reserved keys to stock"""
+        with self._db_lock, self._conn:
+            self._conn.executemany(
+                "UPDATE license_keys SET status = ?, reserved_by = NULL, reserved_at = NULL "
+                "WHERE license_key = ? AND status = ? AND reserved_by = ?",
+                [(AVAILABLE, key, RESERVED, self.owner) for key in keys],
+            )
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    # --- Reads ---
+
+    def keys_for_user(self, user_id):
+        """(order id, game id) -> license key for everything issued to a user"""
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT order_id, game_id, license_key FROM license_keys WHERE user_id = ? AND status = ?",
+                (user_id, ISSUED),
+            ).fetchall()
+        return {(row["order_id"], row["game_id"]): row["license_key"] for row in rows}
+
+    def available(self, game_id):
+        """Keys left for a game, including ones reserved in memory"""
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) AS n FROM license_keys WHERE game_id = ? AND status != ?", (int(game_id), ISSUED)
+            ).fetchone()
+        return row["n"]
+
+    def close(self):
+        """Return this allocator's unissued reservations to stock and close the database"""
+        with self._db_lock:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE license_keys SET status = ?, reserved_by = NULL, reserved_at = NULL "
+                    "WHERE status = ? AND reserved_by = ?",
+                    (AVAILABLE, RESERVED, self.owner),
+                )
+            self._conn.close()
@@ -0,0 +1,221 @@
+"""
+GameVerse Order Ledger
+Append-only record of checkouts with per-user running aggregates
+"""
+
+import queue
+import threading
+import time
+import uuid
+
+from data.storage import connect, db_path
+
+DB_NAME = "orders.db"
+
+MAX_GROUP = 256  # orders committed per transaction at most
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    order_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    item_count INTEGER NOT NULL,
+    total REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS order_items (
+    order_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    game_id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    price REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_orders_user ON orders (user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_order_items_user ON order_items (user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_order_items_game ON order_items (game_id, created_at);
+CREATE TABLE IF NOT EXISTS user_totals (
+    user_id TEXT PRIMARY KEY,
+    order_count INTEGER NOT NULL DEFAULT 0,
+    games_owned INTEGER NOT NULL DEFAULT 0,
+    total_spent REAL NOT NULL DEFAULT 0,
+    last_order_at REAL
+);
+CREATE TABLE IF NOT EXISTS game_totals (
+    game_id INTEGER PRIMARY KEY,
+    units_sold INTEGER NOT NULL DEFAULT 0,
+    revenue REAL NOT NULL DEFAULT 0
+);
+"""
+
+
+def new_order_id():
+    return f"GV-{uuid.uuid4().hex[:12].upper()}"
+
+
+class OrderLedger:
+    """
+    Append-only order ledger (SQLite, WAL).
+
+    Orders and their line items are only ever inserted. ``user_totals`` and
+    ``game_totals`` hold running aggregates maintained in the same
+    transaction, so profile stats are a single primary-key read.
+
+    ``record_order`` blocks until its order is durable, but concurrent
+    checkouts are group-committed: the writer thread gathers every order
+    waiting at that moment into one transaction and one fsync.
+    """
+
+    def __init__(self, path=None, max_group=MAX_GROUP):
+        self.path = path or db_path(DB_NAME)
+        self.max_group = max_group
+        self._conn = connect(self.path)
+        self._conn.execute("PRAGMA synchronous=FULL")  # orders must survive power loss
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="order-ledger-writer", daemon=True)
+        self._writer.start()
+
+    # --- Writes ---
+
+    def record_order(self, user_id, items, order_id=None):
+        """
+        Append an order and wait until it is committed.
+
+        Args:
+            user_id: Store user placing the order
+            items: List of dicts with ``id``, ``title`` and ``price``
+            order_id: Id to record under (defaults to a new one)
+
+        Returns:
+            dict: The recorded order (``order_id``, ``created_at``, ``total``, ``items``)
+        """
+        order = {
+            "order_id": order_id or new_order_id(),
+            "user_id": user_id,
+            "created_at": time.time(),
+            "items": [
+                {"game_id": int(item["id"]), "title": item["title"], "price": float(item["price"])}
+                for item in items
+            ],
+        }
+        order["total"] = round(sum(item["price"] for item in order["items"]), 2)
+
+        pending = {"order": order, "done": threading.Event(), "error": None}
+        self._queue.put(pending)
+        pending["done"].wait()
+        if pending["error"] is not None:
+            raise pending["error"]
+        return order
+
+    def _write_loop(self):
+        while True:
+            group = [self._queue.get()]
+            while len(group) < self.max_group:
+                try:
+                    group.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._commit(group)
+            except Exception as e:
+                # The transaction itself failed; nothing in the group was recorded
+                for pending in group:
+                    pending["error"] = pending["error"] or e
+            for pending in group:
+                pending["done"].set()
+
+    def _commit(self, group):
+        """
+        Write a group of orders in one transaction
+
+        Each order gets its own savepoint, so one that fails (e.g. a duplicate
+        order id) is rolled back and reported on its own while the rest of the
+        group commits.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            for pending in group:
+                self._conn.execute("SAVEPOINT order_write")
+                try:
+                    self._insert_order(pending["order"])
+                except Exception as e:
+                    self._conn.execute("ROLLBACK TO order_write")
+                    pending["error"] = e
+                self._conn.execute("RELEASE order_write")
+
+    def _insert_order(self, order):
+        user_id = order["user_id"]
+        items = order["items"]
+        game_ids = [item["game_id"] for item in items]
+
+        already_owned = {
+            row["game_id"] for row in self._conn.execute(
+                f"SELECT DISTINCT game_id FROM order_items WHERE user_id = ? "
+                f"AND game_id IN ({','.join('?' * len(game_ids))})",
+                (user_id, *game_ids),
+            )
+        } if game_ids else set()
+        newly_owned = len(set(game_ids) - already_owned)
+
+        self._conn.execute(
+            "INSERT INTO orders (order_id, user_id, created_at, item_count, total) VALUES (?, ?, ?, ?, ?)",
+            (order["order_id"], user_id, order["created_at"], len(items), order["total"]),
+        )
+        self._conn.executemany(
+            "INSERT INTO order_items (order_id, user_id, game_id, title, price, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (order["order_id"], user_id, item["game_id"], item["title"], item["price"], order["created_at"])
+                for item in items
+            ],
+        )
+        self._conn.execute(
+            "INSERT INTO user_totals (user_id, order_count, games_owned, total_spent, last_order_at) "
+            "VALUES (?, 1, ?, ?, ?) ON CONFLICT(user_id) DO UPDATE SET "
+            "order_count = order_count + 1, games_owned = games_owned + excluded.games_owned, "
+            "total_spent = ROUND(total_spent + excluded.total_spent, 2), last_order_at = excluded.last_order_at",
+            (user_id, newly_owned, order["total"], order["created_at"]),
+        )
+        self._conn.executemany(
+            "INSERT INTO game_totals (game_id, units_sold, revenue) VALUES (?, 1, ?) "
+            "ON CONFLICT(game_id) DO UPDATE SET units_sold = units_sold + 1, revenue = ROUND(revenue + excluded.revenue, 2)",
+            [(item["game_id"], item["price"]) for item in items],
+        )
+
+    # --- Reads ---
+
+    def get_user_summary(self, user_id):
+        """Running totals for a user: order_count, games_owned, total_spent, last_order_at"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM user_totals WHERE user_id = ?", (user_id,)).fetchone()
+        if row is None:
+            return {"order_count": 0, "games_owned": 0, "total_spent": 0.0, "last_order_at": None}
+        return {key: row[key] for key in ("order_count", "games_owned", "total_spent", "last_order_at")}
+
+    def get_purchase_history(self, user_id, limit=50):
+        """Most recent purchased items for a user, newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT order_id, game_id, title, price, created_at FROM order_items "
+                "WHERE user_id = ? ORDER BY created_at DESC LIMIT ?",
+                (user_id, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_owned_game_ids(self, user_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT game_id FROM order_items WHERE user_id = ?", (user_id,)
+            ).fetchall()
+        return {row["game_id"] for row in rows}
+
+    def get_game_sales(self, game_id):
+        """Running totals for a game: units_sold, revenue"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM game_totals WHERE game_id = ?", (int(game_id),)).fetchone()
+        return {"units_sold": row["units_sold"], "revenue": row["revenue"]} if row else {"units_sold": 0, "revenue": 0.0}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
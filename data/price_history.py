@@ -0,0 +1,155 @@
+"""
+GameVerse Price History Store
+Per-game price history, wishlist alert subscriptions and delivered price-drop alerts
+"""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from data.storage import connect, db_path
+
+DB_NAME = "prices.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS price_history (
+    game_id INTEGER NOT NULL,
+    price REAL NOT NULL,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_price_history_game ON price_history (game_id, recorded_at);
+CREATE TABLE IF NOT EXISTS alert_subscriptions (
+    user_id TEXT PRIMARY KEY
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS price_alerts (
+    user_id TEXT NOT NULL,
+    game_id INTEGER NOT NULL,
+    old_price REAL NOT NULL,
+    new_price REAL NOT NULL,
+    created_at REAL NOT NULL,
+    seen INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_price_alerts_user ON price_alerts (user_id, seen);
+"""
+
+CHANGE_COLUMNS = ["game_id", "old_price", "new_price"]
+
+
+class PriceHistoryStore:
+    """
+    SQLite (WAL) store of catalog prices over time.
+
+    Only changes are written: ``record_prices`` compares a whole catalog
+    against the latest known prices (kept in memory as a Series indexed by
+    game id) in one vectorized pass and appends a row per changed game.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or db_path(DB_NAME)
+        self._lock = threading.Lock()
+        self._conn = connect(self.path)
+        self._conn.executescript(SCHEMA)
+        self._latest = self._load_latest()
+
+    def _load_latest(self):
+        latest = pd.read_sql_query(
+            "SELECT game_id, price FROM price_history p WHERE recorded_at = "
+            "(SELECT MAX(recorded_at) FROM price_history WHERE game_id = p.game_id)",
+            self._conn,
+        )
+        return pd.Series(latest["price"].to_numpy(dtype=float), index=latest["game_id"].to_numpy(dtype=np.int64))
+
+    # --- Prices ---
+
+    def record_prices(self, game_ids, prices, recorded_at=None):
+        """
+        Record a catalog's prices, storing only what changed
+
+        Args:
+            game_ids: Array of game ids
+            prices: Array of current prices, aligned with game_ids
+            recorded_at: Timestamp (defaults to now)
+
+        Returns:
+            pd.DataFrame: game_id, old_price, new_price for games whose price
+            changed. Games seen for the first time are recorded but not
+            returned, since there is nothing to compare against.
+        """
+        current = pd.Series(np.asarray(prices, dtype=float), index=np.asarray(game_ids, dtype=np.int64))
+        with self._lock:
+            previous = self._latest.reindex(current.index)
+            new_mask = previous.isna().to_numpy()
+            changed_mask = ~new_mask & ~np.isclose(previous.to_numpy(), current.to_numpy())
+            write_mask = new_mask | changed_mask
+            if write_mask.any():
+                recorded_at = recorded_at or time.time()
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT INTO price_history (game_id, price, recorded_at) VALUES (?, ?, ?)",
+                        zip(current.index[write_mask].tolist(), current.to_numpy()[write_mask].tolist(),
+                            [recorded_at] * int(write_mask.sum())),
+                    )
+                self._latest = current.combine_first(self._latest)
+        return pd.DataFrame({
+            "game_id": current.index[changed_mask],
+            "old_price": previous.to_numpy()[changed_mask],
+            "new_price": current.to_numpy()[changed_mask],
+        }, columns=CHANGE_COLUMNS)
+
+    def get_history(self, game_id):
+        """Price changes for one game, oldest first, as a DataFrame of price, recorded_at"""
+        with self._lock:
+            return pd.read_sql_query(
+                "SELECT price, recorded_at FROM price_history WHERE game_id = ? ORDER BY recorded_at",
+                self._conn, params=(int(game_id),),
+            )
+
+    # --- Alert subscriptions ---
+
+    def set_alerts_enabled(self, user_id, enabled):
+        with self._lock, self._conn:
+            if enabled:
+                self._conn.execute("INSERT OR IGNORE INTO alert_subscriptions (user_id) VALUES (?)", (user_id,))
+            else:
+                self._conn.execute("DELETE FROM alert_subscriptions WHERE user_id = ?", (user_id,))
+
+    def alerts_enabled(self, user_id):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM alert_subscriptions WHERE user_id = ?", (user_id,)).fetchone()
+        return row is not None
+
+    def subscribers(self):
+        """Array of user ids that opted into price-drop alerts"""
+        with self._lock:
+            rows = self._conn.execute("SELECT user_id FROM alert_subscriptions").fetchall()
+        return np.array([row["user_id"] for row in rows], dtype=object)
+
+    # --- Alerts ---
+
+    def save_alerts(self, events):
+        """Store a batch of drop events (DataFrame of user_id, game_id, old_price, new_price, created_at)"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO price_alerts (user_id, game_id, old_price, new_price, created_at) VALUES (?, ?, ?, ?, ?)",
+                events[["user_id", "game_id", "old_price", "new_price", "created_at"]].itertuples(index=False, name=None),
+            )
+
+    def take_unseen_alerts(self, user_id):
+        """Return a user's undelivered alerts, newest first, and mark them seen"""
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT rowid, game_id, old_price, new_price, created_at FROM price_alerts "
+                "WHERE user_id = ? AND seen = 0 ORDER BY created_at DESC",
+                (user_id,),
+            ).fetchall()
+            if rows:
+                self._conn.executemany(
+                    "UPDATE price_alerts SET seen = 1 WHERE rowid = ?", [(row["rowid"],) for row in rows]
+                )
+        return [{key: row[key] for key in ("game_id", "old_price", "new_price", "created_at")} for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,34 @@
+"""
+GameVerse Local Storage
+Shared location and connection settings for on-disk SQLite stores
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+
+DATA_DIR = Path(os.getenv("GAMEVERSE_DATA_DIR", Path(__file__).resolve().parent.parent / "storage"))
+
+
+def db_path(name):
+    """Path of a store's database file inside the data directory"""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    return DATA_DIR / name
+
+
+def connect(path):
+    """
+    Open a SQLite connection in WAL mode
+
+    WAL lets readers proceed while a write is in progress; synchronous=NORMAL
+    only fsyncs at checkpoints, which is safe in WAL mode. Use the connection
+    as a context manager for atomic writes. Connections are shared across
+    Streamlit script threads, so callers serialize access.
+    """
+    conn = sqlite3.connect(str(path), check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")  # only takes effect on a new database
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
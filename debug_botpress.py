@@ -3,10 +3,14 @@ Debug script to test Botpress connection
 Run this to diagnose authentication issues
 """
 
+import os
 import requests
 import json
 from pathlib import Path
 
+# Override to test against a local mock (see mock_botpress_server.py)
+BASE_URI = os.getenv("BOTPRESS_BASE_URI", "https://chat.botpress.cloud")
+
 def load_secrets():
     """Load secrets from secrets.toml"""
     secrets_path = Path(".streamlit") / "secrets.toml"
@@ -36,7 +40,7 @@ def load_secrets():
 
 def test_connection(chat_api_id, user_key):
     """Test connection to Botpress API"""
-    base_url = f"https://chat.botpress.cloud/{chat_api_id}"
+    base_url = f"{BASE_URI.rstrip('/')}/{chat_api_id}"
     
     print(f"\n🔗 Testing connection to: {base_url}")
     print(f"🔑 Using user key: {user_key[:10]}..." if user_key else "❌ No user key provided")
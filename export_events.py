@@ -0,0 +1,38 @@
+"""
+Event Export
+Writes the analytics event log as day/event-type partitioned Parquet
+
+Days whose log segments have not changed since their last export are
+skipped, so this is cheap to run from cron. The log is only read, so this
+can run while the app is writing it. Read the result with any Parquet
+reader (Hive partitioning) or with data.event_export.read_exported.
+
+    python export_events.py --days 30 --out /mnt/warehouse/gameverse/events
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from data.event_export import export_events, export_root
+from data.event_log import EventLogReader
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the event log as partitioned Parquet.")
+    parser.add_argument("--days", type=int, help="Only export the last N days (default: everything).")
+    parser.add_argument("--out", type=Path, help="Export directory (default: storage/exports/events).")
+    args = parser.parse_args()
+
+    start = time.time() - args.days * 86400 if args.days else None
+    started = time.perf_counter()
+    exported = export_events(EventLogReader(), root=args.out, start=start)
+    elapsed = time.perf_counter() - started
+
+    for day, rows in exported.items():
+        print(f"{day}: {rows:,} events")
+    print(f"Exported {len(exported)} day(s) to {export_root(args.out)} in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
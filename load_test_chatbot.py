@@ -0,0 +1,140 @@
+"""
+Chatbot Load Test Harness
+Drives N concurrent simulated users against the mock Botpress server
+
+Each user creates an account and a conversation, then sends messages and
+polls for the bot reply the same way the AI Assistant page does. Reports
+reply latency percentiles and HTTP requests spent per reply.
+
+    python load_test_chatbot.py --users 50 --messages 5 --reply-delay 0.8
+"""
+
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from mock_botpress_server import PAYLOAD_TYPES, parse_payload_types, server_base_uri, start_server
+from utils.botpress_client import BotpressClient
+
+API_ID = "load-test"
+
+_results_lock = threading.Lock()
+
+
+def _count(results, key):
+    with _results_lock:
+        results[key] += 1
+
+
+def await_reply(client, conversation_id, user_id, poll_interval, timeout):
+    """Poll for a bot message newer than the one we sent, like views.chatbot does"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(poll_interval)
+        messages = client.list_messages(conversation_id, limit=5, ignore_cache=True).get("messages", [])
+        if messages and messages[0].get("userId") != user_id:
+            return True
+    return False
+
+
+def simulate_user(base_uri, index, args, results):
+    """Run one simulated user session and append per-reply latencies to results"""
+    client = BotpressClient(api_id=API_ID, base_uri=base_uri)
+    try:
+        user = client.create_and_set_user(f"Load User {index}", f"load_user_{index:05d}")
+        if "error" in user:
+            _count(results, "failed_setup")
+            return
+        user_id = user["user"]["id"]
+
+        conversation = client.create_conversation()
+        if "error" in conversation:
+            _count(results, "failed_setup")
+            return
+        conversation_id = conversation["conversation"]["id"]
+
+        for n in range(args.messages):
+            started = time.perf_counter()
+            sent = client.create_message(f"Message {n} from user {index}", conversation_id)
+            if "error" in sent:
+                _count(results, "failed_sends")
+                continue
+            if await_reply(client, conversation_id, user_id, args.poll_interval, args.timeout):
+                results["latencies"].append(time.perf_counter() - started)
+            else:
+                _count(results, "timeouts")
+            time.sleep(args.think_time)
+    finally:
+        client.close()
+
+
+def report(results, stats, elapsed, args):
+    latencies = np.array(results["latencies"])
+    replies = len(latencies)
+
+    print("=" * 60)
+    print("📊 CHATBOT LOAD TEST RESULTS")
+    print("=" * 60)
+    print(f"Users: {args.users} | Messages/user: {args.messages} | Wall time: {elapsed:.1f}s")
+    print(f"Mock reply delay: {args.reply_delay}s | Error rate: {args.error_rate:.0%} | Poll: {args.poll_interval}s")
+    print("")
+    print(f"Replies received:   {replies}")
+    print(f"Timeouts:           {results['timeouts']}")
+    print(f"Failed sends:       {results['failed_sends']}")
+    print(f"Failed setups:      {results['failed_setup']}")
+    print("")
+    if replies:
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(f"Reply latency p50:  {p50 * 1000:.0f} ms")
+        print(f"Reply latency p95:  {p95 * 1000:.0f} ms")
+        print(f"Reply latency p99:  {p99 * 1000:.0f} ms")
+        print(f"Requests per reply: {stats['requests'] / replies:.1f}")
+    print(f"Server requests:    {stats['requests']} ({stats['errors']} injected errors)")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the chatbot flow against a local mock Botpress server.")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent simulated users.")
+    parser.add_argument("--messages", type=int, default=3, help="Messages sent per user.")
+    parser.add_argument("--reply-delay", type=float, default=0.5, help="Mock bot reply delay in seconds.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of mock requests failing with 503.")
+    parser.add_argument(
+        "--payload-types",
+        type=parse_payload_types,
+        default=["text"],
+        help=f"Comma-separated reply types: {','.join(PAYLOAD_TYPES)}",
+    )
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="Seconds between reply polls.")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Seconds to wait for each reply.")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Pause between a reply and the next message.")
+    args = parser.parse_args()
+
+    server = start_server(
+        reply_delay=args.reply_delay,
+        error_rate=args.error_rate,
+        payload_types=args.payload_types,
+    )
+    base_uri = server_base_uri(server)
+    print(f"🤖 Mock server on {base_uri}, starting {args.users} users...")
+
+    results = {"latencies": [], "timeouts": 0, "failed_sends": 0, "failed_setup": 0}
+    threads = [
+        threading.Thread(target=simulate_user, args=(base_uri, i, args, results))
+        for i in range(args.users)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    report(results, server.state.stats(), elapsed, args)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
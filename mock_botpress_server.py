@@ -0,0 +1,380 @@
+"""
+Mock Botpress Chat API Server
+Local stand-in for chat.botpress.cloud for offline load and latency testing
+
+Point the app or BotpressClient at it with:
+    python mock_botpress_server.py --port 8765 --reply-delay 0.8
+    export BOTPRESS_BASE_URI="http://127.0.0.1:8765"
+"""
+
+import argparse
+import itertools
+import json
+import queue
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PAYLOAD_TYPES = ["text", "image", "card", "carousel", "choice"]
+
+SSE_PING_INTERVAL = 15  # seconds between keep-alive pings
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def build_reply_payload(payload_type, prompt):
+    """Build a bot reply payload of the given type"""
+    if payload_type == "image":
+        return {"type": "image", "image": "https://picsum.photos/250", "title": "Screenshot"}
+    if payload_type == "card":
+        return {
+            "type": "card",
+            "title": "Cyber Nexus 2077",
+            "subtitle": "$59.99 · Action",
+            "image": "https://picsum.photos/240/135",
+        }
+    if payload_type == "carousel":
+        return {
+            "type": "carousel",
+            "items": [
+                {"title": "Mystic Legends", "image": "https://picsum.photos/200/112"},
+                {"title": "Starbound Odyssey", "image": "https://picsum.photos/200/113"},
+                {"title": "Shadow Assassin", "image": "https://picsum.photos/200/114"},
+            ],
+        }
+    if payload_type == "choice":
+        return {
+            "type": "single-choice",
+            "text": "Which genre are you in the mood for?",
+            "choices": [{"title": "Action"}, {"title": "RPG"}, {"title": "Strategy"}],
+        }
+    return {"type": "text", "text": f"You said: {prompt}"}
+
+
+class MockState:
+    """In-memory users, conversations and messages plus request counters"""
+
+    def __init__(self, reply_delay=0.5, error_rate=0.0, payload_types=None, bot_id="mock-bot"):
+        self.reply_delay = reply_delay
+        self.error_rate = error_rate
+        self.payload_types = payload_types or ["text"]
+        self.bot_id = bot_id
+
+        self.lock = threading.Lock()
+        self.users = {}          # key -> user
+        self.conversations = {}  # id -> conversation
+        self.owners = {}         # conversation id -> id of the user who created it
+        self.messages = {}       # conversation id -> [message] (oldest first)
+        self.listeners = {}      # conversation id -> [queue.Queue]
+        self.idempotent = {}     # (user key, idempotency key) -> message
+        self._seq = itertools.count(1)
+
+        self.request_count = 0
+        self.error_count = 0
+        self.replies_sent = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "requests": self.request_count,
+                "errors": self.error_count,
+                "replies": self.replies_sent,
+            }
+
+    def create_user(self, name=None, user_id=None):
+        user = {
+            "id": user_id or f"user_{uuid.uuid4().hex[:12]}",
+            "name": name or "Mock User",
+            "createdAt": _now(),
+            "updatedAt": _now(),
+        }
+        key = f"mock-key-{uuid.uuid4().hex}"
+        with self.lock:
+            self.users[key] = user
+        return user, key
+
+    def create_conversation(self, owner_id):
+        conv = {"id": f"conv_{uuid.uuid4().hex[:12]}", "createdAt": _now(), "updatedAt": _now()}
+        with self.lock:
+            self.conversations[conv["id"]] = conv
+            self.owners[conv["id"]] = owner_id
+            self.messages[conv["id"]] = []
+        return conv
+
+    def add_message(self, conversation_id, user_id, payload):
+        message = {
+            "id": f"msg_{next(self._seq):012d}",
+            "createdAt": _now(),
+            "conversationId": conversation_id,
+            "userId": user_id,
+            "payload": payload,
+        }
+        with self.lock:
+            self.messages[conversation_id].append(message)
+            listeners = list(self.listeners.get(conversation_id, []))
+        event = json.dumps({"type": "message_created", "data": message})
+        for q in listeners:
+            q.put(event)
+        return message
+
+    def schedule_reply(self, conversation_id, prompt):
+        def reply():
+            payload_type = random.choice(self.payload_types)
+            self.add_message(conversation_id, self.bot_id, build_reply_payload(payload_type, prompt))
+            with self.lock:
+                self.replies_sent += 1
+
+        timer = threading.Timer(self.reply_delay, reply)
+        timer.daemon = True
+        timer.start()
+
+    def list_messages(self, conversation_id, limit=50, next_token=None):
+        """Newest first; nextToken is the offset of the next older page"""
+        with self.lock:
+            newest_first = list(reversed(self.messages[conversation_id]))
+        start = int(next_token) if next_token else 0
+        page = newest_first[start:start + limit]
+        meta = {}
+        if start + limit < len(newest_first):
+            meta["nextToken"] = str(start + limit)
+        return {"messages": page, "meta": meta}
+
+    def subscribe(self, conversation_id):
+        q = queue.Queue()
+        with self.lock:
+            self.listeners.setdefault(conversation_id, []).append(q)
+        return q
+
+    def unsubscribe(self, conversation_id, q):
+        with self.lock:
+            listeners = self.listeners.get(conversation_id, [])
+            if q in listeners:
+                listeners.remove(q)
+
+
+class MockBotpressHandler(BaseHTTPRequestHandler):
+    """Routes /{api_id}/... requests to MockState"""
+
+    protocol_version = "HTTP/1.1"
+
+    ROUTES = [
+        ("POST", re.compile(r"^/[^/]+/users$"), "create_user"),
+        ("GET", re.compile(r"^/[^/]+/users/me$"), "get_me"),
+        ("GET", re.compile(r"^/[^/]+/conversations$"), "list_conversations"),
+        ("POST", re.compile(r"^/[^/]+/conversations$"), "create_conversation"),
+        ("GET", re.compile(r"^/[^/]+/conversations/(?P<cid>[^/]+)$"), "get_conversation"),
+        ("GET", re.compile(r"^/[^/]+/conversations/(?P<cid>[^/]+)/messages$"), "list_messages"),
+        ("GET", re.compile(r"^/[^/]+/conversations/(?P<cid>[^/]+)/listen$"), "listen"),
+        ("POST", re.compile(r"^/[^/]+/messages$"), "create_message"),
+    ]
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def log_message(self, format, *args):
+        pass  # keep load tests quiet
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    # --- Plumbing ---
+
+    def _dispatch(self, method):
+        parsed = urlparse(self.path)
+        self.query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            self.body = json.loads(raw) if raw else {}
+        except json.JSONDecodeError:
+            self.body = {}
+
+        with self.state.lock:
+            self.state.request_count += 1
+
+        for route_method, pattern, handler_name in self.ROUTES:
+            match = pattern.match(parsed.path)
+            if match and route_method == method:
+                if handler_name != "listen" and random.random() < self.state.error_rate:
+                    with self.state.lock:
+                        self.state.error_count += 1
+                    return self._send_json(503, {"message": "Injected failure"})
+                return getattr(self, handler_name)(**match.groupdict())
+
+        self._send_json(404, {"message": f"No route for {method} {parsed.path}"})
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _current_user(self):
+        with self.state.lock:
+            return self.state.users.get(self.headers.get("x-user-key"))
+
+    def _require_user(self):
+        user = self._current_user()
+        if user is None:
+            self._send_json(401, {"message": "Invalid user key"})
+        return user
+
+    def _require_conversation(self, cid, user):
+        """Like the real API, another user's conversation is reported as not found"""
+        with self.state.lock:
+            found = self.state.owners.get(cid) == user["id"]
+        if not found:
+            self._send_json(404, {"message": f"Conversation {cid} not found"})
+        return found
+
+    # --- Endpoints ---
+
+    def create_user(self):
+        user, key = self.state.create_user(self.body.get("name"), self.body.get("id"))
+        self._send_json(200, {"user": user, "key": key})
+
+    def get_me(self):
+        user = self._require_user()
+        if user:
+            self._send_json(200, {"user": user})
+
+    def list_conversations(self):
+        user = self._require_user()
+        if user:
+            with self.state.lock:
+                conversations = [
+                    conv for cid, conv in self.state.conversations.items() if self.state.owners[cid] == user["id"]
+                ]
+            self._send_json(200, {"conversations": conversations, "meta": {}})
+
+    def create_conversation(self):
+        user = self._require_user()
+        if user:
+            self._send_json(200, {"conversation": self.state.create_conversation(user["id"])})
+
+    def get_conversation(self, cid):
+        user = self._require_user()
+        if user and self._require_conversation(cid, user):
+            self._send_json(200, {"conversation": self.state.conversations[cid]})
+
+    def list_messages(self, cid):
+        user = self._require_user()
+        if user and self._require_conversation(cid, user):
+            limit = int(self.query.get("limit", 50))
+            self._send_json(200, self.state.list_messages(cid, limit, self.query.get("nextToken")))
+
+    def create_message(self):
+        user = self._require_user()
+        if not user:
+            return
+        cid = self.body.get("conversationId")
+        if not self._require_conversation(cid, user):
+            return
+        # Replays of an already-accepted send return the original message
+        idempotency_key = self.headers.get("Idempotency-Key")
+        replay_key = (self.headers.get("x-user-key"), idempotency_key)
+        with self.state.lock:
+            previous = self.state.idempotent.get(replay_key) if idempotency_key else None
+        if previous:
+            return self._send_json(200, {"message": previous})
+        
+        payload = self.body.get("payload", {})
+        message = self.state.add_message(cid, user["id"], payload)
+        if idempotency_key:
+            with self.state.lock:
+                self.state.idempotent[replay_key] = message
+        self.state.schedule_reply(cid, payload.get("text", ""))
+        self._send_json(200, {"message": message})
+
+    def listen(self, cid):
+        user = self._require_user()
+        if not (user and self._require_conversation(cid, user)):
+            return
+        q = self.state.subscribe(cid)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            while True:
+                try:
+                    data = q.get(timeout=SSE_PING_INTERVAL)
+                except queue.Empty:
+                    data = "ping"
+                # One HTTP chunk per event so clients see it immediately
+                event = f"data: {data}\n\n".encode()
+                self.wfile.write(f"{len(event):x}\r\n".encode() + event + b"\r\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.state.unsubscribe(cid, q)
+
+
+def start_server(host="127.0.0.1", port=0, **state_kwargs):
+    """Start the mock server on a background thread and return it"""
+    server = ThreadingHTTPServer((host, port), MockBotpressHandler)
+    server.daemon_threads = True
+    server.state = MockState(**state_kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def server_base_uri(server):
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def parse_payload_types(value):
+    types = [t.strip() for t in value.split(",") if t.strip()]
+    unknown = set(types) - set(PAYLOAD_TYPES)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unknown payload types: {', '.join(sorted(unknown))}")
+    return types
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local mock of the Botpress Chat API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--reply-delay", type=float, default=0.5, help="Seconds before the bot replies.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503.")
+    parser.add_argument(
+        "--payload-types",
+        type=parse_payload_types,
+        default=["text"],
+        help=f"Comma-separated reply types to pick from: {','.join(PAYLOAD_TYPES)}",
+    )
+    args = parser.parse_args()
+
+    server = start_server(
+        args.host,
+        args.port,
+        reply_delay=args.reply_delay,
+        error_rate=args.error_rate,
+        payload_types=args.payload_types,
+    )
+    print(f"🤖 Mock Botpress Chat API listening on {server_base_uri(server)}/<chat_api_id>")
+    print("   Press Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -4,11 +4,18 @@ High-performance client with reliable cache invalidation and polling support.
 """
 
 import os
+import re
 import json
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
 import requests
 import sseclient
+from urllib.parse import urlencode
 from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from utils.metrics import ClientMetrics
 
 # Constants
 BASE_URI = "https://chat.botpress.cloud"
@@ -21,12 +28,172 @@ HEADERS = {
 DEFAULT_TIMEOUT = 30  # seconds
 STREAM_TIMEOUT = 120  # longer timeout for SSE streams
 
+# Retry / resilience settings
+CALL_BUDGET = 10  # total seconds a single call may spend, retries and backoff included
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RATE_LIMITED = 429  # retried after Retry-After, but not held against the endpoint's health
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# Circuit breaker settings (per method + path template)
+BREAKER_FAILURE_THRESHOLD = 5  # consecutive failures before the circuit opens
+BREAKER_RESET_TIMEOUT = 30  # seconds before a single trial call is let through
+
+# Pagination settings
+MESSAGE_PAGE_SIZE = 20  # messages per history page
+
+# Rendered payloads kept per client, keyed by message id
+RENDER_CACHE_SIZE = 2000
+
+# Precompiled rich media templates (styles baked in, only data is formatted)
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+
+_IMG_STYLE = 'width: 100%; height: auto; border-radius: 8px 8px 0 0;'
+_CARD_CONTAINER_STYLE = (
+    'border: 1px solid rgba(128, 128, 128, 0.2); '
+    'border-radius: 8px; '
+    'padding: 0px; '
+    'max-width: 240px; '
+    'margin: 5px 0; '
+    'overflow: hidden;'
+)
+_TEXT_PADDING = 'padding: 8px 10px;'
+
+IMAGE_TEMPLATE = '<img src="{image}" alt="{title}" style="max-width: 250px; width: auto; border-radius: 8px;">'
+CARD_IMAGE_TEMPLATE = f'<img src="{{image}}" style="{_IMG_STYLE}">'
+CARD_TEMPLATE = f'<div style="{_CARD_CONTAINER_STYLE}">{{image}}<div style="{_TEXT_PADDING}">{{body}}</div></div>'
+CARD_TITLE_TEMPLATE = '<div style="font-weight: 600; margin-bottom: 2px;">{title}</div>'
+CARD_SUBTITLE_TEMPLATE = '<div style="font-size: 0.85em; opacity: 0.8;">{subtitle}</div>'
+CAROUSEL_TEMPLATE = '<div style="display: flex; gap: 10px; overflow-x: auto; padding-bottom: 5px;">{items}</div>'
+CAROUSEL_ITEM_TEMPLATE = f'<div style="{_CARD_CONTAINER_STYLE} min-width: 200px;">{{image}}<div style="{_TEXT_PADDING}">{{body}}</div></div>'
+CAROUSEL_TITLE_TEMPLATE = '<div style="font-weight: 600;">{title}</div>'
+
+
+class _SingleFlight:
+    """
+    Coalesce concurrent identical calls into one.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait and receive the same result. The key is forgotten as soon
+    as the call finishes, so nothing is served after the fact.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, on_shared=None):
+        """Run fn once per in-flight key; on_shared() is called for each waiting caller"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {"done": threading.Event(), "result": None}
+        
+        if not leader:
+            if on_shared:
+                on_shared()
+            call["done"].wait()
+            return call["result"]
+        
+        try:
+            call["result"] = fn()
+        except Exception as e:
+            call["result"] = {"error": str(e)}
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call["done"].set()
+        return call["result"]
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail fast for ``reset_timeout`` seconds. Then one trial call is let
+    through (half-open): success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self):
+        """Return True if a call may go out now"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+_ID_SEGMENT = re.compile(r"^/conversations/[^/?]+")
+
+
+def path_template(path):
+    """Collapse ids and query strings so paths group by endpoint, e.g. /conversations/{id}/messages"""
+    path = path.split("?", 1)[0]
+    return _ID_SEGMENT.sub("/conversations/{id}", path)
+
+
+def retry_after_seconds(response):
+    """Delay asked for by a response's Retry-After header (seconds or HTTP date), or None"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def contains_html(text):
+    """Check if text contains HTML tags"""
+    return bool(HTML_TAG_PATTERN.search(text))
+
 
 class BotpressClient:
-    def __init__(self, api_id=None, user_key=None):
+    def __init__(self, api_id=None, user_key=None, base_uri=None, metrics=None):
         self.api_id = api_id or os.getenv("CHAT_API_ID")
         self.user_key = user_key or os.getenv("USER_KEY")
-        self.base_url = f"{BASE_URI}/{self.api_id}"
+        base_uri = base_uri or os.getenv("BOTPRESS_BASE_URI") or BASE_URI
+        self.base_url = f"{base_uri.rstrip('/')}/{self.api_id}"
         self.headers = {
             **HEADERS,
             "x-user-key": self.user_key,
@@ -38,22 +205,33 @@ class BotpressClient:
         # Cache for reducing redundant API calls
         self._conversation_cache = {}
         self._user_cache = None
+        self._render_cache = OrderedDict()
+        self._render_lock = threading.Lock()  # prefetch threads render too
+        
+        # Identical concurrent GETs share one in-flight HTTP call
+        self._inflight = _SingleFlight()
+        
+        # Per-endpoint latency histograms and counters, see utils.metrics
+        self.metrics = metrics if metrics is not None else ClientMetrics()
+        self._owns_metrics = metrics is None  # shared metrics outlive this client
+        metrics_file = os.getenv("BOTPRESS_METRICS_FILE")
+        if metrics_file:
+            self.metrics.start_periodic_dump(
+                metrics_file, interval=float(os.getenv("BOTPRESS_METRICS_INTERVAL", 60))
+            )
+        
+        # One circuit breaker per (method, path template)
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
 
     def _create_session(self):
-        """Create requests session with connection pooling and retry logic"""
+        """Create requests session with connection pooling"""
         session = requests.Session()
         
-        # Retry strategy for failed requests
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=0.5,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "POST", "PUT", "DELETE", "OPTIONS", "TRACE"]
-        )
-        
-        # Mount adapter with connection pooling
+        # Retries happen in _send so they respect the call budget and never
+        # replay a POST that has no idempotency key
         adapter = HTTPAdapter(
-            max_retries=retry_strategy,
+            max_retries=0,
             pool_connections=10,
             pool_maxsize=20
         )
@@ -63,90 +241,183 @@ class BotpressClient:
         
         return session
 
-    def _request(self, method, path, json_data=None, timeout=DEFAULT_TIMEOUT):
-        """Make HTTP request with proper error handling and timeouts"""
+    def _breaker(self, method, path):
+        key = (method, path_template(path))
+        with self._breakers_lock:
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker()
+            return self._breakers[key]
+
+    def _request(self, method, path, json_data=None, timeout=DEFAULT_TIMEOUT,
+                 idempotency_key=None, budget=CALL_BUDGET):
+        """Make HTTP request, coalescing identical concurrent GETs into one call"""
+        if method == "GET":
+            key = (self.headers.get("x-user-key"), path)
+            return self._inflight.do(
+                key,
+                lambda: self._send(method, path, json_data, timeout, budget=budget),
+                on_shared=lambda: self.metrics.record_coalesced(method, path_template(path)),
+            )
+        return self._send(method, path, json_data, timeout, idempotency_key, budget)
+
+    def _send(self, method, path, json_data=None, timeout=DEFAULT_TIMEOUT,
+              idempotency_key=None, budget=CALL_BUDGET):
+        """
+        Make HTTP request with retries, a circuit breaker and a total latency budget.
+
+        Retries only idempotent methods, or POSTs carrying an idempotency key,
+        and never past ``budget`` seconds in total; a Retry-After header sets
+        the wait, and a call gives up when that wait would overrun the budget.
+        Rate limiting (429) is not counted as an endpoint failure. While the
+        endpoint's circuit is open the call fails fast without touching the
+        network.
+        """
         url = f"{self.base_url}{path}"
-        try:
-            response = self.session.request(
-                method, 
-                url, 
-                headers=self.headers, 
-                json=json_data,
-                timeout=timeout
+        template = path_template(path)
+        breaker = self._breaker(method, path)
+        if not breaker.allow():
+            self.metrics.record_short_circuit(method, template)
+            return {"error": f"Botpress unavailable (circuit open for {template})"}
+        
+        headers = self.headers
+        if idempotency_key:
+            headers = {**headers, IDEMPOTENCY_HEADER: idempotency_key}
+        retryable = method in IDEMPOTENT_METHODS or idempotency_key is not None
+        started = time.monotonic()
+        deadline = started + budget
+        counters = {"timeouts": 0, "bytes_sent": 0, "bytes_received": 0}
+        
+        def finish(result, attempts):
+            self.metrics.record_call(
+                method,
+                template,
+                time.monotonic() - started,
+                retries=max(attempts - 1, 0),
+                error="error" in result,
+                timeout=counters["timeouts"] > 0,
+                bytes_sent=counters["bytes_sent"],
+                bytes_received=counters["bytes_received"],
             )
-            response.raise_for_status()
-            return response.json()
-        except requests.Timeout:
-            return {"error": "Request timed out"}
-        except requests.HTTPError as e:
-            return {"error": f"HTTP {response.status_code}: {response.text}"}
-        except Exception as e:
-            return {"error": str(e)}
+            return result
+        
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                breaker.record_failure()
+                counters["timeouts"] += 1
+                return finish({"error": "Request timed out"}, attempt)
+            
+            retry_after = None
+            rate_limited = False
+            try:
+                response = self.session.request(
+                    method, 
+                    url, 
+                    headers=headers, 
+                    json=json_data,
+                    timeout=min(timeout, remaining)
+                )
+                counters["bytes_sent"] += len(response.request.body or b"")
+                counters["bytes_received"] += len(response.content)
+                if response.status_code not in RETRY_STATUSES:
+                    breaker.record_success()
+                    response.raise_for_status()
+                    return finish(response.json(), attempt + 1)
+                error = {"error": f"HTTP {response.status_code}: {response.text}"}
+                retry_after = retry_after_seconds(response)
+                rate_limited = response.status_code == RATE_LIMITED
+            except requests.Timeout:
+                counters["timeouts"] += 1
+                error = {"error": "Request timed out"}
+            except requests.ConnectionError as e:
+                error = {"error": str(e)}
+            except requests.HTTPError as e:
+                return finish({"error": f"HTTP {response.status_code}: {response.text}"}, attempt + 1)
+            except Exception as e:
+                breaker.record_failure()
+                return finish({"error": str(e)}, attempt + 1)
+            
+            # Retryable failure: back off if the budget and circuit allow, else give up
+            if not rate_limited:
+                breaker.record_failure()
+            backoff = retry_after if retry_after is not None else BACKOFF_FACTOR * (2 ** attempt)
+            attempt += 1
+            if (not retryable or attempt > MAX_RETRIES or breaker.state == "open"
+                    or time.monotonic() + backoff >= deadline):
+                return finish(error, attempt)
+            time.sleep(backoff)
 
     def _parse_payload_to_markdown(self, payload):
         """Helper to convert rich media payloads (Image, Card, Carousel) into HTML/Markdown."""
         msg_type = payload.get("type")
-        
-        # CSS Styles
-        img_style = 'width: 100%; height: auto; border-radius: 8px 8px 0 0;'
-        card_container_style = (
-            'border: 1px solid rgba(128, 128, 128, 0.2); '
-            'border-radius: 8px; '
-            'padding: 0px; '
-            'max-width: 240px; '
-            'margin: 5px 0; '
-            'overflow: hidden;'
-        )
-        text_padding = 'padding: 8px 10px;'
 
         if msg_type == "image" and "image" in payload:
-            image_url = payload["image"]
-            title = payload.get("title", "Image")
-            return f'<img src="{image_url}" alt="{title}" style="max-width: 250px; width: auto; border-radius: 8px;">'
+            return IMAGE_TEMPLATE.format(
+                image=payload["image"], title=payload.get("title", "Image")
+            )
 
         elif msg_type == "card":
             title = payload.get("title", "")
             image = payload.get("image", "")
             subtitle = payload.get("subtitle", "")
-            
-            html_output = f'<div style="{card_container_style}">'
-            if image:
-                html_output += f'<img src="{image}" style="{img_style}">'
-            html_output += f'<div style="{text_padding}">'
-            if title:
-                html_output += f'<div style="font-weight: 600; margin-bottom: 2px;">{title}</div>'
-            if subtitle:
-                html_output += f'<div style="font-size: 0.85em; opacity: 0.8;">{subtitle}</div>'
-            html_output += '</div></div>'
-            return html_output
+            return CARD_TEMPLATE.format(
+                image=CARD_IMAGE_TEMPLATE.format(image=image) if image else "",
+                body=(CARD_TITLE_TEMPLATE.format(title=title) if title else "")
+                + (CARD_SUBTITLE_TEMPLATE.format(subtitle=subtitle) if subtitle else ""),
+            )
 
         elif msg_type == "carousel":
-            items = payload.get("items", [])
-            html_output = '<div style="display: flex; gap: 10px; overflow-x: auto; padding-bottom: 5px;">'
-            for item in items:
+            items = []
+            for item in payload.get("items", []):
                 title = item.get("title", "")
                 image = item.get("image", "")
-                html_output += f'<div style="{card_container_style} min-width: 200px;">'
-                if image:
-                    html_output += f'<img src="{image}" style="{img_style}">'
-                html_output += f'<div style="{text_padding}">'
-                if title:
-                    html_output += f'<div style="font-weight: 600;">{title}</div>'
-                html_output += '</div></div>'
-            html_output += '</div>'
-            return html_output
+                items.append(CAROUSEL_ITEM_TEMPLATE.format(
+                    image=CARD_IMAGE_TEMPLATE.format(image=image) if image else "",
+                    body=CAROUSEL_TITLE_TEMPLATE.format(title=title) if title else "",
+                ))
+            return CAROUSEL_TEMPLATE.format(items="".join(items))
 
         elif msg_type in ["single-choice", "choice"]:
             text = payload.get("text", "")
-            choices = payload.get("choices", [])
-            md_output = f"{text}\n\n"
-            for choice in choices:
+            lines = [f"{text}\n"]
+            for choice in payload.get("choices", []):
                 label = choice.get("title", choice.get("value", ""))
-                md_output += f"* {label}\n"
-            return md_output
+                lines.append(f"* {label}")
+            return "\n".join(lines) + "\n"
 
         return payload.get("text", "")
 
+    def render_message(self, message):
+        """
+        Render a message payload once and memoize it by message id.
+
+        Stores the display text in ``payload["text"]`` and the "is HTML" flag
+        in ``message["is_html"]`` so views can read both straight off the message.
+        """
+        msg_id = message.get("id")
+        cached = None
+        if msg_id:
+            with self._render_lock:
+                cached = self._render_cache.get(msg_id)
+                if cached is not None:
+                    self._render_cache.move_to_end(msg_id)
+        if cached is None:
+            payload = message.get("payload", {})
+            text = payload.get("text") or self._parse_payload_to_markdown(payload)
+            cached = (text, contains_html(text))
+            if msg_id:
+                with self._render_lock:
+                    self._render_cache[msg_id] = cached
+                    if len(self._render_cache) > RENDER_CACHE_SIZE:
+                        self._render_cache.popitem(last=False)
+        
+        text, is_html = cached
+        if "payload" in message:
+            message["payload"]["text"] = text
+        message["is_html"] = is_html
+        return text, is_html
+
     # --- Core API Methods ---
 
     def get_user(self):
@@ -181,7 +452,7 @@ class BotpressClient:
         if "conversation" in result and "id" in result["conversation"]:
             # Initialize cache for this new conversation
             conv_id = result["conversation"]["id"]
-            self._conversation_cache[f"{conv_id}_messages"] = {"messages": []}
+            self._conversation_cache[self._messages_cache_key(conv_id, MESSAGE_PAGE_SIZE)] = {"messages": []}
         return result
 
     def list_conversations(self):
@@ -196,51 +467,88 @@ class BotpressClient:
             )
         return self._conversation_cache[conversation_id]
 
-    def create_message(self, message, conversation_id):
-        """Send a message in a conversation"""
+    def create_message(self, message, conversation_id, idempotency_key=None):
+        """
+        Send a message in a conversation.
+
+        Every send carries an idempotency key (generated if not given) so
+        retries of the same send can't post the user message twice.
+        """
         payload = {
             "payload": {"type": "text", "text": message},
             "conversationId": conversation_id,
         }
-        result = self._request("POST", "/messages", json_data=payload)
+        result = self._request(
+            "POST",
+            "/messages",
+            json_data=payload,
+            idempotency_key=idempotency_key or uuid.uuid4().hex,
+        )
         
-        # FIXED: Correctly invalidate the specific message cache key
-        cache_key = f"{conversation_id}_messages"
-        self._conversation_cache.pop(cache_key, None)
+        # FIXED: Invalidate the newest page at every page size; older pages don't change
+        newest = f"{conversation_id}_messages_"
+        for cache_key in list(self._conversation_cache):
+            if cache_key.startswith(newest) and cache_key[len(newest):].isdigit():
+                self._conversation_cache.pop(cache_key, None)
         
         return result
 
-    def list_messages(self, conversation_id, limit=50, ignore_cache=False):
+    def _messages_cache_key(self, conversation_id, limit, next_token=None):
+        """Cache key for one page of a conversation's messages (None = newest page)"""
+        if next_token is None:
+            return f"{conversation_id}_messages_{limit}"
+        return f"{conversation_id}_messages_{limit}_{next_token}"
+
+    def list_messages(self, conversation_id, limit=50, ignore_cache=False, next_token=None):
         """
-        List messages with rich media parsing.
+        List one page of messages with rich media parsing.
+
+        Messages come back newest first. Pass the ``nextToken`` from a previous
+        page's ``meta`` as ``next_token`` to fetch the page of older messages.
         """
-        cache_key = f"{conversation_id}_messages"
+        cache_key = self._messages_cache_key(conversation_id, limit, next_token)
         
         # Return cached if valid and not ignored
         if not ignore_cache and cache_key in self._conversation_cache:
             return self._conversation_cache[cache_key]
         
         # Fetch messages
+        params = {"limit": limit}
+        if next_token:
+            params["nextToken"] = next_token
         result = self._request(
             "GET", 
-            f"/conversations/{conversation_id}/messages?limit={limit}"
+            f"/conversations/{conversation_id}/messages?{urlencode(params)}"
         )
         
-        # Pre-process messages (handle missing text in payloads)
+        # Pre-process messages (render rich payloads once per message id)
         if "messages" in result:
             for msg in result["messages"]:
-                if "payload" in msg:
-                    current_text = msg["payload"].get("text")
-                    if not current_text:
-                        msg["payload"]["text"] = self._parse_payload_to_markdown(msg["payload"])
+                self.render_message(msg)
 
-        # Update Cache
-        self._conversation_cache[cache_key] = result
+        # Update Cache (errors are not cached so the next call retries)
+        if "error" not in result:
+            self._conversation_cache[cache_key] = result
         return result
 
+    def iter_message_pages(self, conversation_id, limit=MESSAGE_PAGE_SIZE):
+        """Yield message pages newest to oldest, following the API's nextToken cursor"""
+        next_token = None
+        while True:
+            page = self.list_messages(conversation_id, limit=limit, next_token=next_token)
+            if "error" in page:
+                return
+            yield page
+            next_token = page.get("meta", {}).get("nextToken")
+            if not next_token:
+                return
+
     def listen_conversation(self, conversation_id):
         """Listen to conversation events (SSE)."""
         url = f"{self.base_url}/conversations/{conversation_id}/listen"
+        template = path_template(f"/conversations/{conversation_id}/listen")
+        started = time.monotonic()
+        first_event = True
         try:
             response = self.session.get(
                 url, 
@@ -252,6 +560,9 @@ class BotpressClient:
             client = sseclient.SSEClient(response)
             for event in client.events():
                 if event.data == "ping": continue
+                if first_event:
+                    self.metrics.record_first_event(template, time.monotonic() - started)
+                    first_event = False
                 try:
                     event_data = json.loads(event.data)
                     if "data" in event_data:
@@ -270,7 +581,11 @@ class BotpressClient:
         if hasattr(self, 'session'):
             self.session.close()
         self._conversation_cache.clear()
+        with self._render_lock:
+            self._render_cache.clear()
         self._user_cache = None
+        if self._owns_metrics:
+            self.metrics.stop_periodic_dump()
 
     def __enter__(self):
         return self
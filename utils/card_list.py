@@ -0,0 +1,149 @@
+"""
+GameVerse Card Lists
+A page of game cards rendered as one HTML block with a single action channel
+
+Building cards from st.columns, st.image, st.markdown and st.button costs
+6-10 elements per game, so long result pages send hundreds of deltas per
+rerun. Views here render each card to an HTML string and mount the whole
+list as one component. Every button in it carries ``data-action`` and
+``data-game``; a single click listener reports them through the component's
+"action" trigger, and ``handle_card_action`` applies it in a callback, so
+the rerun that follows already draws the updated cards.
+"""
+
+from functools import partial
+from html import escape
+
+import streamlit as st
+
+from data.event_log import GAME_VIEW
+from data.games_data import get_game_by_id
+from utils.helpers import add_to_cart, add_to_wishlist, game_image_url, remove_from_wishlist, track_event
+
+CARD_LIST_JS = """
+export default function (component) {
+    const { data, parentElement, setTriggerValue } = component;
+    let root = parentElement.querySelector(".card-list-root");
+    if (!root) {
+        root = document.createElement("div");
+        root.className = "card-list-root";
+        parentElement.appendChild(root);
+    }
+    if (root.dataset.version !== data.version) {
+        root.innerHTML = data.html;
+        root.dataset.version = data.version;
+    }
+    root.onclick = (event) => {
+        const button = event.target.closest("[data-action]");
+        if (button) {
+            setTriggerValue("action", {action: button.dataset.action, game_id: Number(button.dataset.game)});
+        }
+    };
+}
+"""
+
+# isolate_styles=False so cards pick up the app's .game-card-* and .card-* classes
+_card_list = st.components.v2.component("card_list", js=CARD_LIST_JS, isolate_styles=False)
+
+# Session key holding the id of the game whose details are open
+DETAILS_KEY = "card_details"
+
+
+# --- Card parts ---
+
+def action_button(action, game, label, done_label=None, done=False, secondary=False):
+    """
+    One card button; clicks are routed to handle_card_action
+
+    Args:
+        action: Action name sent with the click (see handle_card_action)
+        game: Game dictionary
+        label: Button text
+        done_label: Text shown instead once the action no longer applies
+        done: Whether the action already happened (e.g. game already in cart)
+        secondary: Outline style
+    """
+    classes = "card-button" + (" done" if done else " secondary" if secondary else "")
+    text = done_label if done and done_label else label
+    return (
+        f'<button type="button" class="{classes}" data-action="{action}" data-game="{int(game["id"])}">'
+        f'{escape(text)}</button>'
+    )
+
+
+def card_image(game, variant, css_class):
+    """Lazy-loaded cover image, or a placeholder when no variant exists"""
+    url = game_image_url(game, variant)
+    if url is None:
+        return f'<div class="{css_class} card-image-missing">No Image</div>'
+    return f'<img class="{css_class}" src="{escape(url)}" alt="{escape(game["title"])}" loading="lazy">'
+
+
+def card_tags(game, n=4):
+    return "".join(f'<span class="game-tag-modern">{escape(tag)}</span>' for tag in list(game.get('tags', []))[:n])
+
+
+def card_details(game):
+    """Expanded game information shown under a card"""
+    return f"""
+    <div class="card-details">
+        <p>{escape(game['description'])}</p>
+        <div><strong>Developer:</strong> {escape(game['developer'])}</div>
+        <div><strong>Release Date:</strong> {escape(str(game.get('release_date', 'N/A')))}</div>
+        <div><strong>Rating:</strong> {game.get('rating', 0)}/5.0</div>
+        <div><strong>Tags:</strong> {escape(', '.join(game.get('tags', [])))}</div>
+    </div>
+    """
+
+
+def details_open(game):
+    return st.session_state.get(DETAILS_KEY) == int(game['id'])
+
+
+# --- Mounting ---
+
+def handle_card_action(key, games_df):
+    """
+    Apply a card click before the rerun
+
+    Actions: "cart", "wishlist", "remove_wishlist" and "details" (toggles
+    the card's details and records a game view when opening).
+    """
+    event = st.session_state[key]["action"]
+    if not event:
+        return
+    game = get_game_by_id(games_df, event["game_id"])
+    if game is None:
+        return
+    action, title = event["action"], game['title']
+    if action == "cart":
+        st.toast(f"Added {title} to cart" if add_to_cart(game['id'], game['price']) else f"{title} is already in your cart")
+    elif action == "wishlist":
+        st.toast(f"Saved {title} to your wishlist" if add_to_wishlist(game['id']) else f"{title} is already saved")
+    elif action == "remove_wishlist":
+        remove_from_wishlist(game['id'])
+    elif action == "details":
+        if details_open(game):
+            st.session_state[DETAILS_KEY] = None
+        else:
+            st.session_state[DETAILS_KEY] = int(game['id'])
+            track_event(GAME_VIEW, game['id'])
+
+
+def render_card_list(key, cards, games_df, layout="rows"):
+    """
+    Mount a list of rendered cards as one element
+
+    Args:
+        key: Unique component key for the list
+        cards: HTML string per card
+        games_df: Catalog the clicked game ids are resolved against
+        layout: "rows" (one card per line), "grid" or "compact" (small tiles)
+    """
+    html = f'<div class="card-list card-list-{layout}">{"".join(cards)}</div>'
+    _card_list(
+        key=key,
+        data={"html": html, "version": str(hash(html))},
+        on_action_change=partial(handle_card_action, key, games_df),
+    )
+
@@ -0,0 +1,199 @@
+"""
+GameVerse Chatbot Telemetry
+Per-query chatbot timings kept as minute/hour/day counters and latency histograms
+"""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from data.storage import DATA_DIR
+from utils.reply_worker import ReplyJob
+from utils.rollups import RESOLUTIONS, RingSeries
+
+SNAPSHOT_NAME = "chat_telemetry.npz"
+SNAPSHOT_INTERVAL = 30  # seconds between snapshot saves
+
+# Geometric bucket bounds, ~22% apart from 10 ms to 60 s; percentiles report a bucket's upper bound
+LATENCY_BUCKETS_MS = np.unique(np.geomspace(10, 60_000, 45).round(-1))
+
+COUNTERS = ("queries", "replies", "timeouts", "failures", "fast_path", "polls")
+LATENCIES = ("send_ms", "reply_ms")  # create_message call; submit to first reply
+
+
+def histogram_percentiles(counts, q, bounds=LATENCY_BUCKETS_MS):
+    """
+    Percentile per row of bucket counts, as the upper bound of the bucket holding it
+
+    Args:
+        counts: (rows, len(bounds) + 1) histogram counts; the last bucket is open-ended
+        q: Percentile (0-100)
+
+    Returns:
+        np.ndarray: Milliseconds per row (the last bound for the open bucket), NaN for empty rows
+    """
+    totals = counts.sum(axis=1)
+    ranks = np.maximum(q / 100 * totals, 1)
+    bucket = (counts.cumsum(axis=1) >= ranks[:, None]).argmax(axis=1)
+    values = np.asarray([*bounds, bounds[-1]], dtype=np.float64)[bucket]
+    return np.where(totals > 0, values, np.nan)
+
+
+class RingHistogram:
+    """A RingSeries whose buckets each hold a latency histogram instead of one value"""
+
+    def __init__(self, width, capacity, bounds=LATENCY_BUCKETS_MS):
+        self.width = width
+        self.capacity = capacity
+        self.bounds = np.asarray(bounds, dtype=np.float64)
+        self.values = np.zeros((capacity, len(bounds) + 1), dtype=np.int64)
+        self.slots = np.full(capacity, -1, dtype=np.int64)
+
+    def add(self, ts, ms):
+        bucket = int(ts // self.width)
+        position = bucket % self.capacity
+        if self.slots[position] > bucket:
+            return  # already wrapped past
+        if self.slots[position] < bucket:
+            self.slots[position] = bucket
+            self.values[position] = 0
+        self.values[position, np.searchsorted(self.bounds, ms, side="left")] += 1
+
+    def range(self, start, end):
+        """Histogram rows for every bucket overlapping [start, end); missing buckets are empty"""
+        buckets = np.arange(int(start // self.width), int(-(-end // self.width)), dtype=np.int64)
+        buckets = buckets[-self.capacity:]
+        positions = buckets % self.capacity
+        live = self.slots[positions] == buckets
+        return buckets * self.width, np.where(live[:, None], self.values[positions], 0)
+
+
+class ChatTelemetry:
+    """
+    Chatbot send/reply timings for the analytics dashboard.
+
+    Every finished ReplyJob is folded into counters (queries, replies,
+    timeouts, failures, fast-path hits, polls) and latency histograms at
+    minute, hour and day resolution, so percentiles and timeout rate over
+    any chart window are a slice of a few hundred buckets. A fast-path hit
+    is a reply already waiting at the first poll.
+    """
+
+    def __init__(self, path=None, snapshot_interval=SNAPSHOT_INTERVAL):
+        self.path = path or DATA_DIR / SNAPSHOT_NAME
+        self.snapshot_interval = snapshot_interval
+        self._lock = threading.Lock()
+        self._saved_at = 0.0
+        self.counters = {
+            (name, resolution): RingSeries(width, capacity)
+            for name in COUNTERS
+            for resolution, (width, capacity) in RESOLUTIONS.items()
+        }
+        self.latencies = {
+            (name, resolution): RingHistogram(width, capacity)
+            for name in LATENCIES
+            for resolution, (width, capacity) in RESOLUTIONS.items()
+        }
+        self._load_snapshot()
+
+    def record(self, job):
+        """Fold one finished ReplyJob into every series"""
+        ts = job.finished_at or time.time()
+        counts = {
+            "queries": 1,
+            "replies": int(job.status == ReplyJob.DONE),
+            "timeouts": int(job.status == ReplyJob.TIMEOUT),
+            "failures": int(job.status == ReplyJob.FAILED),
+            "fast_path": int(job.status == ReplyJob.DONE and job.polls == 1),
+            "polls": job.polls,
+        }
+        latencies = {}
+        if job.send_started_at and job.sent_at:
+            latencies["send_ms"] = (job.sent_at - job.send_started_at) * 1000
+        if job.replied_at:
+            latencies["reply_ms"] = (job.replied_at - job.submitted_at) * 1000
+
+        with self._lock:
+            for (name, _), series in self.counters.items():
+                if counts[name]:
+                    series.add([ts], [counts[name]])
+            for (name, _), histogram in self.latencies.items():
+                if name in latencies:
+                    histogram.add(ts, latencies[name])
+            if time.time() - self._saved_at >= self.snapshot_interval:
+                self._save_snapshot()
+
+    def frame(self, resolution, start, end):
+        """
+        Chatbot performance over [start, end) as a DataFrame indexed by bucket start
+
+        Columns: queries, timeouts, failures, fast_path, avg_polls,
+        timeout_rate, send_p50/p95/p99 and reply_p50/p95/p99 (ms)
+        """
+        with self._lock:
+            columns = {}
+            for name in COUNTERS:
+                bucket_ts, columns[name] = self.counters[(name, resolution)].range(start, end)
+            histograms = {name: self.latencies[(name, resolution)].range(start, end)[1] for name in LATENCIES}
+
+        frame = pd.DataFrame(columns, index=pd.to_datetime(bucket_ts, unit="s"))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            queries = frame["queries"].to_numpy()
+            frame["timeout_rate"] = np.where(queries > 0, frame["timeouts"] / queries, np.nan)
+            frame["avg_polls"] = np.where(queries > 0, frame["polls"] / queries, np.nan)
+        for name, counts in histograms.items():
+            prefix = name.removesuffix("_ms")
+            for q in (50, 95, 99):
+                frame[f"{prefix}_p{q}"] = histogram_percentiles(counts, q)
+        return frame
+
+    def summary(self, resolution, start, end):
+        """Totals and percentiles for the whole window as a dict"""
+        with self._lock:
+            totals = {name: self.counters[(name, resolution)].range(start, end)[1].sum() for name in COUNTERS}
+            histograms = {
+                name: self.latencies[(name, resolution)].range(start, end)[1].sum(axis=0, keepdims=True)
+                for name in LATENCIES
+            }
+        queries = totals["queries"]
+        summary = {
+            **{name: int(value) for name, value in totals.items()},
+            "timeout_rate": float(totals["timeouts"] / queries) if queries else None,
+            "fast_path_rate": float(totals["fast_path"] / totals["replies"]) if totals["replies"] else None,
+            "avg_polls": float(totals["polls"] / queries) if queries else None,
+        }
+        for name, counts in histograms.items():
+            prefix = name.removesuffix("_ms")
+            for q in (50, 95, 99):
+                value = histogram_percentiles(counts, q)[0]
+                summary[f"{prefix}_p{q}"] = None if np.isnan(value) else float(value)
+        return summary
+
+    # --- Snapshot ---
+
+    def flush(self):
+        """Save a snapshot now"""
+        with self._lock:
+            self._save_snapshot()
+
+    def _save_snapshot(self):
+        arrays = {}
+        for (name, resolution), series in [*self.counters.items(), *self.latencies.items()]:
+            arrays[f"{name}.{resolution}.values"] = series.values
+            arrays[f"{name}.{resolution}.slots"] = series.slots
+        tmp = self.path.with_name(f".{self.path.name}")
+        np.savez(tmp, **arrays)
+        tmp.replace(self.path)
+        self._saved_at = time.time()
+
+    def _load_snapshot(self):
+        if not self.path.exists():
+            return
+        with np.load(self.path, allow_pickle=False) as data:
+            for (name, resolution), series in [*self.counters.items(), *self.latencies.items()]:
+                key = f"{name}.{resolution}"
+                if f"{key}.values" in data and data[f"{key}.values"].shape == series.values.shape:
+                    series.values = data[f"{key}.values"].copy()
+                    series.slots = data[f"{key}.slots"].copy()
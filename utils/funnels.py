@@ -0,0 +1,144 @@
+"""
+GameVerse Conversion Funnels
+Browse -> wishlist -> cart -> checkout conversion by category and acquisition week
+"""
+
+import numpy as np
+import pandas as pd
+
+from data.event_log import ADD_TO_CART, ADD_TO_WISHLIST, CHECKOUT, EVENT_CODES, GAME_VIEW
+
+# Step name -> event type, in funnel order
+FUNNEL_STEPS = {
+    "Browse": GAME_VIEW,
+    "Wishlist": ADD_TO_WISHLIST,
+    "Cart": ADD_TO_CART,
+    "Checkout": CHECKOUT,
+}
+STEP_NAMES = list(FUNNEL_STEPS)
+
+SECONDS_PER_WEEK = 7 * 86400
+WEEK_OFFSET = 3 * 86400  # the epoch was a Thursday; weeks start on Monday
+FUNNEL_COLUMNS = ("ts", "event", "user_code", "game_id")
+
+
+def event_steps(event_codes):
+    """Funnel step index per event code array; -1 for events outside the funnel"""
+    step_of_code = np.full(len(EVENT_CODES), -1, dtype=np.int8)
+    for step, event in enumerate(FUNNEL_STEPS.values()):
+        step_of_code[EVENT_CODES[event]] = step
+    return step_of_code[event_codes]
+
+
+def funnel_counts(units, steps, groups, n_groups):
+    """
+    Units reaching each funnel step, per group, without a Python loop over units
+
+    A unit (a user, or a user within a category) counts as reaching every
+    step up to the furthest one it got to, so a checkout straight from the
+    home page still counts as browsing, and skipping the wishlist does not
+    drop a buyer out of the funnel.
+
+    Args:
+        units: Integer unit code per event (0..n_units-1)
+        steps: Funnel step per event (-1 for other events)
+        groups: Integer group code per unit
+        n_groups: Number of groups
+
+    Returns:
+        np.ndarray: (n_groups, len(FUNNEL_STEPS)) counts
+    """
+    n_steps = len(FUNNEL_STEPS)
+    depth = np.full(len(groups), -1, dtype=np.int8)
+    in_funnel = steps >= 0
+    np.maximum.at(depth, units[in_funnel], steps[in_funnel])
+
+    reached = depth >= 0
+    furthest = np.bincount(
+        groups[reached] * n_steps + depth[reached], minlength=n_groups * n_steps
+    ).reshape(n_groups, n_steps)
+    # Reaching step k means reaching every step before it
+    return furthest[:, ::-1].cumsum(axis=1)[:, ::-1]
+
+
+def step_conversion(counts):
+    """
+    Conversion from each step to the next
+
+    Args:
+        counts: DataFrame of step counts (columns STEP_NAMES)
+
+    Returns:
+        pd.DataFrame: "Browse → Wishlist" etc.; NaN where the earlier step is 0
+    """
+    values = counts[STEP_NAMES].to_numpy(dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = np.where(values[:, :-1] > 0, values[:, 1:] / values[:, :-1], np.nan)
+    labels = [f"{before} → {after}" for before, after in zip(STEP_NAMES, STEP_NAMES[1:])]
+    return pd.DataFrame(rates, index=counts.index, columns=labels)
+
+
+def compute_funnels(columns, games_df):
+    """
+    Funnel counts overall, by game category and by acquisition week
+
+    Args:
+        columns: Event log columns (ts, event, user_code, game_id) as arrays
+        games_df: DataFrame containing games, for game -> category
+
+    Returns:
+        dict: overall (Series of step counts over users), by_category
+        (DataFrame of users per category, one row per category), by_cohort
+        (DataFrame of users per acquisition week, indexed by week start)
+    """
+    user_codes = columns["user_code"].astype(np.int64)
+    n_users = int(user_codes.max()) + 1 if len(user_codes) else 0
+    steps = event_steps(columns["event"])
+
+    # Acquisition week: the week of a user's first event of any kind; users
+    # with no events in range keep cohort -1 and never reach a step
+    first_seen = np.full(n_users, np.inf)
+    np.minimum.at(first_seen, user_codes, columns["ts"])
+    seen = np.isfinite(first_seen)
+    cohort_codes = np.full(n_users, -1, dtype=np.int64)
+    cohort_codes[seen], cohort_weeks = pd.factorize(
+        ((first_seen[seen] + WEEK_OFFSET) // SECONDS_PER_WEEK).astype(np.int64), sort=True
+    )
+    by_cohort = pd.DataFrame(
+        funnel_counts(user_codes, steps, cohort_codes, len(cohort_weeks)),
+        index=pd.Index(pd.to_datetime(cohort_weeks * SECONDS_PER_WEEK - WEEK_OFFSET, unit="s"), name="week"),
+        columns=STEP_NAMES,
+    )
+
+    # Per category the unit is (user, category); events on unknown games drop out
+    category_codes, categories = pd.factorize(games_df["category"], sort=True)
+    game_ids = games_df["id"].to_numpy()
+    category_of_game = np.full(int(game_ids.max()) + 1, -1, dtype=np.int64)
+    category_of_game[game_ids] = category_codes
+    game_id = columns["game_id"].astype(np.int64)
+    known = (game_id >= 0) & (game_id < len(category_of_game))
+    event_category = np.full(len(game_id), -1, dtype=np.int64)
+    event_category[known] = category_of_game[game_id[known]]
+    categorized = event_category >= 0
+    n_categories = len(categories)
+    by_category = pd.DataFrame(
+        funnel_counts(
+            user_codes[categorized] * n_categories + event_category[categorized],
+            steps[categorized],
+            np.tile(np.arange(n_categories), n_users),
+            n_categories,
+        ),
+        index=pd.Index(categories, name="category"),
+        columns=STEP_NAMES,
+    )
+
+    return {
+        "overall": by_cohort.sum(),
+        "by_category": by_category,
+        "by_cohort": by_cohort,
+    }
+
+
+def load_funnels(event_log, games_df, start=None, end=None):
+    """Read the funnel columns from the event log and compute every funnel"""
+    return compute_funnels(event_log.read_columns(start, end, columns=FUNNEL_COLUMNS), games_df)
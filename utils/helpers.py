@@ -3,22 +3,194 @@ GameVerse Helper Functions - Redesigned
 Modern UI components with clean styling
 """
 
+import logging
 import streamlit as st
 import re
+from data.games_data import reprice_items
+from data.catalog_stats import catalog_version
+from data.cart_store import CART, WISHLIST, SQLiteCartStore
+from data.order_ledger import OrderLedger
+from data.license_store import LicenseAllocator
+from data.event_log import ADD_TO_CART, ADD_TO_WISHLIST, NO_GAME, EventLog
+from data.price_history import PriceHistoryStore
+from utils.price_alerts import PriceDropEngine
+from utils.chat_telemetry import ChatTelemetry
+from utils.metrics import ClientMetrics
+from utils.funnels import load_funnels
+from utils.images import build_variants, load_manifest, manifest_path, variant_path, variant_url
+from utils.rollups import Rollups
+from utils.sketches import EventSketches
+from utils.session_memory import format_bytes, mark_shared, memory_profile_enabled, profile_session
+
+logger = logging.getLogger(__name__)
+
+# Store account used until real sign-in exists
+DEFAULT_USER_ID = "gamerpro"
+
+# Seconds a computed funnel report is reused before the event log is re-read
+FUNNEL_REFRESH_SECONDS = 300
+
+
+@st.cache_resource
+def get_cart_store():
+    """Shared cart/wishlist store (writes are batched in the background)"""
+    return mark_shared(SQLiteCartStore())
+
+
+@st.cache_resource
+def get_order_ledger():
+    """Shared append-only order ledger (concurrent checkouts commit together)"""
+    return mark_shared(OrderLedger())
+
+
+@st.cache_resource
+def get_license_allocator():
+    """Shared license key allocator (keys are reserved in blocks per game)"""
+    return mark_shared(LicenseAllocator())
+
+
+@st.cache_resource
+def get_price_history():
+    """Shared price history, alert subscriptions and delivered alerts"""
+    return mark_shared(PriceHistoryStore())
+
+
+@st.cache_resource
+def get_price_drop_engine():
+    """Shared engine that turns catalog price drops into wishlist alerts"""
+    return mark_shared(PriceDropEngine(get_price_history(), get_cart_store()))
+
+
+@st.cache_resource
+def get_event_log():
+    """Shared analytics event log (events are buffered and written in batches)"""
+    return mark_shared(EventLog())
+
+
+@st.cache_resource
+def get_rollups():
+    """Shared minute/hour/day metric rollups, fed by every event log flush"""
+    rollups = Rollups()
+    get_event_log().subscribe(rollups.ingest, since=rollups.watermark)
+    return mark_shared(rollups)
+
+
+@st.cache_resource
+def get_event_sketches():
+    """Shared distinct-user and top-game sketches for this node, fed by every event log flush"""
+    sketches = EventSketches()
+    get_event_log().subscribe(sketches.ingest, since=sketches.watermark)
+    return mark_shared(sketches)
+
+
+@st.cache_resource
+def get_chat_telemetry():
+    """Shared chatbot send/reply timings, fed by every session's reply worker"""
+    return mark_shared(ChatTelemetry())
+
+
+@st.cache_resource
+def get_chat_api_metrics():
+    """Shared per-endpoint Botpress API stats, recorded by the chatbot's client"""
+    return mark_shared(ClientMetrics())
+
+
+def get_cluster_sketches():
+    """Every node's latest sketches merged into one view (this node's included)"""
+    get_event_sketches()
+    return EventSketches.cluster()
+
+
+@st.cache_data(ttl=FUNNEL_REFRESH_SECONDS, show_spinner="Computing conversion funnels...")
+def _funnel_report(version, _games_df):
+    return load_funnels(get_event_log(), _games_df)
+
+
+def get_funnel_report(games_df):
+    """Funnel counts overall, by category and by acquisition week; refreshed every few minutes"""
+    return _funnel_report(catalog_version(games_df), games_df)
+
+
+@st.cache_resource(show_spinner="Preparing cover images...")
+def _ensure_image_variants():
+    """
+    Build the cover variants once per process when the deploy step was skipped
+
+    Returns:
+        str or None: Why the build failed, None when variants are available
+    """
+    if not manifest_path().exists():
+        try:
+            build_variants(workers=1)
+        except OSError as e:
+            logger.exception("Could not build cover images")
+            return str(e)
+    return None
+
+
+@st.cache_resource
+def _image_manifest(mtime):
+    return load_manifest()
+
+
+def get_image_manifest():
+    """The cover variants manifest, re-read whenever a build rewrites it"""
+    error = _ensure_image_variants()
+    if error and not st.session_state.get("cover_build_warned"):
+        st.session_state.cover_build_warned = True
+        st.warning(f"Cover images could not be prepared, so games show without them: {error}. "
+                   "Run `python build_images.py` to build them.")
+    path = manifest_path()
+    return _image_manifest(path.stat().st_mtime_ns) if path.exists() else {}
+
+
+def game_image(game, variant):
+    """
+    Image to show with st.image for a game at a card size ("thumb", "card" or "hero")
+
+    Uses the pre-sized variants from build_images.py, falling back to the
+    source image when there is none.
+    """
+    return variant_path(game.get('image_url', ''), variant, get_image_manifest())
+
+
+def game_image_url(game, variant):
+    """URL of a game's image variant for HTML cards, or None when there is none"""
+    return variant_url(game.get('image_url', ''), variant, get_image_manifest())
+
+
+def track_event(event, game_id=NO_GAME, value=0.0, label=""):
+    """Record an analytics event for the current user; buffered in memory, no disk I/O"""
+    get_event_log().append(event, get_user_id(), int(game_id), float(value), label)
+
+
+def track_catalog_prices(games_df):
+    """Record catalog prices when the catalog changed; drops are matched against every wishlist in one pass"""
+    get_price_drop_engine().on_catalog_update(games_df, catalog_version(games_df))
+
+
+def get_user_id():
+    """Id of the signed-in store user"""
+    user = st.session_state.get('user')
+    return (user or {}).get('id', DEFAULT_USER_ID)
 
 
 def init_session_state():
     """Initialize session state variables"""
-    if 'cart' not in st.session_state:
-        st.session_state.cart = []
-    if 'wishlist' not in st.session_state:
-        st.session_state.wishlist = []
     if 'user' not in st.session_state:
         st.session_state.user = None
+    # Cart and wishlist are insertion-ordered id sets (dict keys); game data is
+    # resolved against the catalog at render time. Loaded from the store once
+    # per session, then kept in sync by the add/remove helpers.
+    # Cart values are the price each game was quoted at (None until priced),
+    # and cart_total is their running sum (None until every item is priced).
+    if 'cart' not in st.session_state or 'wishlist' not in st.session_state:
+        lists = get_cart_store().load(get_user_id())
+        st.session_state.cart = dict.fromkeys(lists[CART])
+        st.session_state.wishlist = dict.fromkeys(lists[WISHLIST])
+        st.session_state.cart_total = None if st.session_state.cart else 0.0
     if 'chatbot_messages' not in st.session_state:
         st.session_state.chatbot_messages = 0
-    if 'chat_history' not in st.session_state:
-        st.session_state.chat_history = []
 
 
 def render_header():
@@ -75,46 +247,109 @@ def render_navigation():
     
     st.sidebar.metric("AI Queries", st.session_state.chatbot_messages)
     
+    if memory_profile_enabled():
+        render_memory_profile()
+    
     return pages[selected_page]
 
 
-def add_to_cart(game):
-    """Add a game to the shopping cart"""
-    game_ids = [g['id'] for g in st.session_state.cart]
-    if game['id'] not in game_ids:
-        st.session_state.cart.append(game)
+def render_memory_profile():
+    """Sidebar breakdown of this session's memory by session-state key"""
+    sizes = profile_session(st.session_state.to_dict())
+    with st.sidebar.expander(f"Session memory: {format_bytes(sum(size for _, size in sizes))}"):
+        for key, size in sizes:
+            st.caption(f"`{key}` — {format_bytes(size)}")
+
+
+def add_to_cart(game_id, price=None):
+    """Add a game to the shopping cart by id, remembering the price it was shown at"""
+    game_id = int(game_id)
+    if game_id not in st.session_state.cart:
+        quoted = None if price is None else float(price)
+        st.session_state.cart[game_id] = quoted
+        _adjust_cart_total(quoted)
+        get_cart_store().add(get_user_id(), CART, game_id)
+        track_event(ADD_TO_CART, game_id, quoted or 0.0)
         return True
     return False
 
 
-def add_to_wishlist(game):
-    """Add a game to the wishlist"""
-    game_ids = [g['id'] for g in st.session_state.wishlist]
-    if game['id'] not in game_ids:
-        st.session_state.wishlist.append(game)
+def add_to_wishlist(game_id):
+    """Add a game to the wishlist by id"""
+    game_id = int(game_id)
+    if game_id not in st.session_state.wishlist:
+        st.session_state.wishlist[game_id] = None
+        get_cart_store().add(get_user_id(), WISHLIST, game_id)
+        track_event(ADD_TO_WISHLIST, game_id)
         return True
     return False
 
 
-def remove_from_cart(index):
-    """Remove a game from cart by index"""
-    if 0 <= index < len(st.session_state.cart):
-        st.session_state.cart.pop(index)
+def remove_from_cart(game_id):
+    """Remove a game from cart by id"""
+    game_id = int(game_id)
+    if game_id in st.session_state.cart:
+        quoted = st.session_state.cart.pop(game_id)
+        _adjust_cart_total(None if quoted is None else -quoted)
+        get_cart_store().remove(get_user_id(), CART, game_id)
         return True
     return False
 
 
-def remove_from_wishlist(index):
-    """Remove a game from wishlist by index"""
-    if 0 <= index < len(st.session_state.wishlist):
-        st.session_state.wishlist.pop(index)
+def remove_from_wishlist(game_id):
+    """Remove a game from wishlist by id"""
+    game_id = int(game_id)
+    if game_id in st.session_state.wishlist:
+        del st.session_state.wishlist[game_id]
+        get_cart_store().remove(get_user_id(), WISHLIST, game_id)
         return True
     return False
 
 
-def calculate_cart_total():
-    """Calculate total price of items in cart"""
-    return sum(game['price'] for game in st.session_state.cart)
+def clear_cart():
+    """Empty the shopping cart"""
+    st.session_state.cart = {}
+    st.session_state.cart_total = 0.0
+    get_cart_store().clear(get_user_id(), CART)
+
+
+def _adjust_cart_total(delta):
+    """Apply a price delta to the running cart total; None marks it for re-pricing"""
+    total = st.session_state.get('cart_total')
+    if delta is None or total is None:
+        st.session_state.cart_total = None
+    else:
+        st.session_state.cart_total = round(total + delta, 2)
+
+
+def reprice_cart(games_df):
+    """
+    Re-price the whole cart against the live catalog in one gather
+    
+    Quotes are updated to live prices, titles no longer in the catalog are
+    dropped from the cart, and the running total is reset to the live total.
+    
+    Returns:
+        dict: The ``reprice_items`` result (items, removed_ids, changed, total)
+    """
+    cart = st.session_state.cart
+    result = reprice_items(games_df, cart.keys(), cart.values())
+    
+    store = get_cart_store()
+    for game_id in result['removed_ids']:
+        store.remove(get_user_id(), CART, game_id)
+    
+    items = result['items']
+    st.session_state.cart = dict(zip(items['id'].tolist(), items['price'].astype(float).tolist()))
+    st.session_state.cart_total = result['total']
+    return result
+
+
+def calculate_cart_total(games_df):
+    """Cart total; kept incrementally, re-priced in one gather only when unknown"""
+    if st.session_state.get('cart_total') is None:
+        reprice_cart(games_df)
+    return st.session_state.cart_total
 
 
 def format_price(price):
@@ -137,7 +372,7 @@ def render_game_card(game, context="browse"):
     
     with col1:
         try:
-            st.image(game.get('image_url', ''), use_container_width=True)
+            st.image(game_image(game, "thumb"), use_container_width=True)
         except:
             st.markdown("""
             <div style="background: #27272a; 
@@ -159,14 +394,14 @@ def render_game_card(game, context="browse"):
         col_a, col_b = st.columns([1, 1])
         with col_a:
             if st.button("Add to Cart", key=f"cart_{context}_{game['id']}", use_container_width=True):
-                if add_to_cart(game):
+                if add_to_cart(game['id'], game['price']):
                     st.success("✓ Added to cart")
                 else:
                     st.info("Already in cart")
         
         with col_b:
             if st.button("Wishlist", key=f"wish_{context}_{game['id']}", use_container_width=True):
-                if add_to_wishlist(game):
+                if add_to_wishlist(game['id']):
                     st.success("✓ Added to wishlist")
                 else:
                     st.info("Already in wishlist")
\ No newline at end of file
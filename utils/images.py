@@ -0,0 +1,204 @@
+"""
+GameVerse Image Variants
+Pre-sized WebP copies of the cover images in images/, picked per card type
+
+Cards show covers a few hundred pixels wide, so sending the 1024px source
+JPEGs wastes most of the bytes. ``build_variants`` writes one file per
+source and variant:
+
+    static/covers/<source stem>-<variant>-<content hash>.webp
+
+and records them in ``static/covers/manifest.json``. File names change
+whenever their bytes do, so they can be cached forever. ``static/`` is
+served by Streamlit (server.enableStaticServing), so HTML cards reference
+variants by ``variant_url``; ``st.image`` callers use ``variant_path``,
+which falls back to the source image when no variant was built.
+"""
+
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+IMAGES_DIR = Path(__file__).resolve().parent.parent / "images"
+COVERS_DIR = IMAGES_DIR.parent / "static" / "covers"
+COVERS_URL = "app/static/covers"  # where Streamlit serves COVERS_DIR
+MANIFEST_FILE = "manifest.json"
+SOURCE_SUFFIXES = (".jpg", ".jpeg", ".png")
+
+# Variant name -> longest side in pixels (never upscaled)
+VARIANTS = {
+    "thumb": 320,  # list rows: browse, wishlist
+    "card": 480,  # featured cards on the home page
+    "hero": 1024,  # full-width banners
+}
+FORMAT = "WEBP"
+SUFFIX = ".webp"
+QUALITY = 80
+ENCODER_METHOD = 6  # slowest, smallest WebP encoding; paid once at build time
+
+
+def _settings():
+    """Everything that changes the output; a change rebuilds every variant"""
+    return {"variants": VARIANTS, "format": FORMAT, "quality": QUALITY, "method": ENCODER_METHOD}
+
+
+def _digest(data, size=16):
+    return hashlib.blake2b(data, digest_size=size).hexdigest()
+
+
+def source_key(image_url):
+    """Manifest key for an image path or url ("./images/X.jpg" and "images/x.jpg" match)"""
+    return Path(image_url).name.lower()
+
+
+# --- Build ---
+
+def render_variants(source, out_dir):
+    """
+    Write every variant of one source image
+
+    Runs in a worker process. Each variant is resized from the full image and
+    named after a hash of its encoded bytes.
+
+    Returns:
+        dict: variant -> {"file", "width", "height", "bytes"}
+    """
+    with Image.open(source) as image:
+        image = image.convert("RGB")
+        written = {}
+        for name, size in VARIANTS.items():
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.LANCZOS)
+            buffer = io.BytesIO()
+            resized.save(buffer, FORMAT, quality=QUALITY, method=ENCODER_METHOD)
+            data = buffer.getvalue()
+            filename = f"{Path(source).stem}-{name}-{_digest(data, 4)}{SUFFIX}"
+            path = out_dir / filename
+            if not path.exists():
+                tmp = path.with_name(f".{filename}")
+                tmp.write_bytes(data)
+                tmp.replace(path)
+            written[name] = {"file": filename, "width": resized.width, "height": resized.height, "bytes": len(data)}
+    return written
+
+
+def build_variants(images_dir=None, out_dir=None, workers=None, force=False):
+    """
+    Generate variants for every source image that changed since the last build
+
+    Sources are hashed and compared with the manifest; only new or changed
+    ones (or all of them when the variant settings changed) are rendered, in
+    parallel across a process pool. Files no longer in the manifest are
+    removed.
+
+    Args:
+        images_dir: Directory of source images (defaults to images/)
+        out_dir: Variant directory (defaults to static/covers/)
+        workers: Worker processes (defaults to one per CPU; 1 renders in this process)
+        force: Rebuild everything
+
+    Returns:
+        dict: source file name -> variants written, for the sources rebuilt
+    """
+    images_dir = images_dir or IMAGES_DIR
+    out_dir = out_dir or COVERS_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    previous = load_manifest(out_dir)
+    if force or previous.get("settings") != _settings():
+        previous = {}
+    previous_sources = previous.get("sources", {})
+
+    sources, stale = {}, []
+    for path in sorted(images_dir.iterdir()):
+        if not path.is_file() or path.suffix.lower() not in SOURCE_SUFFIXES:
+            continue
+        digest = _digest(path.read_bytes())
+        entry = previous_sources.get(source_key(path))
+        files_present = entry and all((out_dir / v["file"]).exists() for v in entry["variants"].values())
+        if entry and entry["hash"] == digest and files_present:
+            sources[source_key(path)] = entry
+        else:
+            stale.append((path, digest))
+
+    rebuilt = {}
+    workers = min(workers or os.cpu_count() or 1, len(stale))
+    if workers == 1:
+        results = ((path, digest, render_variants(path, out_dir)) for path, digest in stale)
+    elif stale:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(path, digest, pool.submit(render_variants, path, out_dir)) for path, digest in stale]
+            results = [(path, digest, future.result()) for path, digest, future in futures]
+    else:
+        results = ()
+    for path, digest, variants in results:
+        sources[source_key(path)] = {"source": path.name, "hash": digest, "variants": variants}
+        rebuilt[path.name] = variants
+
+    manifest = {"settings": _settings(), "sources": dict(sorted(sources.items()))}
+    tmp = out_dir / f".{MANIFEST_FILE}"
+    tmp.write_text(json.dumps(manifest, indent=2))
+    tmp.replace(out_dir / MANIFEST_FILE)
+
+    keep = {v["file"] for entry in sources.values() for v in entry["variants"].values()} | {MANIFEST_FILE}
+    for path in out_dir.iterdir():
+        if path.suffix == SUFFIX and path.name not in keep:
+            path.unlink()
+    return rebuilt
+
+
+# --- Lookup ---
+
+def manifest_path(out_dir=None):
+    return (out_dir or COVERS_DIR) / MANIFEST_FILE
+
+
+def load_manifest(out_dir=None):
+    """The variants manifest, or an empty one when nothing was built"""
+    path = manifest_path(out_dir)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def _variant_file(image_url, variant, manifest):
+    if not image_url or "://" in image_url:
+        return None
+    entry = manifest.get("sources", {}).get(source_key(image_url))
+    if entry is None or variant not in entry["variants"]:
+        return None
+    return entry["variants"][variant]["file"]
+
+
+def variant_path(image_url, variant, manifest, out_dir=None):
+    """
+    File to show for an image at a given variant size
+
+    Args:
+        image_url: The game's image_url (a path under images/, or a remote url)
+        variant: One of VARIANTS
+        manifest: The loaded manifest
+
+    Returns:
+        str: The variant's path, or image_url unchanged when there is none
+    """
+    filename = _variant_file(image_url, variant, manifest)
+    return image_url if filename is None else str((out_dir or COVERS_DIR) / filename)
+
+
+def variant_url(image_url, variant, manifest):
+    """
+    URL of an image variant for use in HTML
+
+    Returns:
+        str or None: The static URL, image_url itself for remote images, or
+        None when no variant was built
+    """
+    if image_url and "://" in image_url:
+        return image_url
+    filename = _variant_file(image_url, variant, manifest)
+    return None if filename is None else f"{COVERS_URL}/{filename}"
@@ -0,0 +1,158 @@
+"""
+GameVerse Client Metrics
+In-process latency histograms and counters for outbound API calls
+"""
+
+import json
+import threading
+import time
+from bisect import bisect_left
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with percentile estimates"""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms):
+        self.counts[bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile (max for the open bucket)"""
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return self.bounds[i] if i < len(self.bounds) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 1) if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max_ms, 1),
+            "buckets": dict(zip([*map(str, self.bounds), "inf"], self.counts)),
+        }
+
+
+class EndpointStats:
+    """Latency and counters for one (method, path template)"""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.errors = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.short_circuits = 0
+        self.coalesced = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def to_dict(self):
+        return {
+            **self.latency.to_dict(),
+            "errors": self.errors,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "short_circuits": self.short_circuits,
+            "coalesced": self.coalesced,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+        }
+
+
+class ClientMetrics:
+    """
+    Thread-safe registry of per-endpoint stats.
+
+    ``snapshot()`` returns a JSON-serialisable view keyed by "METHOD /path/{id}";
+    ``start_periodic_dump()`` appends snapshots to a JSON-lines file.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._started = time.time()
+        self._dump_thread = None
+        self._dump_stop = threading.Event()
+
+    def _stats(self, method, template):
+        key = f"{method} {template}"
+        stats = self._endpoints.get(key)
+        if stats is None:
+            stats = self._endpoints[key] = EndpointStats()
+        return stats
+
+    def record_call(self, method, template, elapsed_s, retries=0, error=False,
+                    timeout=False, bytes_sent=0, bytes_received=0):
+        with self._lock:
+            stats = self._stats(method, template)
+            stats.latency.record(elapsed_s * 1000)
+            stats.retries += retries
+            stats.errors += int(error)
+            stats.timeouts += int(timeout)
+            stats.bytes_sent += bytes_sent
+            stats.bytes_received += bytes_received
+
+    def record_short_circuit(self, method, template):
+        with self._lock:
+            self._stats(method, template).short_circuits += 1
+
+    def record_coalesced(self, method, template):
+        with self._lock:
+            self._stats(method, template).coalesced += 1
+
+    def record_first_event(self, template, elapsed_s):
+        """SSE time from opening the stream to its first data event"""
+        with self._lock:
+            self._stats("SSE", template).latency.record(elapsed_s * 1000)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "timestamp": time.time(),
+                "uptime_s": round(time.time() - self._started, 1),
+                "endpoints": {key: stats.to_dict() for key, stats in self._endpoints.items()},
+            }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+            self._started = time.time()
+
+    def dump(self, path):
+        with open(path, "a") as f:
+            f.write(json.dumps(self.snapshot()) + "\n")
+
+    def start_periodic_dump(self, path, interval=60):
+        """Append a snapshot to ``path`` every ``interval`` seconds on a daemon thread"""
+        if self._dump_thread and self._dump_thread.is_alive():
+            return
+        self._dump_stop.clear()
+
+        def run():
+            while not self._dump_stop.wait(interval):
+                self.dump(path)
+
+        self._dump_thread = threading.Thread(target=run, name="metrics-dump", daemon=True)
+        self._dump_thread.start()
+
+    def stop_periodic_dump(self):
+        self._dump_stop.set()
@@ -0,0 +1,62 @@
+"""
+GameVerse History Prefetch
+Warms the Botpress client's message cache in the background
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.botpress_client import MESSAGE_PAGE_SIZE
+
+PREFETCH_WORKERS = 4  # threads shared by all sessions
+PREFETCH_LIMIT = 10  # conversations prefetched per list
+
+
+def create_prefetch_executor(max_workers=PREFETCH_WORKERS):
+    """Thread pool shared by every session's prefetcher (caps total concurrency)"""
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="history-prefetch")
+
+
+class HistoryPrefetcher:
+    """
+    Fetch the newest page of several conversations on a shared thread pool.
+
+    Results land in the client's own page cache, so a later
+    ``client.list_messages(conversation_id, limit=MESSAGE_PAGE_SIZE)`` returns
+    without touching the network. A fetch still in flight is shared through
+    the client's single-flight GETs rather than issued twice.
+    """
+
+    def __init__(self, client, executor, limit=PREFETCH_LIMIT):
+        self.client = client
+        self.executor = executor
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._futures = {}
+        self._cancelled = threading.Event()
+
+    def prefetch(self, conversation_ids):
+        """Queue the newest page of up to ``limit`` conversations not yet fetched"""
+        with self._lock:
+            self._cancelled.clear()
+            for conversation_id in list(conversation_ids)[:self.limit]:
+                if conversation_id in self._futures:
+                    continue
+                self._futures[conversation_id] = self.executor.submit(self._fetch, conversation_id)
+
+    def _fetch(self, conversation_id):
+        if self._cancelled.is_set():
+            return None
+        return self.client.list_messages(conversation_id, limit=MESSAGE_PAGE_SIZE)
+
+    def is_ready(self, conversation_id):
+        future = self._futures.get(conversation_id)
+        return future is not None and future.done() and not future.cancelled()
+
+    def cancel(self):
+        """Drop queued fetches; ones already on the wire finish into the cache"""
+        self._cancelled.set()
+        with self._lock:
+            for future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
@@ -0,0 +1,128 @@
+"""
+GameVerse Price Drop Alerts
+Joins wishlists against catalog price changes and queues drop events
+"""
+
+import logging
+import queue
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from data.cart_store import WISHLIST
+
+logger = logging.getLogger(__name__)
+
+EVENT_COLUMNS = ["user_id", "game_id", "old_price", "new_price", "drop_pct", "created_at"]
+DELIVERY_ATTEMPTS = 3  # tries per alert batch before it is dropped
+RETRY_DELAY = 1.0  # seconds before the first retry; doubles each time
+
+
+def detect_price_drops(changes, entries, subscribers=None, created_at=None):
+    """
+    Match wishlist entries against price changes in one vectorized pass
+
+    Args:
+        changes: DataFrame of game_id, old_price, new_price
+        entries: DataFrame of user_id, game_id (one row per wishlist entry)
+        subscribers: Optional array of user ids that opted in; others are skipped
+        created_at: Event timestamp (defaults to now)
+
+    Returns:
+        pd.DataFrame: One event per (user, dropped game) with EVENT_COLUMNS
+    """
+    drops = changes[changes["new_price"].to_numpy() < changes["old_price"].to_numpy()]
+    if drops.empty or entries.empty:
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+
+    entries = entries[entries["game_id"].isin(drops["game_id"])]
+    if subscribers is not None:
+        # Hash-index probe; much faster than isin() on string columns
+        subscribed = pd.Index(subscribers).unique().get_indexer(entries["user_id"]) >= 0
+        entries = entries[subscribed]
+
+    # Hash join on game id; no per-user work
+    events = entries.merge(drops, on="game_id", how="inner")
+    events["drop_pct"] = np.round(1 - events["new_price"] / events["old_price"], 4)
+    events["created_at"] = created_at or time.time()
+    return events[EVENT_COLUMNS]
+
+
+class PriceDropEngine:
+    """
+    Watches catalog prices and emits wishlist price-drop events.
+
+    ``on_catalog_update`` records the catalog's prices, and when any dropped
+    it pulls the wishlist entries for just those games, joins them in one
+    pass and puts the resulting event batch (a DataFrame) on ``events``.
+    A dispatcher thread delivers batches to the price history store, from
+    which each session picks up its user's alerts.
+    """
+
+    def __init__(self, history, cart_store, events=None):
+        self.history = history
+        self.cart_store = cart_store
+        self.events = events if events is not None else queue.Queue()
+        self._lock = threading.Lock()
+        self._catalog_version = None  # version last recorded by on_catalog_update
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="price-alert-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def on_catalog_update(self, games_df, version=None):
+        """
+        Record catalog prices and emit drop events for every wishlist holding a cheaper game
+
+        Args:
+            games_df: The catalog
+            version: Optional catalog version (see data.catalog_stats.catalog_version);
+                a call with the version already recorded returns at once
+
+        Returns:
+            pd.DataFrame: The emitted events (empty when nothing dropped)
+        """
+        if version is not None and version == self._catalog_version:
+            return pd.DataFrame(columns=EVENT_COLUMNS)
+        with self._lock:
+            if version is not None and version == self._catalog_version:
+                return pd.DataFrame(columns=EVENT_COLUMNS)
+            events = self._record_catalog(games_df)
+            self._catalog_version = version
+            return events
+
+    def _record_catalog(self, games_df):
+        changes = self.history.record_prices(games_df["id"].to_numpy(), games_df["price"].to_numpy())
+        dropped = changes.loc[changes["new_price"] < changes["old_price"], "game_id"]
+        if dropped.empty:
+            return pd.DataFrame(columns=EVENT_COLUMNS)
+        entries = self.cart_store.entries_for_games(WISHLIST, dropped.tolist())
+        events = detect_price_drops(changes, entries, self.history.subscribers())
+        if not events.empty:
+            self.events.put(events)
+        return events
+
+    def _dispatch_loop(self):
+        while True:
+            batch = self.events.get()
+            try:
+                self._deliver(batch)
+            finally:
+                self.events.task_done()
+
+    def _deliver(self, batch):
+        """Save a batch of alerts, retrying with backoff; a batch that keeps failing is logged and dropped"""
+        for attempt in range(1, DELIVERY_ATTEMPTS + 1):
+            try:
+                self.history.save_alerts(batch)
+                return
+            except Exception:
+                if attempt == DELIVERY_ATTEMPTS:
+                    logger.exception("Dropping %d price alerts after %d failed deliveries", len(batch), attempt)
+                    return
+                logger.warning("Failed to deliver %d price alerts, retrying", len(batch), exc_info=True)
+                time.sleep(RETRY_DELAY * 2 ** (attempt - 1))
+
+    def flush(self):
+        """Block until every queued batch is delivered"""
+        self.events.join()
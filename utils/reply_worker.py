@@ -0,0 +1,135 @@
+"""
+GameVerse Reply Worker
+Sends chatbot messages and waits for the bot's reply off the Streamlit script thread
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+REPLY_WORKERS = 16  # threads shared by all sessions
+REPLY_TIMEOUT = 10  # seconds to wait for the bot
+POLL_INTERVAL = 0.5  # seconds between reply checks
+
+
+def create_reply_executor(max_workers=REPLY_WORKERS):
+    """Thread pool shared by every session's reply worker"""
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chat-reply")
+
+
+class ReplyJob:
+    """One send-and-await; the view reads it, the worker thread fills it in"""
+
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+    TIMEOUT = "timeout"
+
+    def __init__(self, conversation_id, user_id, prompt):
+        self.conversation_id = conversation_id
+        self.user_id = user_id
+        self.prompt = prompt
+        self.status = self.PENDING
+        self.reply = None
+        self.error = None
+        self.polls = 0
+        self.submitted_at = time.time()
+        self.send_started_at = None
+        self.sent_at = None
+        self.replied_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status != self.PENDING
+
+
+class ReplyWorker:
+    """
+    Per-session send-and-await jobs, keyed by conversation.
+
+    Jobs for the same conversation run one after another so replies stay in
+    order; different conversations run in parallel on the shared executor.
+    The view collects finished jobs on its next rerun; ``telemetry`` (e.g. a
+    shared ChatTelemetry) is handed every finished job first.
+    """
+
+    def __init__(self, client, executor, timeout=REPLY_TIMEOUT, poll_interval=POLL_INTERVAL, telemetry=None):
+        self.client = client
+        self.executor = executor
+        self.telemetry = telemetry
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._conversation_locks = {}
+
+    def submit(self, conversation_id, user_id, prompt):
+        job = ReplyJob(conversation_id, user_id, prompt)
+        with self._lock:
+            self._jobs.setdefault(conversation_id, []).append(job)
+            conversation_lock = self._conversation_locks.setdefault(conversation_id, threading.Lock())
+        self.executor.submit(self._run, job, conversation_lock)
+        return job
+
+    def is_pending(self, conversation_id):
+        with self._lock:
+            return any(not job.finished for job in self._jobs.get(conversation_id, []))
+
+    def has_finished(self, conversation_id):
+        with self._lock:
+            jobs = self._jobs.get(conversation_id, [])
+            return bool(jobs) and jobs[0].finished
+
+    def collect(self, conversation_id):
+        """Remove and return finished jobs in submission order, up to the first unfinished one"""
+        with self._lock:
+            jobs = self._jobs.get(conversation_id, [])
+            finished = []
+            while jobs and jobs[0].finished:
+                finished.append(jobs.pop(0))
+            return finished
+
+    def _run(self, job, conversation_lock):
+        with conversation_lock:
+            try:
+                self._send_and_await(job)
+            except Exception as e:
+                job.error = str(e)
+                job.status = ReplyJob.FAILED
+            job.finished_at = time.time()
+            if self.telemetry is not None:
+                self.telemetry.record(job)
+
+    def _send_and_await(self, job):
+        job.send_started_at = time.time()
+        result = self.client.create_message(job.prompt, conversation_id=job.conversation_id)
+        if "error" in result:
+            job.error = result["error"]
+            job.status = ReplyJob.FAILED
+            return
+        job.sent_at = time.time()
+        sent_id = result.get("message", {}).get("id")
+
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            job.polls += 1
+
+            # Fetch latest messages, BYPASSING CACHE
+            messages_data = self.client.list_messages(job.conversation_id, limit=5, ignore_cache=True)
+            if "error" in messages_data:
+                # The client already retried within its budget; don't keep hammering
+                job.error = messages_data["error"]
+                job.status = ReplyJob.FAILED
+                return
+
+            # API returns newest first: a bot message on top that isn't ours is the reply
+            messages = messages_data.get("messages", [])
+            if messages and messages[0].get("userId") != job.user_id and messages[0].get("id") != sent_id:
+                job.reply = messages[0]
+                job.replied_at = time.time()
+                job.status = ReplyJob.DONE
+                return
+
+        job.status = ReplyJob.TIMEOUT
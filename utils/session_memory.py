@@ -0,0 +1,154 @@
+"""
+GameVerse Session Memory
+Measures what each session keeps in memory and compacts chatbot history
+"""
+
+import os
+import sys
+import threading
+import types
+from concurrent.futures import Executor
+
+import numpy as np
+import pandas as pd
+
+MEMORY_PROFILE_ENV = "GAMEVERSE_MEMORY_PROFILE"  # set to 1 to show the sidebar panel
+
+# Compaction limits for chatbot history kept in session state
+MAX_CONVERSATIONS_IN_SESSION = 5  # others are dropped and reloaded from the history store
+MAX_MESSAGES_PER_CONVERSATION = 200  # older messages are paged back in from disk on demand
+
+# Objects that are shared across sessions or own no per-session data
+_OPAQUE_TYPES = (
+    type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+    Executor, threading.Thread, type(threading.Lock()), type(threading.RLock()),
+)
+
+_shared_ids = set()
+
+
+def mark_shared(obj):
+    """Register a process-wide resource (client, store) so sessions aren't charged for it"""
+    _shared_ids.add(id(obj))
+    return obj
+
+
+def deep_sizeof(obj, exclude=(), _seen=None):
+    """
+    Approximate bytes reachable from ``obj``, counting each object once
+
+    Args:
+        obj: Object to measure
+        exclude: Objects not to count or descend into, on top of those
+            registered with ``mark_shared``
+
+    Returns:
+        int: Size in bytes
+    """
+    seen = _seen if _seen is not None else {id(item) for item in exclude}
+    if id(obj) in seen or id(obj) in _shared_ids or isinstance(obj, _OPAQUE_TYPES):
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return sys.getsizeof(obj)  # includes the buffer when the array owns it
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool)) or obj is None:
+        return size
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_sizeof(key, _seen=seen) + deep_sizeof(value, _seen=seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += deep_sizeof(item, _seen=seen)
+    else:
+        if hasattr(obj, "__dict__"):
+            size += deep_sizeof(vars(obj), _seen=seen)
+        for slot in getattr(type(obj), "__slots__", ()):
+            if hasattr(obj, slot):
+                size += deep_sizeof(getattr(obj, slot), _seen=seen)
+    return size
+
+
+def profile_session(state, exclude=()):
+    """
+    Deep size of each session-state key, largest first
+
+    Objects reachable from several keys are counted under the first key
+    that reaches them, so the per-key sizes add up to the session total.
+
+    Args:
+        state: Mapping of session-state keys to values
+        exclude: Extra objects to leave out (``mark_shared`` ones always are)
+
+    Returns:
+        list: (key, bytes) tuples sorted by size
+    """
+    seen = {id(item) for item in exclude}
+    sizes = [(key, deep_sizeof(value, _seen=seen)) for key, value in state.items()]
+    return sorted(sizes, key=lambda item: item[1], reverse=True)
+
+
+def memory_profile_enabled():
+    return os.getenv(MEMORY_PROFILE_ENV, "").lower() in ("1", "true", "yes")
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def compact_conversation_history(history, cursors, access_order, active_id, keep_ids=(),
+                                 max_conversations=MAX_CONVERSATIONS_IN_SESSION,
+                                 max_messages=MAX_MESSAGES_PER_CONVERSATION):
+    """
+    Apply the session's history limits in place
+
+    1. Trim each background conversation to its newest ``max_messages`` and
+       move its cursor so "Load older" pages the dropped messages back from
+       disk. The active one is left alone so "Load older" can grow it.
+    2. Drop the least recently viewed conversations beyond
+       ``max_conversations``. Their messages are already in the history store,
+       so selecting one again is a disk read plus a delta sync.
+
+    Args:
+        history: conversation id -> list of message dicts
+        cursors: conversation id -> oldest loaded ``seq``
+        access_order: conversation id -> None, least recently viewed first
+        active_id: Conversation on screen (never dropped)
+        keep_ids: Conversations that must stay (e.g. with a reply pending)
+
+    Returns:
+        list: Ids of the conversations dropped from memory
+    """
+    for conversation_id, messages in history.items():
+        if conversation_id != active_id and len(messages) > max_messages:
+            dropped, kept = messages[:-max_messages], messages[-max_messages:]
+            kept_seqs = [m["seq"] for m in kept if m.get("seq") is not None]
+            dropped_seqs = [m["seq"] for m in dropped if m.get("seq") is not None]
+            if kept_seqs:
+                cursors[conversation_id] = min(kept_seqs)
+            elif dropped_seqs:
+                cursors[conversation_id] = max(dropped_seqs) + 1
+            history[conversation_id] = kept
+
+    evicted = []
+    protected = {active_id, *keep_ids}
+    for conversation_id in list(access_order):
+        if len(history) <= max_conversations:
+            break
+        if conversation_id in protected or conversation_id not in history:
+            continue
+        del history[conversation_id]
+        cursors.pop(conversation_id, None)
+        del access_order[conversation_id]
+        evicted.append(conversation_id)
+    return evicted
@@ -0,0 +1,299 @@
+"""
+GameVerse Event Sketches
+Mergeable approximate counters: distinct users and most viewed/carted games
+
+All sketches are fixed-size numpy arrays updated a whole event batch at a
+time, and two sketches of the same shape merge into one with an element-wise
+max (HyperLogLog) or sum (Count-Min). Each process keeps its own and saves a
+snapshot per node; merging every node's snapshot gives the cluster-wide view
+in the memory of a single sketch set.
+"""
+
+import heapq
+import os
+import socket
+import threading
+import time
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+from data.event_log import ADD_TO_CART, EVENT_CODES, GAME_VIEW, SECONDS_PER_DAY
+from data.storage import DATA_DIR
+
+SKETCHES_DIR = "sketches"
+
+HLL_PRECISION = 14  # 16K registers, ~0.8% standard error
+DAILY_HLL_PRECISION = 12  # 4K registers per day, ~1.6% standard error
+DAILY_DAYS = 35  # enough for a 30-day window
+CMS_WIDTH = 2048
+CMS_DEPTH = 4
+TOP_K = 10
+
+# Fixed odd multipliers so every process hashes games into the same Count-Min cells
+CMS_MULTIPLIERS = np.array(
+    [0x9E3779B97F4A7C15, 0xBF58476D1CE4E5B9, 0x94D049BB133111EB, 0xD6E8FEB86659FD93],
+    dtype=np.uint64,
+)
+
+# Heavy-hitter sketch name -> event type counted
+HEAVY_HITTERS = {
+    "viewed": GAME_VIEW,
+    "carted": ADD_TO_CART,
+}
+
+
+def hash_users(user_ids):
+    """64-bit hash per user id, identical in every process"""
+    return pd.util.hash_array(np.asarray(user_ids, dtype=object))
+
+
+def node_name():
+    """This server's name in the cluster (GAMEVERSE_NODE, default the host name)"""
+    return os.environ.get("GAMEVERSE_NODE") or socket.gethostname()
+
+
+def _hll_ranks(hashes, precision):
+    """Register index and rank (position of the first 1 bit after the index bits) per hash"""
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    rest_bits = 64 - precision
+    index = (hashes >> np.uint64(rest_bits)).astype(np.int64)
+    rest = hashes & np.uint64((1 << rest_bits) - 1)
+    # frexp is exact here: rest fits in a float64 mantissa for precision >= 11
+    _, exponent = np.frexp(rest.astype(np.float64))
+    rank = np.where(rest > 0, rest_bits - (exponent - 1), rest_bits + 1).astype(np.uint8)
+    return index, rank
+
+
+def _hll_estimate(registers):
+    """Cardinality estimate from one register array (with small-range correction)"""
+    m = registers.shape[-1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.ldexp(1.0, -registers.astype(np.int64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and zeros:
+        estimate = m * np.log(m / zeros)
+    return float(estimate)
+
+
+class HyperLogLog:
+    """Distinct count in 2**precision bytes"""
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes):
+        index, rank = _hll_ranks(hashes, self.precision)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self):
+        return _hll_estimate(self.registers)
+
+
+class DailyDistinct:
+    """
+    One HyperLogLog per UTC day in a ring, for distinct counts over any span of days.
+
+    Like the rollup ring buffers, ``days`` remembers which day each row
+    holds so a row is reset when a newer day wraps onto it.
+    """
+
+    def __init__(self, capacity=DAILY_DAYS, precision=DAILY_HLL_PRECISION):
+        self.capacity = capacity
+        self.precision = precision
+        self.registers = np.zeros((capacity, 1 << precision), dtype=np.uint8)
+        self.days = np.full(capacity, -1, dtype=np.int64)
+
+    def add_hashes(self, ts, hashes):
+        days = (np.asarray(ts) // SECONDS_PER_DAY).astype(np.int64)
+        rows = days % self.capacity
+        held = self.days.copy()
+        np.maximum.at(self.days, rows, days)
+        self.registers[self.days != held] = 0
+        live = self.days[rows] == days
+        index, rank = _hll_ranks(hashes[live], self.precision)
+        np.maximum.at(self.registers, (rows[live], index), rank)
+
+    def merge(self, other):
+        for row in range(self.capacity):
+            if other.days[row] > self.days[row]:
+                self.days[row] = other.days[row]
+                self.registers[row] = other.registers[row]
+            elif other.days[row] == self.days[row] >= 0:
+                np.maximum(self.registers[row], other.registers[row], out=self.registers[row])
+
+    def count(self, first_day, last_day):
+        """Distinct users across UTC days first_day..last_day (epoch days, inclusive)"""
+        rows = (self.days >= first_day) & (self.days <= last_day)
+        if not rows.any():
+            return 0.0
+        return _hll_estimate(self.registers[rows].max(axis=0))
+
+
+class CountMinSketch:
+    """Approximate per-item counts in depth x width cells; never undercounts"""
+
+    def __init__(self, width=CMS_WIDTH, depth=CMS_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    def _cells(self, items):
+        # Multiply-shift hashing, one multiplier per row
+        items = np.asarray(items, dtype=np.int64).astype(np.uint64)
+        mixed = CMS_MULTIPLIERS[:self.depth, None] * (items[None, :] + np.uint64(1))
+        return (mixed >> np.uint64(32)) % np.uint64(self.width)
+
+    def add(self, items, counts):
+        cells = self._cells(items).astype(np.int64)
+        for row in range(self.depth):
+            np.add.at(self.table[row], cells[row], counts)
+
+    def estimate(self, items):
+        cells = self._cells(items).astype(np.int64)
+        return self.table[np.arange(self.depth)[:, None], cells].min(axis=0)
+
+    def merge(self, other):
+        self.table += other.table
+
+
+class HeavyHitters:
+    """Count-Min sketch plus a heap of the current top-k items"""
+
+    def __init__(self, k=TOP_K, width=CMS_WIDTH, depth=CMS_DEPTH):
+        self.k = k
+        self.sketch = CountMinSketch(width, depth)
+        self.top = {}  # item -> estimated count, at most k entries
+
+    def add(self, items):
+        items, counts = np.unique(np.asarray(items, dtype=np.int64), return_counts=True)
+        if not len(items):
+            return
+        self.sketch.add(items, counts)
+        self._refresh(items)
+
+    def merge(self, other):
+        self.sketch.merge(other.sketch)
+        self._refresh(np.array(list(other.top), dtype=np.int64))
+
+    def _refresh(self, candidates):
+        """Re-estimate the current top items plus candidates and keep the k largest"""
+        items = np.union1d(np.array(list(self.top), dtype=np.int64), candidates)
+        estimates = self.sketch.estimate(items)
+        self.top = dict(heapq.nlargest(self.k, zip(items.tolist(), estimates.tolist()), key=itemgetter(1)))
+
+    def most_common(self, n=None):
+        """[(item, estimated count)] largest first"""
+        return sorted(self.top.items(), key=itemgetter(1), reverse=True)[:n or self.k]
+
+
+class EventSketches:
+    """
+    Distinct users (all time and per day) and most viewed/carted games.
+
+    Subscribe ``ingest`` to the event log; each flushed batch updates every
+    sketch in a few vectorized operations. A snapshot under this node's name
+    is saved after each batch so a restart only replays events newer than
+    ``watermark``, and ``cluster`` merges every node's snapshot.
+    """
+
+    def __init__(self, path=None, persist=True):
+        self.path = path or DATA_DIR / SKETCHES_DIR / f"{node_name()}.npz"
+        self.persist = persist
+        self._lock = threading.Lock()
+        self.watermark = None
+        self.users = HyperLogLog()
+        self.daily_users = DailyDistinct()
+        self.games = {name: HeavyHitters() for name in HEAVY_HITTERS}
+        if persist:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._load_snapshot()
+
+    def ingest(self, batch):
+        """Fold a batch of events (dict of column arrays from the event log) into every sketch"""
+        hashes = hash_users(batch["user_id"])
+        with self._lock:
+            self.users.add_hashes(hashes)
+            self.daily_users.add_hashes(batch["ts"], hashes)
+            for name, event in HEAVY_HITTERS.items():
+                self.games[name].add(batch["game_id"][batch["event"] == EVENT_CODES[event]])
+            newest = float(batch["ts"].max())
+            self.watermark = newest if self.watermark is None else max(self.watermark, newest)
+            if self.persist:
+                self._save_snapshot()
+
+    def merge(self, other):
+        """Fold another process's sketches into these"""
+        with self._lock:
+            self.users.merge(other.users)
+            self.daily_users.merge(other.daily_users)
+            for name, hitters in self.games.items():
+                hitters.merge(other.games[name])
+
+    # --- Reads ---
+
+    def distinct_users(self, days=None, now=None):
+        """
+        Approximate distinct users
+
+        Args:
+            days: Span in UTC days ending today (1 = today), or None for all time
+            now: Epoch seconds (defaults to now)
+        """
+        with self._lock:
+            if days is None:
+                return self.users.count()
+            today = int((now if now is not None else time.time()) // SECONDS_PER_DAY)
+            return self.daily_users.count(today - days + 1, today)
+
+    def top_games(self, name, n=None):
+        """[(game id, estimated count)] for "viewed" or "carted", largest first"""
+        with self._lock:
+            return self.games[name].most_common(n)
+
+    @classmethod
+    def cluster(cls, directory=None):
+        """Every node's latest snapshot merged into one set of sketches"""
+        directory = directory or DATA_DIR / SKETCHES_DIR
+        merged = cls(persist=False)
+        for path in sorted(directory.glob("[!.]*.npz")):
+            node = cls(path, persist=False)
+            node._load_snapshot()
+            merged.merge(node)
+        return merged
+
+    # --- Snapshot ---
+
+    def _save_snapshot(self):
+        arrays = {
+            "watermark": np.array([self.watermark]),
+            "users": self.users.registers,
+            "daily.registers": self.daily_users.registers,
+            "daily.days": self.daily_users.days,
+        }
+        for name, hitters in self.games.items():
+            arrays[f"{name}.table"] = hitters.sketch.table
+            arrays[f"{name}.top"] = np.array(list(hitters.top), dtype=np.int64)
+        tmp = self.path.with_name(f".{self.path.name}")
+        np.savez(tmp, **arrays)
+        tmp.replace(self.path)
+
+    def _load_snapshot(self):
+        if not self.path.exists():
+            return
+        with np.load(self.path, allow_pickle=False) as data:
+            if data["users"].shape == self.users.registers.shape:
+                self.users.registers = data["users"].copy()
+            if data["daily.registers"].shape == self.daily_users.registers.shape:
+                self.daily_users.registers = data["daily.registers"].copy()
+                self.daily_users.days = data["daily.days"].copy()
+            for name, hitters in self.games.items():
+                if f"{name}.table" in data and data[f"{name}.table"].shape == hitters.sketch.table.shape:
+                    hitters.sketch.table = data[f"{name}.table"].copy()
+                    hitters._refresh(data[f"{name}.top"])
+            self.watermark = float(data["watermark"][0])
@@ -303,6 +303,113 @@ def load_custom_css():
         border: 1px solid #3f3f46;
     }
     
+    /* ========================================
+       CARD LISTS - Whole pages of cards in one block
+       ======================================== */
+    
+    .card-list {
+        display: grid;
+        gap: 1.5rem;
+    }
+    
+    .card-list-rows {
+        grid-template-columns: 1fr;
+    }
+    
+    .card-list-grid {
+        grid-template-columns: repeat(auto-fit, minmax(260px, 1fr));
+    }
+    
+    .card-list-compact {
+        grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+        gap: 1rem;
+    }
+    
+    .card-row {
+        flex-direction: row;
+        gap: 1.5rem;
+        padding: 1rem;
+    }
+    
+    .card-row-image {
+        width: 25%;
+        max-width: 320px;
+        aspect-ratio: 1;
+        object-fit: cover;
+        border-radius: 8px;
+        background: #27272a;
+        flex-shrink: 0;
+    }
+    
+    .card-row-body {
+        flex: 1;
+        display: flex;
+        flex-direction: column;
+        min-width: 0;
+    }
+    
+    .card-row-header {
+        display: flex;
+        justify-content: space-between;
+        gap: 1rem;
+    }
+    
+    .card-meta {
+        color: #a1a1aa;
+        font-size: 0.875rem;
+        margin-bottom: 0.75rem;
+    }
+    
+    .card-image-missing {
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        color: #71717a;
+        font-size: 0.75rem;
+    }
+    
+    .card-details {
+        margin-top: 1rem;
+        padding-top: 1rem;
+        border-top: 1px solid #27272a;
+        color: #d4d4d8;
+        font-size: 0.875rem;
+        line-height: 1.6;
+    }
+    
+    .card-button {
+        flex: 1;
+        background: #3b82f6;
+        color: white;
+        border: none;
+        border-radius: 8px;
+        padding: 0.625rem 1.25rem;
+        font-weight: 600;
+        font-size: 0.875rem;
+        cursor: pointer;
+        transition: all 0.2s ease;
+        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.3);
+    }
+    
+    .card-button:hover {
+        background: #2563eb;
+        box-shadow: 0 4px 8px rgba(59, 130, 246, 0.3);
+        transform: translateY(-1px);
+    }
+    
+    .card-button.secondary,
+    .card-button.done {
+        background: transparent;
+        border: 1px solid #52525b;
+        color: #e4e4e7;
+    }
+    
+    .card-button.secondary:hover,
+    .card-button.done:hover {
+        background: #27272a;
+        border-color: #71717a;
+    }
+    
     /* ========================================
        STATS CARDS - Clean Information Display
        ======================================== */
@@ -403,6 +510,16 @@ def load_custom_css():
             height: 160px;
         }
         
+        .card-row {
+            flex-direction: column;
+        }
+        
+        .card-row-image {
+            width: 100%;
+            max-width: none;
+            aspect-ratio: 16 / 9;
+        }
+        
         .stat-number-modern {
             font-size: 1.5rem;
         }
@@ -3,37 +3,91 @@ GameVerse Analytics Dashboard
 Platform statistics and performance metrics
 """
 
+import time
+
 import streamlit as st
 import pandas as pd
-import numpy as np
+from data.catalog_stats import get_catalog_stats
+from data.event_export import export_events, read_exported, scan_plan
+from data.event_log import CHECKOUT
+from utils.funnels import STEP_NAMES, step_conversion
+from utils.helpers import (
+    get_chat_api_metrics, get_chat_telemetry, get_cluster_sketches, get_event_log, get_funnel_report, get_rollups
+)
+
+# Chart window -> (rollup resolution, span in seconds); each is at most a few hundred points
+CHART_WINDOWS = {
+    "Last hour": ("minute", 3600),
+    "Last 24 hours": ("hour", 86400),
+    "Last 30 days": ("day", 30 * 86400),
+}
+
+# Active-user window in days -> label
+ACTIVE_USER_WINDOWS = {1: "Active Today", 7: "Active (7 days)", 30: "Active (30 days)"}
+TOP_GAMES = 5
+EXPORT_WINDOW_DAYS = 30
 
 
 def render(games_df):
     """Render the analytics dashboard"""
     st.markdown("## Analytics Dashboard")
     
+    # Reads only what the event log's writer has flushed (every FLUSH_INTERVAL
+    # seconds); flushing here would write a tiny segment on every rerun
+    rollups = get_rollups()
+    sketches = get_cluster_sketches()
+    
     # Top-level metrics
-    render_key_metrics()
+    render_key_metrics(rollups, sketches)
+    
+    st.markdown("---")
+    
+    # Active users and most viewed/carted games
+    render_audience(sketches, games_df)
     
     st.markdown("---")
     
     # Performance charts
-    render_performance_charts()
+    render_performance_charts(rollups)
+    
+    st.markdown("---")
+    
+    # Conversion funnel
+    render_conversion_funnel(games_df)
     
     st.markdown("---")
     
     # Game statistics
     render_game_statistics(games_df)
+    
+    st.markdown("---")
+    
+    # Parquet export
+    render_event_export(games_df)
+
 
+def format_count(value):
+    """1,247 below ten thousand, 8.4k above"""
+    if value >= 1_000_000:
+        return f"{value / 1_000_000:.1f}M"
+    if value >= 10_000:
+        return f"{value / 1000:.1f}k"
+    return f"{value:,.0f}"
 
-def render_key_metrics():
+
+def render_key_metrics(rollups, sketches):
     """Render key performance metrics"""
     col1, col2, col3, col4 = st.columns(4)
     
+    total_users = sketches.distinct_users()
+    queries = rollups.total('queries')
+    sales = rollups.total('sales')
+    revenue = rollups.total('revenue')
+    
     with col1:
-        st.markdown("""
+        st.markdown(f"""
         <div class="stat-card">
-            <div class="stat-number">1,247</div>
+            <div class="stat-number">{format_count(total_users)}</div>
             <div class="stat-label">Total Users</div>
         </div>
         """, unsafe_allow_html=True)
@@ -41,84 +95,228 @@ def render_key_metrics():
     with col2:
         st.markdown(f"""
         <div class="stat-card">
-            <div class="stat-number">{st.session_state.chatbot_messages}</div>
+            <div class="stat-number">{format_count(queries)}</div>
             <div class="stat-label">Chatbot Queries</div>
         </div>
         """, unsafe_allow_html=True)
     
     with col3:
-        st.markdown("""
+        st.markdown(f"""
         <div class="stat-card">
-            <div class="stat-number">8.4k</div>
+            <div class="stat-number">{format_count(sales)}</div>
             <div class="stat-label">Games Sold</div>
         </div>
         """, unsafe_allow_html=True)
     
     with col4:
-        st.markdown("""
+        st.markdown(f"""
         <div class="stat-card">
-            <div class="stat-number">$142k</div>
+            <div class="stat-number">${format_count(revenue)}</div>
             <div class="stat-label">Revenue</div>
         </div>
         """, unsafe_allow_html=True)
 
 
-def render_performance_charts():
-    """Render performance charts"""
+def render_audience(sketches, games_df):
+    """Render approximate active users and the most viewed/carted games"""
+    st.markdown("### Audience")
+    
+    for col, (days, label) in zip(st.columns(len(ACTIVE_USER_WINDOWS)), ACTIVE_USER_WINDOWS.items()):
+        with col:
+            st.metric(label, f"~{format_count(sketches.distinct_users(days))}")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("#### Most Viewed Games")
+        render_top_games(sketches.top_games('viewed', TOP_GAMES), games_df, "Views")
+    
+    with col2:
+        st.markdown("#### Most Added to Cart")
+        render_top_games(sketches.top_games('carted', TOP_GAMES), games_df, "Adds")
+
+
+def render_top_games(top, games_df, count_label):
+    """Table of (game id, estimated count) pairs with game titles"""
+    if not top:
+        st.info("No activity recorded yet.")
+        return
+    game_ids, counts = zip(*top)
+    titles = games_df['title'].reindex(list(game_ids)).fillna("Unknown game")
+    st.dataframe(
+        pd.DataFrame({'Game': titles.to_numpy(), count_label: counts}),
+        use_container_width=True,
+        hide_index=True
+    )
+
+
+def render_performance_charts(rollups):
+    """Render performance charts from the incremental rollups"""
     st.markdown("### Performance Metrics")
     
-    # Generate sample data
-    dates = pd.date_range('2024-01-01', periods=30)
-    chart_data = pd.DataFrame({
-        'Date': dates,
-        'Queries': np.random.randint(20, 100, 30),
-        'Sales': np.random.randint(10, 50, 30),
-        'Revenue': np.random.randint(500, 2000, 30)
-    })
+    window = st.radio("Window", list(CHART_WINDOWS), index=2, horizontal=True, label_visibility="collapsed")
+    resolution, span = CHART_WINDOWS[window]
+    now = time.time()
+    chart_data = rollups.frame(['queries', 'sales', 'revenue'], resolution, now - span, now)
     
     tab1, tab2, tab3 = st.tabs(["Chatbot Activity", "Sales", "Revenue"])
     
     with tab1:
         st.markdown("#### Chatbot Queries Over Time")
-        st.line_chart(chart_data.set_index('Date')['Queries'])
+        st.line_chart(chart_data['queries'].rename('Queries'))
+        render_chatbot_performance(resolution, now - span, now)
     
     with tab2:
-        st.markdown("#### Daily Sales")
-        st.area_chart(chart_data.set_index('Date')['Sales'])
+        st.markdown(f"#### Sales per {resolution.title()}")
+        st.area_chart(chart_data['sales'].rename('Sales'))
     
     with tab3:
         st.markdown("#### Revenue Trend")
-        st.bar_chart(chart_data.set_index('Date')['Revenue'])
+        st.bar_chart(chart_data['revenue'].rename('Revenue'))
+
+
+def render_chatbot_performance(resolution, start, end):
+    """Render reply latency percentiles, timeout rate and API call stats for the chart window"""
+    telemetry = get_chat_telemetry()
+    summary = telemetry.summary(resolution, start, end)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Reply p50", format_ms(summary['reply_p50']))
+    col2.metric("Reply p95", format_ms(summary['reply_p95']))
+    col3.metric("Timeout Rate", format_rate(summary['timeout_rate']))
+    col4.metric("Fast-Path Replies", format_rate(summary['fast_path_rate']),
+                help="Replies already waiting at the first poll")
+    st.caption(
+        f"{summary['queries']:,} queries · {summary['timeouts']:,} timeouts · {summary['failures']:,} failures · "
+        f"send p95 {format_ms(summary['send_p95'])} · "
+        f"{summary['avg_polls']:.1f} polls per query" if summary['queries'] else "No chatbot queries in this window yet."
+    )
+    
+    perf = telemetry.frame(resolution, start, end)
+    st.markdown("#### Time to First Reply (ms)")
+    st.line_chart(perf[['reply_p50', 'reply_p95', 'reply_p99']].rename(columns={
+        'reply_p50': 'p50', 'reply_p95': 'p95', 'reply_p99': 'p99',
+    }))
+    st.markdown("#### Timeout Rate")
+    st.line_chart(perf['timeout_rate'].rename('Timeout rate'))
+    
+    # Only the chatbot's client records API calls; nothing to show until it has made some
+    endpoints = get_chat_api_metrics().snapshot()['endpoints']
+    if endpoints:
+        with st.expander("Botpress API calls"):
+            st.dataframe(
+                pd.DataFrame.from_dict(endpoints, orient='index').drop(columns=['buckets']),
+                use_container_width=True
+            )
+
+
+def format_ms(value):
+    """Milliseconds for a metric tile; bucket bounds, so shown as ≤"""
+    if value is None:
+        return "–"
+    return f"≤{value / 1000:.1f}s" if value >= 1000 else f"≤{value:.0f}ms"
+
+
+def format_rate(value):
+    return "–" if value is None else f"{value:.1%}"
+
+
+def render_conversion_funnel(games_df):
+    """Render browse → wishlist → cart → checkout conversion by category and acquisition week"""
+    st.markdown("### Conversion Funnel")
+    
+    report = get_funnel_report(games_df)
+    overall = report['overall']
+    
+    for col, (step, name) in zip(st.columns(len(STEP_NAMES)), enumerate(STEP_NAMES)):
+        previous = overall[STEP_NAMES[step - 1]] if step else 0
+        detail = f"{overall[name] / previous:.0%} of {STEP_NAMES[step - 1].lower()}" if previous else "users"
+        with col:
+            st.markdown(f"""
+            <div class="stat-card">
+                <div class="stat-number">{format_count(overall[name])}</div>
+                <div class="stat-label">{name} · {detail}</div>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    tab1, tab2 = st.tabs(["By Category", "By Acquisition Week"])
+    
+    with tab1:
+        render_funnel_table(report['by_category'])
+    
+    with tab2:
+        by_cohort = report['by_cohort'].sort_index(ascending=False)
+        by_cohort.index = by_cohort.index.strftime("Week of %Y-%m-%d")
+        render_funnel_table(by_cohort)
+
+
+def render_funnel_table(counts):
+    """Step counts followed by step-to-step conversion rates"""
+    if counts.empty:
+        st.info("No funnel activity recorded yet.")
+        return
+    rates = step_conversion(counts)
+    config = {label: st.column_config.NumberColumn(label, format="percent") for label in rates.columns}
+    st.dataframe(counts.join(rates), column_config=config, use_container_width=True)
 
 
 def render_game_statistics(games_df):
-    """Render game catalog statistics"""
+    """Render game catalog statistics, cached per catalog version"""
     st.markdown("### Game Catalog Statistics")
     
+    stats = get_catalog_stats(games_df)
+    
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("#### Games by Category")
-        category_counts = games_df['category'].value_counts()
-        st.bar_chart(category_counts)
+        st.bar_chart(stats['category_counts'])
     
     with col2:
         st.markdown("#### Price Distribution")
-        price_ranges = pd.cut(
-            games_df['price'],
-            bins=[0, 0.01, 20, 40, 100],
-            labels=['Free', 'Under $20', '$20-$40', '$40+']
-        )
-        price_dist = price_ranges.value_counts()
-        st.bar_chart(price_dist)
+        st.bar_chart(stats['price_histogram'], sort=False)
     
     # Top rated games
     st.markdown("---")
     st.markdown("### Top Rated Games")
     
-    top_games = games_df.nlargest(5, 'rating')[['title', 'rating', 'category', 'price']]
     st.dataframe(
-        top_games,
+        stats['top_rated'],
+        use_container_width=True,
+        hide_index=True
+    )
+
+
+def render_event_export(games_df):
+    """Render the Parquet export controls and revenue by game from the exported data"""
+    st.markdown("### Event Export")
+    
+    if st.button("Export Events to Parquet"):
+        event_log = get_event_log()
+        event_log.flush()  # include events still buffered
+        exported = export_events(event_log)
+        st.success(f"Exported {sum(exported.values()):,} events from {len(exported)} changed day(s)")
+    
+    start = time.time() - EXPORT_WINDOW_DAYS * 86400
+    checkouts = read_exported(start=start, events=[CHECKOUT], columns=['game_id', 'value'])
+    if checkouts.empty:
+        st.info("No exported checkouts in the last 30 days yet.")
+        return
+    
+    st.markdown(f"#### Revenue by Game (last {EXPORT_WINDOW_DAYS} days, exported data)")
+    revenue = checkouts.groupby('game_id')['value'].agg(['count', 'sum']).sort_values('sum', ascending=False)
+    st.dataframe(
+        pd.DataFrame({
+            'Game': games_df['title'].reindex(revenue.index).fillna("Unknown game").to_numpy(),
+            'Sold': revenue['count'].to_numpy(),
+            'Revenue': revenue['sum'].round(2).to_numpy(),
+        }),
         use_container_width=True,
         hide_index=True
-    )
\ No newline at end of file
+    )
+    
+    plan = scan_plan(start=start, events=[CHECKOUT])
+    st.caption(
+        f"Read {plan['files']} of {plan['total_files']} files "
+        f"({plan['row_groups']} row groups)"
+    )
@@ -3,9 +3,13 @@ GameVerse Browse Page - Redesigned
 Clean filter interface with modern game cards
 """
 
+from html import escape
+
 import streamlit as st
-from utils.helpers import add_to_cart, add_to_wishlist, format_price
-from data.games_data import filter_games, get_categories
+from utils.helpers import format_price, track_event
+from utils.card_list import action_button, card_details, card_image, card_tags, details_open, render_card_list
+from data.games_data import PRICE_BUCKETS, filter_games, get_categories
+from data.event_log import SEARCH
 
 
 def render(games_df):
@@ -30,9 +34,8 @@ def render(games_df):
     if filtered_df.empty:
         st.info("No games found matching your criteria. Try adjusting the filters.")
     else:
-        for _, game in filtered_df.iterrows():
-            render_browse_game_card(game.to_dict())
-            st.markdown('<div style="margin: 1.5rem 0;"></div>', unsafe_allow_html=True)
+        cards = [browse_card_html(game) for game in filtered_df.to_dict('records')]
+        render_card_list("browse_cards", cards, games_df)
 
 
 def render_filters(games_df):
@@ -45,7 +48,8 @@ def render_filters(games_df):
             "Search games",
             key="search_input",
             placeholder="Enter game title...",
-            label_visibility="collapsed"
+            label_visibility="collapsed",
+            on_change=track_search
         )
     
     with col2:
@@ -60,7 +64,7 @@ def render_filters(games_df):
     with col3:
         st.selectbox(
             "Price Range",
-            ["All Prices", "Free", "Under $20", "$20-$40", "$40+"],
+            ["All Prices", *PRICE_BUCKETS],
             key="price_filter",
             label_visibility="collapsed"
         )
@@ -68,6 +72,13 @@ def render_filters(games_df):
     st.markdown('<div style="margin: 1.5rem 0;"></div>', unsafe_allow_html=True)
 
 
+def track_search():
+    """Record a search when the user submits new search text"""
+    search = st.session_state.get("search_input", "").strip()
+    if search:
+        track_event(SEARCH, label=search)
+
+
 def apply_filters(games_df):
     """Apply filter selections to games dataframe"""
     search = st.session_state.get("search_input", "")
@@ -90,7 +101,7 @@ def apply_filters(games_df):
     )
 
 
-def render_browse_game_card(game):
+def browse_card_html(game):
     """
     Render a game card optimized for browse view
     
@@ -100,95 +111,30 @@ def render_browse_game_card(game):
     - Actions readily accessible
     - Consistent with overall modern aesthetic
     """
-    
-    # Card container
-    st.markdown('<div class="game-card-modern" style="display: flex; flex-direction: row; overflow: visible;">', unsafe_allow_html=True)
-    
-    # Left side - Image
-    col1, col2 = st.columns([1, 3])
-    
-    with col1:
-        try:
-            st.image(game.get('image_url', ''), use_container_width=True)
-        except:
-            st.markdown("""
-            <div style="background: #27272a; 
-                        height: 180px;
-                        border-radius: 8px;
-                        display: flex; 
-                        align-items: center; 
-                        justify-content: center;
-                        color: #71717a;
-                        font-size: 0.75rem;">
-                No Image
+    in_cart = int(game['id']) in st.session_state.cart
+    saved = int(game['id']) in st.session_state.wishlist
+    stars = "⭐" * int(game.get('rating', 0))
+    details = card_details(game) if details_open(game) else ""
+    
+    return f"""
+    <div class="game-card-modern card-row">
+        {card_image(game, "thumb", "card-row-image")}
+        <div class="card-row-body">
+            <div class="card-row-header">
+                <div class="game-card-title">{escape(game['title'])}</div>
+                <div class="game-card-price">{format_price(game['price'])}</div>
             </div>
-            """, unsafe_allow_html=True)
-    
-    # Right side - Content
-    with col2:
-        # Title and price
-        col_title, col_price = st.columns([3, 1])
-        with col_title:
-            st.markdown(f"### {game['title']}")
-        with col_price:
-            price_text = format_price(game['price'])
-            st.markdown(f'<div class="game-card-price" style="text-align: right;">{price_text}</div>', unsafe_allow_html=True)
-        
-        # Metadata
-        stars = "⭐" * int(game.get('rating', 0))
-        st.markdown(f"""
-        <div style="color: #a1a1aa; font-size: 0.875rem; margin-bottom: 0.75rem;">
-            {game['category']} · {game['developer']} · {stars} ({game.get('rating', 0)})
+            <div class="card-meta">
+                {escape(game['category'])} · {escape(game['developer'])} · {stars} ({game.get('rating', 0)})
+            </div>
+            <p class="game-card-description">{escape(game['description'][:180])}...</p>
+            <div>{card_tags(game)}</div>
+            <div class="game-card-actions" style="margin-top: 1rem;">
+                {action_button("cart", game, "Add to Cart", "✓ In Cart", done=in_cart)}
+                {action_button("wishlist", game, "Wishlist", "✓ Saved", done=saved)}
+                {action_button("details", game, "Hide Details" if details else "View Details", secondary=True)}
+            </div>
+            {details}
         </div>
-        """, unsafe_allow_html=True)
-        
-        # Description
-        st.markdown(f"<p style='color: #a1a1aa; font-size: 0.875rem; line-height: 1.5;'>{game['description'][:180]}...</p>", unsafe_allow_html=True)
-        
-        # Tags
-        tags_html = " ".join([
-            f"<span class='game-tag-modern'>{tag}</span>" 
-            for tag in game.get('tags', [])[:4]
-        ])
-        st.markdown(tags_html, unsafe_allow_html=True)
-        
-        # Actions
-        st.markdown('<div style="margin-top: 1rem;"></div>', unsafe_allow_html=True)
-        col_a, col_b, col_c = st.columns([1, 1, 2])
-        
-        with col_a:
-            if st.button("Add to Cart", key=f"cart_browse_{game['id']}", use_container_width=True):
-                if add_to_cart(game):
-                    st.success("✓ Added")
-                else:
-                    st.info("In cart")
-        
-        with col_b:
-            if st.button("Wishlist", key=f"wish_browse_{game['id']}", use_container_width=True):
-                if add_to_wishlist(game):
-                    st.success("✓ Saved")
-                else:
-                    st.info("Saved")
-        
-        with col_c:
-            if st.button("View Details", key=f"details_{game['id']}", use_container_width=True):
-                show_game_details(game)
-    
-    st.markdown('</div>', unsafe_allow_html=True)
-
-
-def show_game_details(game):
-    """Show detailed game information in an expander"""
-    with st.expander("📋 Game Details", expanded=True):
-        st.markdown(f"""
-        **Full Description:**  
-        {game['description']}
-        
-        **Game Information:**
-        - **Category:** {game['category']}
-        - **Developer:** {game['developer']}
-        - **Release Date:** {game.get('release_date', 'N/A')}
-        - **Rating:** {game.get('rating', 0)}/5.0
-        
-        **Tags:** {', '.join(game.get('tags', []))}
-        """)
\ No newline at end of file
+    </div>
+    """
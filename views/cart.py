@@ -4,7 +4,14 @@ Manage cart items and checkout
 """
 
 import streamlit as st
-from utils.helpers import calculate_cart_total, format_price
+from utils.helpers import (
+    calculate_cart_total, clear_cart, format_price, get_license_allocator, get_order_ledger, get_user_id,
+    remove_from_cart, reprice_cart, track_event
+)
+from data.games_data import get_games_by_ids
+from data.event_log import CHECKOUT
+from data.license_store import SoldOutError
+from data.order_ledger import new_order_id
 
 
 def render(games_df):
@@ -19,16 +26,17 @@ def render(games_df):
             st.rerun()
         return
     
-    # Display cart items
-    for idx, game in enumerate(st.session_state.cart):
-        render_cart_item(game, idx)
+    # Display cart items (resolved against the live catalog)
+    cart_games = get_games_by_ids(games_df, st.session_state.cart)
+    for game in cart_games.to_dict('records'):
+        render_cart_item(game)
     
     # Cart summary
     st.markdown("---")
-    render_cart_summary()
+    render_cart_summary(games_df)
 
 
-def render_cart_item(game, idx):
+def render_cart_item(game):
     """Render a single cart item"""
     col1, col2, col3 = st.columns([3, 1, 1])
     
@@ -41,16 +49,16 @@ def render_cart_item(game, idx):
         st.markdown(f"**{format_price(price)}**")
     
     with col3:
-        if st.button("Remove", key=f"remove_{idx}"):
-            st.session_state.cart.pop(idx)
+        if st.button("Remove", key=f"remove_{game['id']}"):
+            remove_from_cart(game['id'])
             st.rerun()
     
     st.markdown("---")
 
 
-def render_cart_summary():
+def render_cart_summary(games_df):
     """Render cart summary and checkout"""
-    total = calculate_cart_total()
+    total = calculate_cart_total(games_df)
     
     col1, col2 = st.columns([2, 1])
     
@@ -60,23 +68,69 @@ def render_cart_summary():
     
     with col2:
         if st.button("Proceed to Checkout", type="primary", use_container_width=True):
-            handle_checkout()
+            handle_checkout(games_df)
 
 
-def handle_checkout():
+def handle_checkout(games_df):
     """Handle checkout process"""
-    total = calculate_cart_total()
+    # Re-price the whole cart against the live catalog before charging
+    validation = reprice_cart(games_df)
+    if validation['removed_ids'] or not validation['changed'].empty:
+        render_cart_changes(validation)
+        return
+    
+    items = validation['items'][['id', 'title', 'price']].to_dict('records')
+    
+    # Reserve a license key per game first so a sold-out game never gets recorded
+    allocator = get_license_allocator()
+    order_id = new_order_id()
+    try:
+        licenses = allocator.allocate(order_id, get_user_id(), [item['id'] for item in items])
+    except SoldOutError as e:
+        sold_out = [item['title'] for item in items if item['id'] in e.game_ids]
+        st.error(f"Sorry, we're out of license keys for: {', '.join(sold_out)}. Remove them to check out.")
+        return
+    except Exception as e:
+        st.error(f"Checkout failed, your cart was kept: {e}")
+        return
+    
+    try:
+        order = get_order_ledger().record_order(get_user_id(), items, order_id=order_id)
+    except Exception as e:
+        allocator.release(order_id)
+        st.error(f"Checkout failed, your cart was kept: {e}")
+        return
+    
+    for item in order['items']:
+        track_event(CHECKOUT, item['game_id'], item['price'], order['order_id'])
     
     st.balloons()
-    st.success(f"Order placed successfully! Total: {format_price(total)}")
+    st.success(f"Order placed successfully! Total: {format_price(order['total'])}")
     
     # Show order summary
     with st.expander("Order Summary", expanded=True):
+        st.markdown(f"**Order ID:** `{order['order_id']}`")
         st.markdown("**Items Purchased:**")
-        for game in st.session_state.cart:
-            st.markdown(f"- {game['title']} - {format_price(game['price'])}")
-        st.markdown(f"\n**Total: {format_price(total)}**")
+        for item in order['items']:
+            st.markdown(
+                f"- {item['title']} - {format_price(item['price'])} · "
+                f"key `{licenses[item['game_id']]}`"
+            )
+        st.markdown(f"\n**Total: {format_price(order['total'])}**")
         st.info("This is a demo. No actual payment was processed.")
     
     # Clear cart
-    st.session_state.cart = []
\ No newline at end of file
+    clear_cart()
+
+
+def render_cart_changes(validation):
+    """Tell the user what changed since items were added, before anything is charged"""
+    st.warning("Your cart changed since you added these items. Please review and check out again.")
+    
+    for row in validation['changed'].itertuples():
+        st.markdown(f"- **{row.title}**: {format_price(row.old_price)} → {format_price(row.new_price)}")
+    
+    if validation['removed_ids']:
+        st.markdown(f"- {len(validation['removed_ids'])} item(s) are no longer available and were removed")
+    
+    st.markdown(f"**Updated total: {format_price(validation['total'])}**")
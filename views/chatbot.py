@@ -1,12 +1,19 @@
 """
-GameVerse AI Chatbot - FIXED POLLING
-Uses reliable polling instead of hanging streams for instant responses.
+GameVerse AI Chatbot - BACKGROUND REPLIES
+Sends and polls for replies on a background worker so the page never blocks.
 """
 
 import streamlit as st
-import time
-from utils.botpress_client import BotpressClient 
-import re
+from utils.botpress_client import BotpressClient, MESSAGE_PAGE_SIZE, contains_html
+from utils.prefetch import HistoryPrefetcher, create_prefetch_executor
+from utils.reply_worker import ReplyJob, ReplyWorker, create_reply_executor
+from utils.session_memory import compact_conversation_history, mark_shared
+from utils.helpers import get_chat_api_metrics, get_chat_telemetry, track_event
+from data.history_store import HistoryStore
+from data.event_log import CHATBOT_QUERY
+
+MAX_SYNC_PAGES = 5  # newest pages scanned for the last stored message before resyncing
+REPLY_REFRESH_SECONDS = 0.5  # how often the pending-reply fragment checks the worker
 
 
 def render(games_df):
@@ -32,7 +39,8 @@ def render(games_df):
         return
     
     # 3. Initialize Global State
-    initialize_global_state(client)
+    store = get_history_store()
+    initialize_global_state(client, store, user_id)
     
     # 4. Render Selector
     render_conversation_selector(client)
@@ -42,30 +50,38 @@ def render(games_df):
     # 5. Get Current Conversation ID
     conversation_id = st.session_state.active_conversation
     
-    # 6. Ensure History is Loaded
+    # 6. Ensure History is Loaded (newest page only, usually prefetched)
     if conversation_id not in st.session_state.conversation_history:
-        with st.spinner("Loading history..."):
-            messages = fetch_messages_from_api(client, conversation_id, user_id)
-            st.session_state.conversation_history[conversation_id] = messages
+        if st.session_state.history_prefetcher.is_ready(conversation_id):
+            load_history(client, store, conversation_id, user_id)
+        else:
+            with st.spinner("Loading history..."):
+                load_history(client, store, conversation_id, user_id)
             
-    # 7. Display Messages
+    # 7. Pick up replies the background worker finished since the last run
+    collect_replies(conversation_id)
+    compact_session_history(conversation_id)
+    
+    # 8. Display Messages
+    render_load_older(client, store, conversation_id, user_id)
     current_messages = st.session_state.conversation_history[conversation_id]
     
     for message in current_messages:
         with st.chat_message(message["role"]):
-            if contains_html(message["content"]):
+            is_html = message.get("is_html")
+            if is_html is None:
+                is_html = contains_html(message["content"])
+            if is_html:
                 st.markdown(message["content"], unsafe_allow_html=True)
             else:
                 st.markdown(message["content"])
     
-    # 8. Handle Input
-    handle_chat_input(client, conversation_id, user_id)
-
-
-def contains_html(text):
-    """Check if text contains HTML tags"""
-    html_pattern = re.compile(r'<[^>]+>')
-    return bool(html_pattern.search(text))
+    # 9. Show the pending reply (refreshes itself until the reply lands)
+    if st.session_state.reply_worker.is_pending(conversation_id):
+        render_pending_reply(conversation_id)
+    
+    # 10. Handle Input
+    handle_chat_input(conversation_id, user_id)
 
 
 @st.cache_resource
@@ -76,22 +92,95 @@ def get_or_create_client():
         user_key = st.secrets.get("users", [{}])[0].get("key") 
         if not api_id or not user_key:
             return None
-        return BotpressClient(api_id=api_id, user_key=user_key)
+        return mark_shared(BotpressClient(
+            api_id=api_id,
+            user_key=user_key,
+            base_uri=st.secrets.get("BOTPRESS_BASE_URI"),
+            metrics=get_chat_api_metrics(),
+        ))
     except Exception as e:
         st.error(f"Failed to initialize client: {str(e)}")
         return None
 
 
-def initialize_global_state(client):
+@st.cache_resource
+def get_prefetch_executor():
+    """Thread pool shared by all sessions for history prefetching."""
+    return create_prefetch_executor()
+
+
+@st.cache_resource
+def get_reply_executor():
+    """Thread pool shared by all sessions for send-and-await jobs."""
+    return create_reply_executor()
+
+
+@st.cache_resource
+def get_history_store():
+    """Open the on-disk conversation history store."""
+    return mark_shared(HistoryStore())
+
+
+def load_history(client, store, conversation_id, user_id):
+    """Sync a conversation to disk, then load its newest page into session history."""
+    sync_history(client, store, conversation_id, user_id)
+    messages, oldest_seq = store.page(conversation_id, limit=MESSAGE_PAGE_SIZE)
+    st.session_state.conversation_history[conversation_id] = messages
+    st.session_state.history_cursors[conversation_id] = oldest_seq
+
+
+def sync_history(client, store, conversation_id, user_id):
+    """Fetch only messages newer than the last one stored on disk."""
+    if not store.has_messages(conversation_id):
+        messages, next_token = fetch_messages_from_api(client, conversation_id, user_id)
+        if messages is not None:
+            store.replace_messages(conversation_id, user_id, messages, next_token)
+        return
+    
+    newest_id = store.newest_message_id(conversation_id)
+    fresh, next_token = [], None
+    for _ in range(MAX_SYNC_PAGES):
+        messages, next_token = fetch_messages_from_api(
+            client, conversation_id, user_id, next_token=next_token
+        )
+        if messages is None:
+            return
+        ids = [message["id"] for message in messages]
+        if newest_id in ids:
+            fresh = messages[ids.index(newest_id) + 1:] + fresh
+            store.append_newer(conversation_id, fresh)
+            return
+        fresh = messages + fresh
+        if not next_token:
+            break
+    
+    # The stored run is too far behind (or gone): start over from the newest pages
+    store.replace_messages(conversation_id, user_id, fresh, next_token)
+
+
+def initialize_global_state(client, store, user_id):
     """Initialize history and load conversation list."""
     if "conversation_history" not in st.session_state:
         st.session_state.conversation_history = {}
+    if "history_cursors" not in st.session_state:
+        st.session_state.history_cursors = {}
+    if "conversation_access" not in st.session_state:
+        st.session_state.conversation_access = {}  # least recently viewed first
     if "conversations_loaded" not in st.session_state:
         st.session_state.conversations_loaded = False
+    if "history_prefetcher" not in st.session_state:
+        st.session_state.history_prefetcher = HistoryPrefetcher(client, get_prefetch_executor())
+    if "reply_worker" not in st.session_state:
+        st.session_state.reply_worker = ReplyWorker(client, get_reply_executor(), telemetry=get_chat_telemetry())
     
     if not st.session_state.conversations_loaded:
         conversations_data = client.list_conversations()
-        conversations = conversations_data.get("conversations", [])
+        if "error" in conversations_data:
+            # Botpress unreachable: fall back to the conversations stored on disk
+            conversations = store.load_conversations(user_id)
+        else:
+            conversations = conversations_data.get("conversations", [])
+            store.save_conversations(user_id, conversations)
         if not conversations:
             res = client.create_conversation()
             if "conversation" in res:
@@ -100,6 +189,11 @@ def initialize_global_state(client):
         st.session_state.conversations = conversations
         st.session_state.conversations_loaded = True
         
+        # Warm the newest page of each conversation so switching is instant
+        prefetcher = st.session_state.history_prefetcher
+        prefetcher.cancel()
+        prefetcher.prefetch(conv["id"] for conv in conversations)
+        
         if conversations and "active_conversation" not in st.session_state:
             st.session_state.active_conversation = conversations[0]["id"]
 
@@ -144,75 +238,136 @@ def create_new_conversation(client):
         cid = new_conv["id"]
         st.session_state.conversations.append(new_conv)
         st.session_state.conversation_history[cid] = []
+        st.session_state.history_cursors[cid] = None
         st.session_state.active_conversation = cid
         st.rerun()
 
 
-def fetch_messages_from_api(client, conversation_id, user_id):
-    """Fetch messages and format."""
+def fetch_messages_from_api(client, conversation_id, user_id, next_token=None):
+    """
+    Fetch one page of messages and format.
+
+    Returns the page in chronological order plus the cursor for the
+    next (older) page, or None when the start of the history is reached.
+    Messages are None if the request failed.
+    """
     try:
-        messages_data = client.list_messages(conversation_id, limit=50)
+        messages_data = client.list_messages(
+            conversation_id, limit=MESSAGE_PAGE_SIZE, next_token=next_token
+        )
+        if "error" in messages_data:
+            st.error(f"Error loading history: {messages_data['error']}")
+            return None, next_token
         messages = messages_data.get("messages", [])
+        page_token = messages_data.get("meta", {}).get("nextToken")
         chat_messages = []
         for message in reversed(messages):
             role = "user" if message.get("userId") == user_id else "assistant"
             text = message.get("payload", {}).get("text", "")
             if text:
-                chat_messages.append({"role": role, "content": text})
-        return chat_messages
+                chat_messages.append({
+                    "id": message.get("id"),
+                    "role": role,
+                    "content": text,
+                    "is_html": message.get("is_html", False),
+                    "page_token": page_token,
+                })
+        return chat_messages, page_token
     except Exception as e:
         st.error(f"Error loading history: {e}")
-        return []
+        return None, next_token
+
+
+def render_load_older(client, store, conversation_id, user_id):
+    """Offer to load the previous page of history when there is one."""
+    oldest_seq = st.session_state.history_cursors.get(conversation_id)
+    if oldest_seq is None or not store.has_older(conversation_id, oldest_seq):
+        return
+    
+    if st.button("⬆️ Load older messages", key=f"load_older_{conversation_id}"):
+        with st.spinner("Loading older messages..."):
+            older, oldest_seq = load_older_page(client, store, conversation_id, user_id, oldest_seq)
+        history = st.session_state.conversation_history[conversation_id]
+        st.session_state.conversation_history[conversation_id] = older + history
+        st.session_state.history_cursors[conversation_id] = oldest_seq
+        st.rerun()
 
 
-def handle_chat_input(client, conversation_id, user_id):
-    """Handle input, send message, and POLL for response."""
+def load_older_page(client, store, conversation_id, user_id, before_seq):
+    """Read the next older page from disk, fetching it from the API if not stored yet."""
+    older, oldest_seq = store.page(conversation_id, before_seq=before_seq, limit=MESSAGE_PAGE_SIZE)
+    if older:
+        return older, oldest_seq
+    
+    conversation = store.get_conversation(conversation_id) or {}
+    messages, next_token = fetch_messages_from_api(
+        client, conversation_id, user_id, next_token=conversation.get("older_token")
+    )
+    if messages is None:
+        return [], before_seq
+    store.prepend_older(conversation_id, messages, next_token)
+    return store.page(conversation_id, before_seq=before_seq, limit=MESSAGE_PAGE_SIZE)
+
+
+def handle_chat_input(conversation_id, user_id):
+    """Handle input: show the message right away and hand the send to the worker."""
     if prompt := st.chat_input("Ask me about games..."):
         
-        # 1. Update LOCAL cache (User message)
-        user_msg = {"role": "user", "content": prompt}
+        # 1. Update LOCAL cache (User message, shown optimistically)
+        user_msg = {"role": "user", "content": prompt, "is_html": contains_html(prompt)}
         st.session_state.conversation_history[conversation_id].append(user_msg)
         
-        with st.chat_message("user"):
-            st.markdown(prompt)
-        
-        # 2. Send to Botpress
-        try:
-            client.create_message(prompt, conversation_id=conversation_id)
-        except Exception as e:
-            st.error(f"Failed to send: {e}")
-            return
-        
-        # 3. Poll for Response
-        with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                # Poll for up to 10 seconds (20 checks)
-                for _ in range(20):
-                    time.sleep(0.5)
-                    
-                    # Fetch latest messages, BYPASSING CACHE
-                    messages_data = client.list_messages(conversation_id, limit=5, ignore_cache=True)
-                    messages = messages_data.get("messages", [])
-                    
-                    if messages:
-                        # API returns newest first. Check the latest message.
-                        last_msg = messages[0]
-                        
-                        # Verify it's from the bot and it's new (not the user message we just sent)
-                        if last_msg.get("userId") != user_id:
-                            
-                            text = last_msg.get("payload", {}).get("text", "")
-                            
-                            # Update LOCAL cache (Assistant message)
-                            bot_msg = {"role": "assistant", "content": text}
-                            st.session_state.conversation_history[conversation_id].append(bot_msg)
-                            
-                            if "chatbot_messages" not in st.session_state:
-                                st.session_state.chatbot_messages = 0
-                            st.session_state.chatbot_messages += 1
-                            
-                            # Rerun immediately to show the new state
-                            st.rerun()
-                            return
-                            
-                st.warning("⚠️ No response received within timeout.")
\ No newline at end of file
+        # 2. Send and await the reply in the background
+        st.session_state.reply_worker.submit(conversation_id, user_id, prompt)
+        track_event(CHATBOT_QUERY, label=conversation_id)
+        st.rerun()
+
+
+@st.fragment(run_every=REPLY_REFRESH_SECONDS)
+def render_pending_reply(conversation_id):
+    """Placeholder for the bot's reply; reruns the page once the worker has it."""
+    if st.session_state.reply_worker.has_finished(conversation_id):
+        st.rerun()
+    
+    with st.chat_message("assistant"):
+        st.markdown("_Thinking..._")
+
+
+def collect_replies(conversation_id):
+    """Append finished replies to the local history and surface failures."""
+    for job in st.session_state.reply_worker.collect(conversation_id):
+        if job.status == ReplyJob.DONE:
+            # Update LOCAL cache (Assistant message)
+            reply = job.reply
+            bot_msg = {
+                "id": reply.get("id"),
+                "role": "assistant",
+                "content": reply.get("payload", {}).get("text", ""),
+                "is_html": reply.get("is_html", False),
+            }
+            st.session_state.conversation_history[conversation_id].append(bot_msg)
+            
+            if "chatbot_messages" not in st.session_state:
+                st.session_state.chatbot_messages = 0
+            st.session_state.chatbot_messages += 1
+        elif job.status == ReplyJob.TIMEOUT:
+            st.warning("⚠️ No response received within timeout.")
+        else:
+            st.error(f"Failed to get a reply: {job.error}")
+
+
+def compact_session_history(conversation_id):
+    """Bound the history this session holds; anything dropped stays in the history store."""
+    access = st.session_state.conversation_access
+    access.pop(conversation_id, None)
+    access[conversation_id] = None
+    
+    history = st.session_state.conversation_history
+    worker = st.session_state.reply_worker
+    compact_conversation_history(
+        history,
+        st.session_state.history_cursors,
+        access,
+        active_id=conversation_id,
+        keep_ids=[cid for cid in history if worker.is_pending(cid)],
+    )
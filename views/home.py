@@ -3,8 +3,11 @@ GameVerse Home Page - Redesigned
 Clean, modern layout with integrated action buttons
 """
 
+from html import escape
+
 import streamlit as st
-from utils.helpers import add_to_cart, add_to_wishlist, format_price
+from utils.helpers import format_price
+from utils.card_list import action_button, card_image, render_card_list
 from data.games_data import get_featured_games, get_free_games
 
 
@@ -15,11 +18,8 @@ def render(games_df):
     st.markdown('<div class="section-header">Featured Games</div>', unsafe_allow_html=True)
     
     featured = get_featured_games(games_df, n=3)
-    
-    cols = st.columns(3)
-    for idx, (_, game) in enumerate(featured.iterrows()):
-        with cols[idx]:
-            render_featured_game_card(game.to_dict(), idx)
+    cards = [featured_card_html(game) for game in featured.to_dict('records')]
+    render_card_list("featured_cards", cards, games_df, layout="grid")
     
     # Special Offers Section
     st.markdown("---")
@@ -27,10 +27,8 @@ def render(games_df):
     
     free_games = get_free_games(games_df)
     if not free_games.empty:
-        cols = st.columns(min(len(free_games), 4))
-        for idx, (_, game) in enumerate(free_games.iterrows()):
-            with cols[idx]:
-                render_free_game_card(game.to_dict(), idx)
+        cards = [free_card_html(game) for game in free_games.to_dict('records')]
+        render_card_list("free_cards", cards, games_df, layout="compact")
     
     # Information Cards
     st.markdown("---")
@@ -59,7 +57,7 @@ def render(games_df):
         """, unsafe_allow_html=True)
 
 
-def render_featured_game_card(game, idx):
+def featured_card_html(game):
     """
     Render a modern featured game card with integrated buttons
     
@@ -70,73 +68,43 @@ def render_featured_game_card(game, idx):
     - Action buttons integrated within card, not external
     - Consistent spacing and sizing
     """
-    
-    # Card container
-    st.markdown('<div class="game-card-modern">', unsafe_allow_html=True)
-    
-    # Image
-    try:
-        st.image(game.get('image_url', ''), use_container_width=True, output_format="auto")
-    except:
-        st.markdown("""
-        <div class="game-card-image" style="display: flex; align-items: center; justify-content: center; color: #71717a;">
-            No Image Available
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # Content section
-    st.markdown('<div class="game-card-content">', unsafe_allow_html=True)
-    
-    # Title
-    st.markdown(f'<div class="game-card-title">{game["title"]}</div>', unsafe_allow_html=True)
-    
-    # Description (truncated)
+    in_cart = int(game['id']) in st.session_state.cart
+    saved = int(game['id']) in st.session_state.wishlist
     description = game.get('description', '')[:100] + '...'
-    st.markdown(f'<div class="game-card-description">{description}</div>', unsafe_allow_html=True)
-    
-    # Price
-    price_text = format_price(game['price'])
-    st.markdown(f'<div class="game-card-price">{price_text}</div>', unsafe_allow_html=True)
     
-    # Action buttons - INTEGRATED within card
-    col1, col2 = st.columns(2)
-    with col1:
-        if st.button("Add to Cart", key=f"cart_feat_{idx}_{game['id']}", use_container_width=True):
-            if add_to_cart(game):
-                st.success("✓ Added", icon="✅")
-            else:
-                st.info("Already in cart")
-    
-    with col2:
-        if st.button("Wishlist", key=f"wish_feat_{idx}_{game['id']}", use_container_width=True):
-            if add_to_wishlist(game):
-                st.success("✓ Saved", icon="❤️")
-            else:
-                st.info("Already saved")
-    
-    st.markdown('</div>', unsafe_allow_html=True)  # Close content
-    st.markdown('</div>', unsafe_allow_html=True)  # Close card
+    return f"""
+    <div class="game-card-modern">
+        {card_image(game, "card", "game-card-image")}
+        <div class="game-card-content">
+            <div class="game-card-title">{escape(game['title'])}</div>
+            <div class="game-card-description">{escape(description)}</div>
+            <div class="game-card-price">{format_price(game['price'])}</div>
+            <div class="game-card-actions">
+                {action_button("cart", game, "Add to Cart", "✓ In Cart", done=in_cart)}
+                {action_button("wishlist", game, "Wishlist", "✓ Saved", done=saved)}
+            </div>
+        </div>
+    </div>
+    """
 
 
-def render_free_game_card(game, idx):
+def free_card_html(game):
     """Render a compact card for free games"""
+    in_cart = int(game['id']) in st.session_state.cart
     
-    st.markdown(f"""
+    return f"""
     <div class="stat-card-modern" style="text-align: left;">
         <div style="color: #10b981; font-weight: 700; font-size: 1.125rem; margin-bottom: 0.5rem;">
             FREE
         </div>
         <div style="color: #fafafa; font-weight: 600; margin-bottom: 0.5rem;">
-            {game['title']}
+            {escape(game['title'])}
+        </div>
+        <div style="color: #a1a1aa; font-size: 0.75rem; margin-bottom: 1rem;">
+            {escape(game['category'])}
         </div>
-        <div style="color: #a1a1aa; font-size: 0.75rem;">
-            {game['category']}
+        <div class="game-card-actions">
+            {action_button("cart", game, "Get Now", "✓ In Cart", done=in_cart)}
         </div>
     </div>
-    """, unsafe_allow_html=True)
-    
-    if st.button("Get Now", key=f"free_{idx}_{game['id']}", use_container_width=True):
-        if add_to_cart(game):
-            st.success("✓ Added to cart")
-        else:
-            st.info("Already in cart")
\ No newline at end of file
+    """
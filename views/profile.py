@@ -5,6 +5,9 @@ Complete profile management with stats and edit functionality
 
 import streamlit as st
 from datetime import datetime
+from utils.helpers import DEFAULT_USER_ID, get_license_allocator, get_order_ledger, get_price_history, get_user_id
+
+PURCHASE_HISTORY_LIMIT = 50
 
 
 def render(games_df):
@@ -33,16 +36,20 @@ def render(games_df):
     
     # Purchase history section
     render_purchase_history()
+    
+    st.markdown("---")
+    
+    # Account settings section
+    render_account_settings()
 
 
 def init_default_user():
     """Initialize default user profile"""
     st.session_state.user = {
+        'id': DEFAULT_USER_ID,
         'username': 'GamerPro',
         'email': 'gamer@gameverse.com',
         'member_since': '2024',
-        'total_spent': 0.0,
-        'games_owned': 0,
         'avatar_url': 'https://images.unsplash.com/photo-1535713875002-d1d0cf377fde?w=400'
     }
 
@@ -89,12 +96,13 @@ def render_profile_stats():
     
     col1, col2, col3 = st.columns(3)
     
-    user = st.session_state.user
+    # Running totals kept by the order ledger; one row lookup
+    summary = get_order_ledger().get_user_summary(get_user_id())
     
     with col1:
         st.markdown(f"""
         <div class="stat-card-modern">
-            <div class="stat-number-modern">${user.get('total_spent', 0.0):.2f}</div>
+            <div class="stat-number-modern">${summary['total_spent']:.2f}</div>
             <div class="stat-label-modern">Total Spent</div>
         </div>
         """, unsafe_allow_html=True)
@@ -102,7 +110,7 @@ def render_profile_stats():
     with col2:
         st.markdown(f"""
         <div class="stat-card-modern">
-            <div class="stat-number-modern">{user.get('games_owned', 0)}</div>
+            <div class="stat-number-modern">{summary['games_owned']}</div>
             <div class="stat-label-modern">Games Owned</div>
         </div>
         """, unsafe_allow_html=True)
@@ -169,10 +177,11 @@ def render_purchase_history():
     """Render purchase history section"""
     st.markdown("### 📋 Purchase History")
     
-    user = st.session_state.user
-    games_owned = user.get('games_owned', 0)
+    ledger = get_order_ledger()
+    summary = ledger.get_user_summary(get_user_id())
+    games_owned = summary['games_owned']
     
-    if games_owned == 0:
+    if summary['order_count'] == 0:
         st.info("No purchases yet. Start shopping to build your library!")
         
         col1, col2 = st.columns(2)
@@ -191,7 +200,8 @@ def render_purchase_history():
                 You have purchased <strong>{games_owned}</strong> games.
             </p>
             <p style="color: #a1a1aa; font-size: 0.875rem;">
-                Total lifetime spending: <strong style="color: #10b981;">${user.get('total_spent', 0.0):.2f}</strong>
+                Total lifetime spending: <strong style="color: #10b981;">${summary['total_spent']:.2f}</strong>
+                across {summary['order_count']} order(s).
             </p>
         </div>
         """, unsafe_allow_html=True)
@@ -200,18 +210,24 @@ def render_purchase_history():
         
         # Additional purchase history features
         with st.expander("📜 View Detailed Transaction History"):
-            st.markdown("""
-            **Recent Transactions:**
-            
-            Your complete transaction history will appear here, including:
-            - Game title and purchase date
-            - Transaction ID
-            - Payment method
-            - Refund eligibility status
-            
-            *This feature tracks all your purchases and allows you to request refunds 
-            within 14 days if you've played less than 2 hours.*
-            """)
+            history = ledger.get_purchase_history(get_user_id(), limit=PURCHASE_HISTORY_LIMIT)
+            licenses = get_license_allocator().keys_for_user(get_user_id())
+            st.dataframe(
+                [
+                    {
+                        'Date': datetime.fromtimestamp(item['created_at']).strftime('%Y-%m-%d %H:%M'),
+                        'Order ID': item['order_id'],
+                        'Game': item['title'],
+                        'Price': f"${item['price']:.2f}",
+                        'License Key': licenses.get((item['order_id'], item['game_id']), '—'),
+                    }
+                    for item in history
+                ],
+                use_container_width=True,
+                hide_index=True
+            )
+            st.caption(f"Showing your {len(history)} most recent purchases. "
+                       "Refunds can be requested within 14 days if you've played less than 2 hours.")
         
         with st.expander("📥 Download Purchase Receipts"):
             st.markdown("""
@@ -260,11 +276,16 @@ def render_account_settings():
     
     with st.expander("🔔 Notification Preferences"):
         st.checkbox("Email notifications for new game releases")
-        st.checkbox("Wishlist price drop alerts")
+        price_history = get_price_history()
+        price_alerts = st.checkbox(
+            "Wishlist price drop alerts",
+            value=price_history.alerts_enabled(get_user_id())
+        )
         st.checkbox("Weekly game recommendations")
         st.checkbox("Promotional offers and discounts")
         
         if st.button("Save Preferences"):
+            price_history.set_alerts_enabled(get_user_id(), price_alerts)
             st.success("✅ Notification preferences saved!")
     
     with st.expander("🗑️ Account Management"):
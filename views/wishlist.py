@@ -3,14 +3,20 @@ GameVerse Wishlist Page
 Manage wishlisted games
 """
 
+from html import escape
+
 import streamlit as st
-from utils.helpers import add_to_cart, format_price
+from utils.helpers import format_price, get_price_history, get_user_id
+from utils.card_list import action_button, card_image, render_card_list
+from data.games_data import get_game_by_id, get_games_by_ids
 
 
 def render(games_df):
     """Render the wishlist page"""
     st.markdown("## My Wishlist")
     
+    render_price_alerts(games_df)
+    
     if not st.session_state.wishlist:
         st.info("Your wishlist is empty. Add games you're interested in!")
         
@@ -19,46 +25,38 @@ def render(games_df):
             st.rerun()
         return
     
-    # Display wishlist items
-    for idx, game in enumerate(st.session_state.wishlist):
-        render_wishlist_item(game, idx)
+    # Display wishlist items (resolved against the live catalog)
+    wishlist_games = get_games_by_ids(games_df, st.session_state.wishlist)
+    cards = [wishlist_card_html(game) for game in wishlist_games.to_dict('records')]
+    render_card_list("wishlist_cards", cards, games_df)
 
 
-def render_wishlist_item(game, idx):
+def wishlist_card_html(game):
     """Render a single wishlist item"""
-    col1, col2 = st.columns([4, 1])
-    
-    with col1:
-        st.markdown(f"### {game['title']}")
-        st.caption(f"{game['category']} | {format_price(game['price'])}")
-        st.markdown(f"*{game['description'][:150]}...*")
-        
-        # Action buttons
-        col_a, col_b = st.columns(2)
-        with col_a:
-            if st.button(f"Add to Cart", key=f"cart_wish_{idx}_{game['id']}"):
-                if add_to_cart(game):
-                    st.success("Added to cart!")
-                else:
-                    st.info("Already in cart!")
-        
-        with col_b:
-            if st.button(f"Remove", key=f"remove_wish_{idx}_{game['id']}"):
-                st.session_state.wishlist.pop(idx)
-                st.rerun()
+    in_cart = int(game['id']) in st.session_state.cart
     
-    with col2:
-        try:
-            st.image(game['image_url'], use_container_width=True)
-        except:
-            st.markdown("""
-            <div style="background: rgba(99, 102, 241, 0.2); 
-                        padding: 2rem; 
-                        border-radius: 8px; 
-                        text-align: center;
-                        color: #94a3b8;">
-                No Image
+    return f"""
+    <div class="game-card-modern card-row">
+        <div class="card-row-body">
+            <div class="game-card-title">{escape(game['title'])}</div>
+            <div class="card-meta">{escape(game['category'])} | {format_price(game['price'])}</div>
+            <p class="game-card-description"><em>{escape(game['description'][:150])}...</em></p>
+            <div class="game-card-actions">
+                {action_button("cart", game, "Add to Cart", "✓ In Cart", done=in_cart)}
+                {action_button("remove_wishlist", game, "Remove", secondary=True)}
             </div>
-            """, unsafe_allow_html=True)
-    
-    st.markdown("---")
\ No newline at end of file
+        </div>
+        {card_image(game, "thumb", "card-row-image")}
+    </div>
+    """
+
+
+def render_price_alerts(games_df):
+    """Show price drops on wishlisted games since the last visit"""
+    for alert in get_price_history().take_unseen_alerts(get_user_id()):
+        game = get_game_by_id(games_df, alert['game_id'])
+        title = game['title'] if game is not None else f"Game #{alert['game_id']}"
+        st.success(
+            f"💸 Price drop: **{title}** is now {format_price(alert['new_price'])} "
+            f"(was {format_price(alert['old_price'])})"
+        )